@@ -1,12 +1,17 @@
 from flask import Flask
 from flask_cors import CORS
-from app.config.config import DEBUG
-from app.utils.db_utils import create_tables
+from app.config.config import DEBUG, INIT_DB, ENABLE_SCHEDULER, PROFILING_ENABLED
 from app.controllers.sentiment_controller import sentiment_bp
-from app.utils.scheduler import init_scheduler
+from app.controllers.metrics_controller import metrics_bp
 
-def create_app():
-    """Create and configure the Flask application."""
+def create_app(init_db=INIT_DB, enable_scheduler=ENABLE_SCHEDULER, profiling=PROFILING_ENABLED):
+    """Create and configure the Flask application.
+
+    Args:
+        init_db (bool): Create the database tables on startup.
+        enable_scheduler (bool): Start the periodic retraining scheduler.
+        profiling (bool): Profile sampled requests with cProfile (see app/utils/profiler.py).
+    """
     app = Flask(__name__)
     
     # Enable CORS
@@ -14,11 +19,22 @@ def create_app():
     
     # Register blueprints
     app.register_blueprint(sentiment_bp, url_prefix='/api/sentiment')
+    app.register_blueprint(metrics_bp)
+    
+    if profiling:
+        from app.utils.profiler import init_profiler
+        init_profiler(app)
     
-    # Create database tables
-    create_tables()
+    # The database driver and scheduler are only imported when used, so a
+    # serving-only instance starts without loading them
+    if init_db:
+        # Create database tables
+        from app.utils.db_utils import create_tables
+        create_tables()
     
-    # Initialize the scheduler
-    init_scheduler()
+    if enable_scheduler:
+        # Initialize the scheduler
+        from app.utils.scheduler import init_scheduler
+        init_scheduler()
     
     return app
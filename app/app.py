@@ -1,9 +1,24 @@
 from app import create_app
 from app.config.config import HOST, PORT, DEBUG
 
-# Create the Flask application
-app = create_app()
+# The Flask application, created on first access
+_app = None
+
+def __getattr__(name):
+    """Create the Flask application when a WSGI server or `flask run` looks up app.app:app.
+
+    Importing this module must not create the app: retraining and job worker processes
+    are spawned, and a spawned process re-runs the top level of the main module (as
+    __mp_main__), which would create a second app with its own database setup and
+    scheduler.
+    """
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
     # Run the application
-    app.run(host=HOST, port=PORT, debug=DEBUG)
+    __getattr__('app').run(host=HOST, port=PORT, debug=DEBUG)
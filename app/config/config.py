@@ -10,16 +10,100 @@ DB_USER = os.getenv('DB_USER', 'root')
 DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 DB_NAME = os.getenv('DB_NAME', 'sentiment_analysis')
 DB_PORT = int(os.getenv('DB_PORT', 3306))
+# Connection pool: connections kept open (min) and allowed (max), seconds before a
+# connection is replaced (0 means no limit), and seconds to wait for a free connection
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 3600))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+# Rows per multi-row INSERT statement for bulk ingestion
+DB_INSERT_CHUNK_SIZE = int(os.getenv('DB_INSERT_CHUNK_SIZE', 1000))
 
 # Application Configuration
 DEBUG = os.getenv('DEBUG', 'True') == 'True'
 PORT = int(os.getenv('PORT', 5000))
 HOST = os.getenv('HOST', '0.0.0.0')
+# Serving-only mode: skip database table creation and the retraining scheduler at
+# startup, so an inference container starts without touching MySQL or the training stack
+SERVING_ONLY = os.getenv('SERVING_ONLY', 'False') == 'True'
+INIT_DB = os.getenv('INIT_DB', str(not SERVING_ONLY)) == 'True'
+ENABLE_SCHEDULER = os.getenv('ENABLE_SCHEDULER', str(not SERVING_ONLY)) == 'True'
 
 # Model Configuration
 MODEL_PATH = os.getenv('MODEL_PATH', 'data/sentiment_model.pkl')
+# Serve from the memory-mapped scoring artifact when available, sharing the model
+# arrays between worker processes through the page cache
+MODEL_MMAP = os.getenv('MODEL_MMAP', 'True') == 'True'
 RETRAIN_INTERVAL_DAYS = int(os.getenv('RETRAIN_INTERVAL_DAYS', 7))
+# Train in a separate, lower-priority process and hot-swap the result into the server
+RETRAIN_IN_SUBPROCESS = os.getenv('RETRAIN_IN_SUBPROCESS', 'True') == 'True'
+RETRAIN_NICENESS = int(os.getenv('RETRAIN_NICENESS', 10))
+# Scheduled retrains only train on tweets added since the last run (hashing vectorizer
+# + SGD partial_fit, with the ngram_range and C promoted by the last sweep); a full
+# rebuild from all tweets can still be requested on demand. Incremental models have no
+# compiled scorer or mmap artifact and are served from the pickled pipelines
+RETRAIN_INCREMENTAL = os.getenv('RETRAIN_INCREMENTAL', 'True') == 'True'
+HASHING_N_FEATURES = int(os.getenv('HASHING_N_FEATURES', 2 ** 18))
+# 'fused' vectorizes each text once and scores both heads together,
+# 'pipeline' runs the two sklearn pipelines separately (reference implementation)
+INFERENCE_MODE = os.getenv('INFERENCE_MODE', 'fused')
+# Text normalization steps applied before training (see app/models/text_normalizer.py);
+# models keep the steps they were trained with
+TEXT_NORMALIZATION = [step.strip() for step in os.getenv(
+    'TEXT_NORMALIZATION', 'unicode,lowercase,urls,mentions,hashtags,numbers,elongations').split(',') if step.strip()]
+# Batches up to this size are scored by the pure NumPy compiled scorer (0 disables it)
+COMPILED_SCORER_MAX_BATCH = int(os.getenv('COMPILED_SCORER_MAX_BATCH', 64))
+# Larger batches are scored in chunks of this many tweets to bound peak memory (0 disables chunking)
+SCORE_CHUNK_SIZE = int(os.getenv('SCORE_CHUNK_SIZE', 2048))
+
+# Prediction Cache Configuration (size 0 disables the cache, TTL 0 means no expiry)
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 100000))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 3600))
+
+# Micro-batching Configuration: merge concurrent requests arriving within
+# MICROBATCH_WINDOW_MS (up to MICROBATCH_MAX_BATCH tweets) into one model call
+MICROBATCH_ENABLED = os.getenv('MICROBATCH_ENABLED', 'False') == 'True'
+MICROBATCH_WINDOW_MS = float(os.getenv('MICROBATCH_WINDOW_MS', 2))
+MICROBATCH_MAX_BATCH = int(os.getenv('MICROBATCH_MAX_BATCH', 512))
+# Seconds a request waits for its micro-batch before it is answered with 503
+MICROBATCH_TIMEOUT = float(os.getenv('MICROBATCH_TIMEOUT', 30))
+
+# Request Profiling Configuration: when enabled, PROFILE_SAMPLE_RATE of the analyze
+# requests, and any request with a non-empty PROFILE_HEADER, run under cProfile; the
+# PROFILE_MAX_FILES most recent profiles are kept in PROFILE_DIR
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0.01))
+PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'data/profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 200))
+
+# Analyze Request Limits: larger requests are refused with 413 (use /analyze/stream or
+# /jobs for bulk scoring), and requests that would take the tweets in flight in this
+# process above MAX_IN_FLIGHT_TWEETS are shed with 429 and a Retry-After of
+# ANALYZE_RETRY_AFTER seconds (0 disables shedding)
+ANALYZE_MAX_BATCH = int(os.getenv('ANALYZE_MAX_BATCH', 10000))
+ANALYZE_MAX_TWEET_LENGTH = int(os.getenv('ANALYZE_MAX_TWEET_LENGTH', 1000))
+ANALYZE_MAX_BODY_BYTES = int(os.getenv('ANALYZE_MAX_BODY_BYTES', 10 * 1024 * 1024))
+MAX_IN_FLIGHT_TWEETS = int(os.getenv('MAX_IN_FLIGHT_TWEETS', 50000))
+ANALYZE_RETRY_AFTER = int(os.getenv('ANALYZE_RETRY_AFTER', 1))
+
+# Streaming Configuration: tweets scored per chunk by /analyze/stream
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 1000))
+
+# Bulk Job Configuration
+JOBS_DIR = os.getenv('JOBS_DIR', 'data/jobs')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+JOB_SHARD_SIZE = int(os.getenv('JOB_SHARD_SIZE', 50000))
 
 # Training Configuration
 TEST_SIZE = float(os.getenv('TEST_SIZE', 0.2))
 RANDOM_STATE = int(os.getenv('RANDOM_STATE', 42))
+# Worker processes used to fit the positive and negative heads concurrently
+# (default 2 on multi-core machines; 1 trains them one after the other in the training process)
+TRAINING_N_JOBS = int(os.getenv('TRAINING_N_JOBS', min(2, os.cpu_count() or 1)))
+# Rows fetched per round trip when streaming the training data from the database
+TRAINING_FETCH_SIZE = int(os.getenv('TRAINING_FETCH_SIZE', 10000))
+# TF-IDF hyperparameters promoted by the last sweep, and where sweeps write their
+# cached fold matrices and leaderboards
+HYPERPARAMS_PATH = os.getenv('HYPERPARAMS_PATH', 'data/hyperparams.json')
+SWEEP_DIR = os.getenv('SWEEP_DIR', 'data/sweeps')
@@ -0,0 +1,27 @@
+import time
+from flask import Blueprint, Response, request, g
+from app.utils.metrics import REQUESTS, REQUEST_SECONDS, render
+
+# Blueprint serving /metrics and counting every request of the application
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.before_app_request
+def start_timer():
+    """Record the start time of the request."""
+    g.metrics_start = time.perf_counter()
+
+@metrics_bp.after_app_request
+def record_request(response):
+    """Count the request and observe its handling time under its route pattern."""
+    start = g.pop('metrics_start', None)
+    # The route pattern keeps the number of label values bounded (job ids are not labels)
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    REQUESTS.labels(method=request.method, endpoint=endpoint, status=response.status_code).inc()
+    if start is not None:
+        REQUEST_SECONDS.labels(endpoint=endpoint).observe(time.perf_counter() - start)
+    return response
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Return the request, stage, batch size, model, retraining and database metrics for Prometheus."""
+    return Response(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
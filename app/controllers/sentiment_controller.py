@@ -1,5 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context, g
 from app.models.sentiment_model import get_model_instance
+from app.utils.batcher import BatcherUnavailable, get_batcher
+from app.utils.ndjson import NDJSONError, iter_tweets, dumps_line
+from app.utils.jobs import get_job_manager
+from app.utils.annotations import AnnotationError, iter_annotations, iter_jsonl_records
+from app.utils.admission import get_admission_controller
+from app.utils.metrics import STAGE_SECONDS, BATCH_SIZE
+from app.utils import serialization
+from app.config.config import (MICROBATCH_ENABLED, MICROBATCH_TIMEOUT, STREAM_CHUNK_SIZE, ANALYZE_MAX_BATCH,
+                               ANALYZE_MAX_TWEET_LENGTH, ANALYZE_MAX_BODY_BYTES, ANALYZE_RETRY_AFTER)
+
+# Histograms of the stages of an analyze request
+PARSE_JSON_SECONDS = STAGE_SECONDS.labels(stage='parse_json')
+VALIDATE_SECONDS = STAGE_SECONDS.labels(stage='validate')
+PREDICT_SECONDS = STAGE_SECONDS.labels(stage='predict')
+BUILD_RESPONSE_SECONDS = STAGE_SECONDS.labels(stage='build_response')
+SERIALIZE_SECONDS = STAGE_SECONDS.labels(stage='serialize')
+REQUEST_BATCH_SIZE = BATCH_SIZE.labels(source='request')
 
 # Create a Blueprint for the sentiment analysis routes
 sentiment_bp = Blueprint('sentiment', __name__)
@@ -9,34 +26,305 @@ def analyze_sentiment():
     """Analyze the sentiment of a list of tweets.
     
     Expects a JSON payload with a 'tweets' key containing a list of strings.
-    Returns a JSON object with each tweet as a key and its sentiment score as a value.
+    Returns a JSON object with each tweet as a key and its sentiment score as a value,
+    or, depending on the Accept header, only the scores in the order of the tweets
+    (see app/utils/serialization.py).
+    
+    Bodies, batches and tweets larger than the ANALYZE_MAX_* limits are refused with
+    413. When the tweets already being scored by this process would exceed
+    MAX_IN_FLIGHT_TWEETS, the request is shed with 429 and a Retry-After header. With
+    micro-batching, a request not scored within MICROBATCH_TIMEOUT gets 503.
     """
+    # Pick the response format before doing any work
+    media_type = serialization.negotiate(request.accept_mimetypes)
+    if media_type is None:
+        return jsonify({'error': 'Not acceptable', 'available': serialization.RESPONSE_MEDIA_TYPES}), 406
+    
+    # Refuse oversized bodies before reading them
+    if request.content_length is not None and request.content_length > ANALYZE_MAX_BODY_BYTES:
+        return body_too_large()
+    
     # Get the request data
-    data = request.get_json()
+    with PARSE_JSON_SECONDS.time():
+        if request.is_json:
+            body = read_body(ANALYZE_MAX_BODY_BYTES)
+            if body is None:
+                return body_too_large()
+            try:
+                data = serialization.loads(body)
+            except ValueError:
+                return jsonify({'error': 'Request body is not valid JSON'}), 400
+        else:
+            # Let Flask answer non-JSON bodies as it does for every other route
+            data = request.get_json()
     
     # Validate the request data
-    if not data or 'tweets' not in data:
-        return jsonify({'error': 'Missing required field: tweets'}), 400
+    with VALIDATE_SECONDS.time():
+        error = validate_tweets(data)
+        limit_error = None if error else check_limits(data['tweets'])
+    if error:
+        return jsonify({'error': error}), 400
+    if limit_error:
+        return jsonify({'error': limit_error}), 413
+    
+    tweets = data['tweets']
+    REQUEST_BATCH_SIZE.observe(len(tweets))
+    # Read by the request profiler, which must not parse the body again
+    g.batch_size = len(tweets)
+    
+    # Shed load instead of queueing when too many tweets are already being scored
+    admission = get_admission_controller()
+    if not admission.try_acquire(len(tweets)):
+        response = jsonify({'error': 'Too many tweets in flight, retry later'})
+        response.headers['Retry-After'] = str(ANALYZE_RETRY_AFTER)
+        return response, 429
+    
+    try:
+        # Predict sentiment scores, coalescing with concurrent requests if enabled
+        with PREDICT_SECONDS.time():
+            if MICROBATCH_ENABLED:
+                try:
+                    sentiment_scores = get_batcher().predict(tweets, timeout=MICROBATCH_TIMEOUT)
+                except BatcherUnavailable as e:
+                    print(f"Error scoring micro-batch: {e}")
+                    response = jsonify({'error': 'Scoring is unavailable, retry later'})
+                    response.headers['Retry-After'] = str(ANALYZE_RETRY_AFTER)
+                    return response, 503
+            else:
+                model = get_model_instance()
+                sentiment_scores = model.predict_sentiment(tweets)
+        
+        # Map tweets to their scores, or keep only the scores for the compact formats
+        with BUILD_RESPONSE_SECONDS.time():
+            body = serialization.build_body(tweets, sentiment_scores, media_type)
+        
+        with SERIALIZE_SECONDS.time():
+            response = Response(serialization.encode_body(body, media_type), mimetype=media_type)
+    finally:
+        admission.release(len(tweets))
+    response.vary.add('Accept')
+    return response, 200
+
+def read_body(limit):
+    """Return the request body, or None if it is larger than limit bytes."""
+    if request.content_length is not None:
+        return request.get_data()
+    # Chunked bodies declare no length: read at most one byte past the limit
+    body = request.stream.read(limit + 1)
+    return body if len(body) <= limit else None
+
+def body_too_large():
+    """Return the 413 response of an analyze request body above ANALYZE_MAX_BODY_BYTES."""
+    return jsonify({'error': f'Request body exceeds {ANALYZE_MAX_BODY_BYTES} bytes; '
+                             'use /analyze/stream or /jobs for bulk scoring'}), 413
+
+def validate_tweets(data):
+    """Return the validation error of an analyze request body, or None if it is valid."""
+    if not isinstance(data, dict) or 'tweets' not in data:
+        return 'Missing required field: tweets'
     
     tweets = data['tweets']
     
     # Validate the tweets data
     if not isinstance(tweets, list):
-        return jsonify({'error': 'Tweets must be a list of strings'}), 400
+        return 'Tweets must be a list of strings'
     
     if not all(isinstance(tweet, str) for tweet in tweets):
-        return jsonify({'error': 'All tweets must be strings'}), 400
+        return 'All tweets must be strings'
     
     if len(tweets) == 0:
-        return jsonify({'error': 'Tweets list cannot be empty'}), 400
+        return 'Tweets list cannot be empty'
+    
+    return None
+
+def check_limits(tweets):
+    """Return the error of a valid tweets list exceeding the analyze limits, or None."""
+    if len(tweets) > ANALYZE_MAX_BATCH:
+        return (f'Too many tweets: {len(tweets)} (limit {ANALYZE_MAX_BATCH}); '
+                'use /analyze/stream or /jobs for bulk scoring')
     
-    # Get the model instance
+    if any(len(tweet) > ANALYZE_MAX_TWEET_LENGTH for tweet in tweets):
+        return f'Tweets cannot be longer than {ANALYZE_MAX_TWEET_LENGTH} characters'
+    
+    return None
+
+@sentiment_bp.route('/analyze/stream', methods=['POST'])
+def analyze_sentiment_stream():
+    """Analyze the sentiment of a stream of tweets.
+    
+    Expects a newline-delimited JSON body (plain or chunked) where each line is a tweet
+    string or an object with a 'tweet' field. Tweets are scored in chunks of
+    STREAM_CHUNK_SIZE and each result is streamed back as soon as its chunk completes,
+    as one {"tweet": ..., "score": ...} object per line. Memory use does not depend on
+    the number of tweets. If a line is invalid, an {"error": ..., "line": ...} object is
+    streamed and the response ends.
+    """
     model = get_model_instance()
+
+    def score_lines(chunk):
+        if not chunk:
+            return ''
+        sentiment_scores = model.predict_sentiment(chunk)
+        return ''.join(dumps_line({'tweet': tweet, 'score': float(score)})
+                       for tweet, score in zip(chunk, sentiment_scores))
+
+    def generate():
+        chunk = []
+        try:
+            for tweet in iter_tweets(request.stream):
+                chunk.append(tweet)
+                if len(chunk) == STREAM_CHUNK_SIZE:
+                    yield score_lines(chunk)
+                    chunk = []
+        except NDJSONError as e:
+            # Stream the results of the valid lines read before the invalid one first
+            yield score_lines(chunk)
+            yield dumps_line({'error': str(e), 'line': e.line_number})
+            return
+        yield score_lines(chunk)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@sentiment_bp.route('/annotations', methods=['POST'])
+def save_annotations():
+    """Save a batch of annotated tweets for training.
+    
+    Accepts either a JSON payload with an 'annotations' list or a newline-delimited
+    JSON body with one annotation per line. Each annotation is an object with a
+    'text' string and 'positive' and 'negative' labels (0 or 1). The whole batch is
+    inserted in one transaction: if any annotation is invalid, nothing is saved.
+    """
+    # Imported here so serving-only instances do not load the database driver
+    from app.utils.db_utils import save_tweets
+    
+    if request.is_json:
+        data = request.get_json()
+        
+        # Validate the request data
+        if not data or 'annotations' not in data:
+            return jsonify({'error': 'Missing required field: annotations'}), 400
+        
+        annotations = data['annotations']
+        
+        if not isinstance(annotations, list) or len(annotations) == 0:
+            return jsonify({'error': 'Annotations must be a non-empty list'}), 400
+        
+        # Validate everything before taking a database connection
+        try:
+            rows = list(iter_annotations(annotations))
+        except AnnotationError as e:
+            return jsonify({'error': str(e)}), 400
+    else:
+        # Streamed bodies are validated while inserting; an invalid line rolls back the batch
+        rows = iter_annotations(iter_jsonl_records(request.stream))
+    
+    try:
+        inserted = save_tweets(rows)
+    except AnnotationError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Predict sentiment scores
-    sentiment_scores = model.predict_sentiment(tweets)
+    return jsonify({'inserted': inserted}), 201
+
+@sentiment_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """Create an asynchronous bulk scoring job.
+    
+    Accepts either a JSON payload with a 'tweets' list (like /analyze) or a
+    newline-delimited JSON body (like /analyze/stream). The tweets are scored on a
+    pool of worker processes; the response only carries the job id.
+    """
+    job_manager = get_job_manager()
+    
+    if request.is_json:
+        data = request.get_json()
+        
+        # Validate the request data
+        if not data or 'tweets' not in data:
+            return jsonify({'error': 'Missing required field: tweets'}), 400
+        
+        tweets = data['tweets']
+        
+        if not isinstance(tweets, list) or not all(isinstance(tweet, str) for tweet in tweets):
+            return jsonify({'error': 'Tweets must be a list of strings'}), 400
+        
+        job_id = job_manager.submit(tweets)
+    else:
+        try:
+            job_id = job_manager.submit(iter_tweets(request.stream))
+        except NDJSONError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    return jsonify(job_manager.get(job_id)), 202
+
+@sentiment_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status and progress of a bulk scoring job."""
+    job = get_job_manager().get(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job), 200
+
+@sentiment_bp.route('/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """Download the results of a completed job as newline-delimited JSON."""
+    job_manager = get_job_manager()
+    job = job_manager.get(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job['status'] != 'completed':
+        return jsonify({'error': f"Job is {job['status']}", 'status': job['status']}), 409
+    
+    return Response(job_manager.iter_results(job_id), mimetype='application/x-ndjson')
+
+@sentiment_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """Delete a job and its results."""
+    job_manager = get_job_manager()
+    
+    job = job_manager.get(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if not job_manager.delete(job_id):
+        return jsonify({'error': 'Job is still running', 'status': job['status']}), 409
+    return jsonify({'deleted': job_id}), 200
+
+@sentiment_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    """Return the hit/miss counters of the prediction cache."""
+    model = get_model_instance()
+    
+    if model.prediction_cache is None:
+        return jsonify({'enabled': False}), 200
+    
+    return jsonify({'enabled': True, **model.prediction_cache.stats()}), 200
+
+@sentiment_bp.route('/batcher', methods=['GET'])
+def batcher_stats():
+    """Return the achieved batch sizes of the micro-batching layer."""
+    if not MICROBATCH_ENABLED:
+        return jsonify({'enabled': False}), 200
+    
+    return jsonify({'enabled': True, **get_batcher().stats()}), 200
+
+@sentiment_bp.route('/admission', methods=['GET'])
+def admission_stats():
+    """Return the in-flight tweets and the admitted and shed requests of this process."""
+    return jsonify(get_admission_controller().stats()), 200
+
+@sentiment_bp.route('/db/pool', methods=['GET'])
+def db_pool_stats():
+    """Return the size, utilization and wait times of the database connection pool."""
+    # Imported here so serving-only instances do not load the database driver
+    from app.utils.db_utils import get_pool_stats
     
-    # Create a dictionary of tweets and their scores
-    results = {tweet: float(score) for tweet, score in zip(tweets, sentiment_scores)}
+    stats = get_pool_stats()
+    if stats is None:
+        return jsonify({'enabled': False}), 200
     
-    return jsonify(results), 200
+    return jsonify({'enabled': True, **stats}), 200
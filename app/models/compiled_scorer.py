@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import time
+import numpy as np
+from app.utils.metrics import STAGE_SECONDS
+
+VECTORIZE_SECONDS = STAGE_SECONDS.labels(stage='vectorize')
+PREDICT_PROBA_SECONDS = STAGE_SECONDS.labels(stage='predict_proba')
+
+class CompiledScorer:
+    """Pure NumPy scorer for the positive/negative sentiment heads.
+
+    Holds the compact scoring artifact exported by SentimentModel.train_model: the
+    vocabulary, the IDF vector, and the coefficients and intercepts of both logistic
+    heads. It reproduces TfidfVectorizer + LogisticRegression scoring without the
+    per-call validation and dispatch of sklearn pipelines, which dominates latency
+    for small batches.
+
+    The vocabulary is either a dict (term -> column index) or a sorted table of terms
+    with their column indices, searched with np.searchsorted. Loading a saved artifact
+    uses the sorted table, so every array can be memory-mapped read-only and shared
+    through the page cache by all worker processes instead of being copied into each.
+    """
+
+    def __init__(self, vocabulary, idf, coef, intercept, token_pattern, lowercase=True):
+        """Initialize the scorer.
+
+        Args:
+            vocabulary (dict or tuple): Mapping from term to feature column index, or a
+                (sorted_terms, term_columns) pair of arrays.
+            idf (np.ndarray): IDF weight of each feature column, shape (n_features,).
+            coef (np.ndarray): Coefficients of the positive and negative heads,
+                shape (n_features, 2).
+            intercept (np.ndarray): Intercepts of both heads, shape (2,).
+            token_pattern (str): Regular expression used to extract tokens.
+            lowercase (bool): Whether to lowercase texts before tokenizing.
+        """
+        if isinstance(vocabulary, dict):
+            self.vocabulary = vocabulary
+            self.sorted_terms = self.term_columns = None
+        else:
+            self.vocabulary = None
+            self.sorted_terms, self.term_columns = vocabulary
+        # np.asarray keeps memory-mapped arrays mapped instead of copying them
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self._find_tokens = re.compile(token_pattern).findall
+
+    @classmethod
+    def from_pipelines(cls, model_positive, model_negative):
+        """Compile a scorer from the two fitted sklearn pipelines.
+
+        Raises:
+            ValueError: If the pipelines are not TF-IDF models, do not share a
+                vocabulary or use vectorizer settings that the scorer does not reproduce.
+        """
+        if 'tfidf' not in model_positive.named_steps or 'tfidf' not in model_negative.named_steps:
+            raise ValueError("Only TF-IDF models can be compiled")
+        tfidf = model_positive.named_steps['tfidf']
+        tfidf_neg = model_negative.named_steps['tfidf']
+        clf_pos = model_positive.named_steps['clf']
+        clf_neg = model_negative.named_steps['clf']
+
+        if tfidf is not tfidf_neg and (
+            tfidf.vocabulary_ != tfidf_neg.vocabulary_ or not np.array_equal(tfidf.idf_, tfidf_neg.idf_)
+        ):
+            raise ValueError("Positive and negative models do not share a vocabulary")
+        if len(clf_pos.classes_) != 2 or len(clf_neg.classes_) != 2:
+            raise ValueError("Both models must be binary classifiers")
+        if (tfidf.analyzer != 'word' or tfidf.ngram_range != (1, 1) or tfidf.tokenizer is not None
+                or tfidf.preprocessor is not None or tfidf.strip_accents is not None
+                or tfidf.stop_words is not None or tfidf.norm != 'l2' or not tfidf.use_idf
+                or tfidf.sublinear_tf or tfidf.binary):
+            raise ValueError("Unsupported TfidfVectorizer settings for the compiled scorer")
+
+        return cls(
+            vocabulary=dict(tfidf.vocabulary_),
+            idf=tfidf.idf_,
+            coef=np.column_stack([clf_pos.coef_[0], clf_neg.coef_[0]]),
+            intercept=np.array([clf_pos.intercept_[0], clf_neg.intercept_[0]]),
+            token_pattern=tfidf.token_pattern,
+            lowercase=tfidf.lowercase,
+        )
+
+    def save(self, path):
+        """Save the scoring artifact as a directory of .npy files (no pickled objects).
+
+        The vocabulary is stored as a sorted table of terms (terms.npy) with the
+        column index of each term (term_columns.npy), next to idf.npy, coef.npy and
+        intercept.npy, so that load() can memory-map every array.
+        """
+        if self.vocabulary is not None:
+            terms = sorted(self.vocabulary)
+            sorted_terms = np.array(terms, dtype=str)
+            term_columns = np.array([self.vocabulary[term] for term in terms], dtype=np.int64)
+        else:
+            sorted_terms, term_columns = self.sorted_terms, self.term_columns
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'terms.npy'), sorted_terms)
+        np.save(os.path.join(path, 'term_columns.npy'), term_columns)
+        np.save(os.path.join(path, 'idf.npy'), self.idf)
+        np.save(os.path.join(path, 'coef.npy'), self.coef)
+        np.save(os.path.join(path, 'intercept.npy'), self.intercept)
+        with open(os.path.join(path, 'scorer.json'), 'w', encoding='utf-8') as f:
+            json.dump({'token_pattern': self.token_pattern, 'lowercase': self.lowercase}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Load a scoring artifact saved by save().
+
+        Args:
+            path (str): Directory of the artifact.
+            mmap_mode (str): Memory-map mode passed to np.load ('r' maps the arrays
+                read-only; None reads them into private memory).
+        """
+        def load_array(name):
+            return np.load(os.path.join(path, name), mmap_mode=mmap_mode, allow_pickle=False)
+
+        with open(os.path.join(path, 'scorer.json'), 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+
+        return cls(
+            vocabulary=(load_array('terms.npy'), load_array('term_columns.npy')),
+            idf=load_array('idf.npy'),
+            coef=load_array('coef.npy'),
+            intercept=load_array('intercept.npy'),
+            token_pattern=settings['token_pattern'],
+            lowercase=settings['lowercase'],
+        )
+
+    def _lookup(self, tokens):
+        """Return the feature column of each token, or -1 for out-of-vocabulary tokens."""
+        if self.vocabulary is not None:
+            get = self.vocabulary.get
+            return np.fromiter((get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+
+        tokens = np.array(tokens, dtype=str)
+        positions = np.searchsorted(self.sorted_terms, tokens)
+        np.minimum(positions, len(self.sorted_terms) - 1, out=positions)
+        found = self.sorted_terms[positions] == tokens
+        return np.where(found, self.term_columns[positions], -1)
+
+    def _tfidf(self, texts):
+        """Compute the nonzero TF-IDF values of texts.
+
+        Returns:
+            tuple: (docs, columns, values, norms) of the nonzero (document, column) pairs
+                and the L2 norm of each document, or None if no text has an
+                in-vocabulary token.
+        """
+        find_tokens = self._find_tokens
+        docs, tokens = [], []
+
+        for i, text in enumerate(texts):
+            if self.lowercase:
+                text = text.lower()
+            text_tokens = find_tokens(text)
+            tokens.extend(text_tokens)
+            docs.extend([i] * len(text_tokens))
+
+        if not tokens:
+            return None
+
+        columns = self._lookup(tokens)
+        in_vocabulary = columns >= 0
+        docs = np.asarray(docs, dtype=np.int64)[in_vocabulary]
+        columns = columns[in_vocabulary]
+        if len(columns) == 0:
+            return None
+
+        # Term counts per (document, column) pair
+        n_features = len(self.idf)
+        keys, counts = np.unique(docs * n_features + columns, return_counts=True)
+        docs, columns = np.divmod(keys, n_features)
+
+        values = counts * self.idf[columns]
+        norms = np.sqrt(np.bincount(docs, weights=values * values, minlength=len(texts)))
+        return docs, columns, values, norms
+
+    def decision_function(self, texts):
+        """Compute the raw logit of both heads for each text, shape (n_texts, 2)."""
+        start = time.perf_counter()
+        tfidf = self._tfidf(texts)
+        vectorized = time.perf_counter()
+        VECTORIZE_SECONDS.observe(vectorized - start)
+
+        decision = np.tile(self.intercept, (len(texts), 1))
+        if tfidf is not None:
+            # L2-normalized TF-IDF values dotted with both heads
+            docs, columns, values, norms = tfidf
+            for head in range(2):
+                dots = np.bincount(docs, weights=values * self.coef[columns, head], minlength=len(texts))
+                np.divide(dots, norms, out=dots, where=norms > 0)
+                decision[:, head] += dots
+        PREDICT_PROBA_SECONDS.observe(time.perf_counter() - vectorized)
+        return decision
+
+    def predict_proba(self, texts):
+        """Return the positive-class probability of both heads, shape (n_texts, 2)."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+
+    def predict_sentiment(self, texts):
+        """Return sentiment scores (positive minus negative probability) for preprocessed texts."""
+        probs = self.predict_proba(texts)
+        return probs[:, 0] - probs[:, 1]
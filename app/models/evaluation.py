@@ -0,0 +1,174 @@
+"""
+Evaluation of trained models, off the retraining critical path.
+
+SentimentModel.train_model saves (publishes) a new model first. It then hands
+the held-out test set to a background worker thread, which scores both heads
+concurrently, renders their confusion matrices and writes everything next to
+the model version:
+
+    <MODEL_PATH>_evaluation_<version>/
+        metrics.json                    precision, recall, F1, support and confusion matrix per head
+        confusion_matrix_positive.png
+        confusion_matrix_negative.png
+
+Plots are drawn on their own Agg canvas, never through pyplot, so they work
+without a display and do not depend on (or change) the matplotlib backend
+of the process. Reports (scripts/generate_report.py) read metrics.json
+instead of re-running the evaluation.
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+from app.config.config import MODEL_PATH
+from app.models.model_bundle import read_metadata
+
+# One worker thread, so evaluations run one at a time; it is started on first use
+_executor = None
+# Evaluations submitted by this process that may still be running
+_pending = []
+_pending_lock = threading.Lock()
+
+def evaluation_dir(version, model_path=MODEL_PATH):
+    """Return the directory holding the evaluation of a model version."""
+    return f"{model_path}_evaluation_{version}"
+
+def submit_evaluation(bundle, X_test, y_pos_test, y_neg_test, model_path=MODEL_PATH):
+    """Evaluate a published bundle on its test set in the background worker thread.
+
+    The interpreter waits for pending evaluations at exit, so a training script
+    still writes the metrics of the model it trained.
+
+    Returns:
+        Future: Resolves to the metrics written to metrics.json.
+    """
+    global _executor
+    with _pending_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='evaluation')
+        future = _executor.submit(evaluate_models, bundle.model_positive, bundle.model_negative, bundle.version,
+                                  X_test, y_pos_test, y_neg_test, bundle.metadata.get('trained_rows'), model_path)
+        _pending.append(future)
+    future.add_done_callback(lambda done: _log_failure(bundle.version, done))
+    return future
+
+def wait_for_evaluations():
+    """Wait for the evaluations submitted by this process to finish.
+
+    Called by processes that exit without running the interpreter shutdown (such as
+    the retraining worker process) before they exit.
+    """
+    with _pending_lock:
+        futures = list(_pending)
+        _pending.clear()
+    wait(futures)
+
+def _log_failure(version, future):
+    """Report a failed evaluation (evaluations never fail the retrain that published the model)."""
+    if future.exception() is not None:
+        print(f"Error evaluating model version {version}: {future.exception()}")
+
+def evaluate_models(model_positive, model_negative, version, X_test, y_pos_test, y_neg_test, trained_rows=None,
+                    model_path=MODEL_PATH):
+    """Score both heads on the test set, plot their confusion matrices and save the metrics.
+
+    The test texts are vectorized once when the heads share their vectorizer; the
+    two heads are then evaluated concurrently.
+
+    Returns:
+        dict: The metrics written to metrics.json.
+    """
+    start = time.perf_counter()
+    output_dir = evaluation_dir(version, model_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    vectorizer_pos = model_positive.steps[0][1]
+    vectorizer_neg = model_negative.steps[0][1]
+    features_pos = vectorizer_pos.transform(X_test)
+    features_neg = features_pos if vectorizer_neg is vectorizer_pos else vectorizer_neg.transform(X_test)
+
+    metrics = {
+        'version': version,
+        'evaluated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'trained_rows': trained_rows,
+        'test_rows': len(X_test),
+    }
+    # Both heads are scored and plotted concurrently, in two threads of this worker
+    heads = (('positive', model_positive, features_pos, y_pos_test),
+             ('negative', model_negative, features_neg, y_neg_test))
+    with ThreadPoolExecutor(max_workers=len(heads), thread_name_prefix='evaluation-head') as executor:
+        futures = [executor.submit(_evaluate_and_plot, name, model.named_steps['clf'], features, y_true, output_dir)
+                   for name, model, features, y_true in heads]
+        for (name, *_), future in zip(heads, futures):
+            metrics[name] = future.result()
+    metrics['duration_s'] = time.perf_counter() - start
+
+    metrics_path = os.path.join(output_dir, 'metrics.json')
+    with open(f"{metrics_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+    os.replace(f"{metrics_path}.tmp", metrics_path)
+
+    print(f"Model evaluation completed. Metrics saved to {output_dir}")
+    return metrics
+
+def _evaluate_and_plot(name, clf, features, y_true, output_dir):
+    """Score one head on the test set and plot its confusion matrix."""
+    metrics = _evaluate_head(clf, features, y_true)
+    plot_confusion_matrix(np.asarray(metrics['confusion_matrix']), f'{name.capitalize()} Sentiment Confusion Matrix',
+                          os.path.join(output_dir, f'confusion_matrix_{name}.png'))
+    return metrics
+
+def _evaluate_head(clf, features, y_true):
+    """Score one head on the test set."""
+    from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+
+    y_pred = clf.predict(features)
+    cm = confusion_matrix(y_true, y_pred, labels=[0, 1])
+    precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, average='binary', zero_division=0)
+    return {
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1_score': float(f1),
+        'accuracy': float(np.trace(cm) / max(cm.sum(), 1)),
+        'support': int(np.sum(y_true)),
+        'confusion_matrix': cm.tolist(),
+    }
+
+def plot_confusion_matrix(cm, title, save_path):
+    """Plot and save a confusion matrix on a standalone Agg canvas."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import seaborn as sns
+
+    figure = Figure(figsize=(8, 6))
+    FigureCanvasAgg(figure)
+    ax = figure.subplots()
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+                xticklabels=['Negative', 'Positive'],
+                yticklabels=['Negative', 'Positive'], ax=ax)
+    ax.set_title(title)
+    ax.set_ylabel('True Label')
+    ax.set_xlabel('Predicted Label')
+    figure.tight_layout()
+    figure.savefig(save_path)
+
+def load_evaluation(version=None, model_path=MODEL_PATH):
+    """Load the saved metrics of a model version.
+
+    Args:
+        version (str): Model version (default: the version of the saved model).
+
+    Returns:
+        dict: The metrics, or None if the version has not been evaluated (yet).
+    """
+    version = version or read_metadata(model_path).get('version')
+    if version is None:
+        return None
+    try:
+        with open(os.path.join(evaluation_dir(version, model_path), 'metrics.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,35 @@
+import os
+import json
+from app.config.config import HYPERPARAMS_PATH
+
+# Settings of the TF-IDF model when no configuration has been promoted by a sweep
+DEFAULT_HYPERPARAMETERS = {
+    'max_features': 5000,
+    'ngram_range': [1, 1],
+    'C': 1.0,
+}
+
+def load_hyperparameters(path=HYPERPARAMS_PATH):
+    """Return the TF-IDF model hyperparameters promoted by the last sweep, or the defaults."""
+    hyperparameters = dict(DEFAULT_HYPERPARAMETERS)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            promoted = json.load(f)
+        hyperparameters.update({key: promoted[key] for key in DEFAULT_HYPERPARAMETERS if key in promoted})
+    return hyperparameters
+
+def save_hyperparameters(hyperparameters, path=HYPERPARAMS_PATH, **details):
+    """Promote a configuration: later TF-IDF trainings use these hyperparameters.
+
+    Args:
+        hyperparameters (dict): Values for the keys of DEFAULT_HYPERPARAMETERS.
+        **details: Extra information stored alongside (scores, sweep directory).
+    """
+    promoted = {key: hyperparameters[key] for key in DEFAULT_HYPERPARAMETERS}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({**promoted, **details}, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,268 @@
+import os
+import json
+import glob
+import shutil
+import pickle
+from datetime import datetime, timezone
+import numpy as np
+from app.config.config import MODEL_PATH, MODEL_MMAP, INFERENCE_MODE, COMPILED_SCORER_MAX_BATCH, SCORE_CHUNK_SIZE
+from app.models.compiled_scorer import CompiledScorer
+from app.models.text_normalizer import TextNormalizer, LEGACY_STEPS
+from app.utils.metrics import STAGE_SECONDS
+
+VECTORIZE_SECONDS = STAGE_SECONDS.labels(stage='vectorize')
+PREDICT_PROBA_SECONDS = STAGE_SECONDS.labels(stage='predict_proba')
+PIPELINE_SECONDS = STAGE_SECONDS.labels(stage='pipeline')
+
+def new_version():
+    """Return a new, sortable model version identifier."""
+    return datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')
+
+def _atomic_write(path, write):
+    """Write a file through a temporary file so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+class ModelBundle:
+    """A complete, consistent snapshot of a trained sentiment model.
+
+    A bundle holds both sklearn pipelines together with everything derived from them
+    (fused weights, compiled scorer) and the model version. Bundles are never modified
+    after construction: installing a new model means replacing the reference to the
+    whole bundle, so a request that took a reference keeps scoring with a matching
+    pair of heads even if a retrain completes mid-request.
+
+    A bundle loaded from the memory-mapped scoring artifact (see load_mmap()) has no
+    sklearn pipelines and scores every batch with its compiled scorer.
+    """
+
+    def __init__(self, model_positive, model_negative, version=None, metadata=None, compiled_scorer=None):
+        """Initialize the bundle and prepare its inference paths.
+
+        Args:
+            model_positive (Pipeline): Fitted positive sentiment pipeline, or None for
+                a scorer-only bundle.
+            model_negative (Pipeline): Fitted negative sentiment pipeline, or None for
+                a scorer-only bundle.
+            version (str): Model version identifier (a new one is generated if omitted).
+            metadata (dict): Extra information saved alongside the model. Its
+                'normalization' entry lists the text normalization steps the model
+                was trained with (models without it were only lowercased).
+            compiled_scorer (CompiledScorer): Scorer to use instead of compiling one
+                from the pipelines.
+        """
+        self.model_positive = model_positive
+        self.model_negative = model_negative
+        self.version = version or new_version()
+        self.metadata = dict(metadata or {})
+        # Normalize texts with the steps the model was trained with
+        self.normalizer = TextNormalizer(self.metadata.get('normalization', LEGACY_STEPS))
+        if model_positive is None or model_negative is None:
+            self.fused_vectorizer = self.fused_weights = self.fused_intercepts = None
+            self.compiled_scorer = compiled_scorer
+        else:
+            self.fused_vectorizer, self.fused_weights, self.fused_intercepts = self._fuse_heads()
+            self.compiled_scorer = compiled_scorer or self._compile_scorer()
+
+    def _fuse_heads(self):
+        """Stack both logistic heads into one weight matrix over a shared feature space.
+
+        Models trained by SentimentModel always share their vectorizer (TF-IDF, or
+        hashing for incremental models). Older model files trained with two independent
+        TF-IDF vectorizers are only fused when their vocabularies and IDF weights are
+        identical; otherwise predictions use both pipelines.
+
+        Returns:
+            tuple: (vectorizer, weights, intercepts), or three Nones if the heads cannot be fused.
+        """
+        vectorizer_pos = self.model_positive.steps[0][1]
+        vectorizer_neg = self.model_negative.steps[0][1]
+        clf_pos = self.model_positive.named_steps['clf']
+        clf_neg = self.model_negative.named_steps['clf']
+
+        if len(clf_pos.classes_) != 2 or len(clf_neg.classes_) != 2:
+            return None, None, None
+        if vectorizer_pos is not vectorizer_neg and not _same_features(vectorizer_pos, vectorizer_neg):
+            return None, None, None
+
+        weights = np.column_stack([clf_pos.coef_[0], clf_neg.coef_[0]])
+        intercepts = np.array([clf_pos.intercept_[0], clf_neg.intercept_[0]])
+        return vectorizer_pos, weights, intercepts
+
+    def _compile_scorer(self):
+        """Build the pure NumPy scorer from the fitted pipelines, if they support it."""
+        try:
+            return CompiledScorer.from_pipelines(self.model_positive, self.model_negative)
+        except ValueError as e:
+            print(f"Compiled scorer unavailable: {e}")
+            return None
+
+    def score(self, processed_texts):
+        """Score preprocessed texts with the inference path selected by INFERENCE_MODE.
+
+        Batches larger than SCORE_CHUNK_SIZE are scored in fixed-size chunks, so the
+        feature matrix and intermediate arrays of one call stay bounded whatever the
+        batch size.
+        """
+        if SCORE_CHUNK_SIZE and len(processed_texts) > SCORE_CHUNK_SIZE:
+            return np.concatenate([
+                self._score_batch(processed_texts[start:start + SCORE_CHUNK_SIZE])
+                for start in range(0, len(processed_texts), SCORE_CHUNK_SIZE)
+            ])
+        return self._score_batch(processed_texts)
+
+    def _score_batch(self, processed_texts):
+        """Score one chunk of preprocessed texts."""
+        if self.model_positive is None:
+            return self.compiled_scorer.predict_sentiment(processed_texts)
+        if INFERENCE_MODE == 'pipeline':
+            return self.predict_pipelines(processed_texts)
+        if self.compiled_scorer is not None and len(processed_texts) <= COMPILED_SCORER_MAX_BATCH:
+            return self.compiled_scorer.predict_sentiment(processed_texts)
+        if self.fused_weights is not None:
+            return self.predict_fused(processed_texts)
+        return self.predict_pipelines(processed_texts)
+
+    def predict_pipelines(self, processed_texts):
+        """Score preprocessed texts by running both sklearn pipelines (reference path)."""
+        # Predict positive and negative probabilities (each pipeline vectorizes on its own)
+        with PIPELINE_SECONDS.time():
+            pos_probs = self.model_positive.predict_proba(processed_texts)[:, 1]
+            neg_probs = self.model_negative.predict_proba(processed_texts)[:, 1]
+
+        # Calculate sentiment scores between -1 and 1
+        # Positive sentiment increases the score, negative sentiment decreases it
+        sentiment_scores = pos_probs - neg_probs
+
+        return sentiment_scores
+
+    def predict_fused(self, processed_texts):
+        """Score preprocessed texts with a single vectorization and one weight product."""
+        # sklearn's own sigmoid, for bit-identical scores (scipy is loaded with the pipelines anyway)
+        from scipy.special import expit
+        
+        with VECTORIZE_SECONDS.time():
+            features = self.fused_vectorizer.transform(processed_texts)
+        # (n_texts x n_features) @ (n_features x 2) -> positive and negative probabilities
+        with PREDICT_PROBA_SECONDS.time():
+            probs = expit(features @ self.fused_weights + self.fused_intercepts)
+        return probs[:, 0] - probs[:, 1]
+
+    def save(self, model_path=MODEL_PATH):
+        """Save the bundle next to model_path.
+
+        Every file is written atomically, and the metadata file holding the version is
+        written last, once the pipelines and the scoring artifact are in place.
+
+        The compact scoring artifact is written to its own versioned directory
+        (<model_path>_scorer_<version>) that the metadata file points to. Workers that
+        still memory-map the previous version keep a valid mapping; older directories
+        are removed.
+        """
+        _atomic_write(f"{model_path}_positive.pkl", lambda f: pickle.dump(self.model_positive, f))
+        _atomic_write(f"{model_path}_negative.pkl", lambda f: pickle.dump(self.model_negative, f))
+
+        metadata = {**self.metadata, 'version': self.version}
+
+        # Export the compact scoring artifact alongside the pipelines
+        if self.compiled_scorer is not None:
+            scorer_dir = f"{model_path}_scorer_{self.version}"
+            # Never rewrite an artifact in place: other processes may have it mapped
+            if not os.path.isdir(scorer_dir):
+                self.compiled_scorer.save(f"{scorer_dir}.tmp")
+                os.replace(f"{scorer_dir}.tmp", scorer_dir)
+            metadata['scorer'] = os.path.basename(scorer_dir)
+        else:
+            metadata.pop('scorer', None)
+
+        previous_scorer = read_metadata(model_path).get('scorer')
+        _atomic_write(f"{model_path}_meta.json",
+                      lambda f: f.write(json.dumps(metadata, indent=2).encode('utf-8')))
+
+        # Keep the current and the previous artifact, remove anything older
+        keep = {metadata.get('scorer'), previous_scorer}
+        for path in glob.glob(f"{glob.escape(model_path)}_scorer_*"):
+            if os.path.basename(path) not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def exists(model_path=MODEL_PATH):
+        """Return True if a saved model is available at model_path."""
+        return os.path.exists(f"{model_path}_positive.pkl") and os.path.exists(f"{model_path}_negative.pkl")
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH):
+        """Load a bundle saved by save() (or by older versions, which have no metadata file)."""
+        with open(f"{model_path}_positive.pkl", 'rb') as f:
+            model_positive = pickle.load(f)
+        with open(f"{model_path}_negative.pkl", 'rb') as f:
+            model_negative = pickle.load(f)
+
+        metadata = read_metadata(model_path)
+        version = metadata.pop('version', None)
+        if version is None:
+            # Models saved before metadata existed: derive a stable version from the file
+            mtime = os.path.getmtime(f"{model_path}_positive.pkl")
+            version = datetime.fromtimestamp(mtime, timezone.utc).strftime('%Y%m%d%H%M%S%f')
+
+        return cls(model_positive, model_negative, version=version, metadata=metadata)
+
+    @classmethod
+    def load_mmap(cls, model_path=MODEL_PATH):
+        """Load a scorer-only bundle whose arrays are memory-mapped read-only.
+
+        Nothing is unpickled: the vocabulary, IDF and coefficients stay in the page
+        cache, shared by every process serving the same model.
+
+        Returns:
+            ModelBundle: The bundle, or None if the model has no scoring artifact.
+        """
+        metadata = read_metadata(model_path)
+        scorer_name = metadata.pop('scorer', None)
+        if scorer_name is None:
+            return None
+
+        scorer_dir = os.path.join(os.path.dirname(model_path), scorer_name)
+        if not os.path.isdir(scorer_dir):
+            return None
+
+        version = metadata.pop('version')
+        compiled_scorer = CompiledScorer.load(scorer_dir, mmap_mode='r')
+        return cls(None, None, version=version, metadata={**metadata, 'scorer': scorer_name},
+                   compiled_scorer=compiled_scorer)
+
+def _same_features(vectorizer_a, vectorizer_b):
+    """Return True if two fitted vectorizers produce identical feature matrices."""
+    if type(vectorizer_a) is not type(vectorizer_b) or vectorizer_a.get_params() != vectorizer_b.get_params():
+        return False
+    if hasattr(vectorizer_a, 'vocabulary_'):
+        return (vectorizer_a.vocabulary_ == vectorizer_b.vocabulary_
+                and np.array_equal(vectorizer_a.idf_, vectorizer_b.idf_))
+    # Stateless vectorizers (HashingVectorizer) only depend on their parameters
+    return True
+
+def load_bundle(model_path=MODEL_PATH):
+    """Load the saved model in the best available format.
+
+    The memory-mapped scoring artifact is used when it exists, MODEL_MMAP is enabled
+    and the sklearn pipelines are not required (INFERENCE_MODE 'pipeline'); otherwise
+    the pickled pipelines are loaded. Models that cannot be compiled (incremental
+    hashing models, n-gram TF-IDF models) have no artifact and are always served from
+    the pickled pipelines, with the fused path.
+    """
+    if MODEL_MMAP and INFERENCE_MODE != 'pipeline':
+        bundle = ModelBundle.load_mmap(model_path)
+        if bundle is not None:
+            return bundle
+        print("No memory-mapped scoring artifact for this model, loading the pickled pipelines")
+    return ModelBundle.load(model_path)
+
+def read_metadata(model_path=MODEL_PATH):
+    """Read the metadata saved with a model, or an empty dict if there is none."""
+    meta_path = f"{model_path}_meta.json"
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,92 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+class PredictionCache:
+    """Thread-safe LRU cache of sentiment scores keyed on the preprocessed text.
+
+    Entries belong to a model version. Installing a new model calls invalidate(),
+    which drops every entry, and reads or writes for any other model version are
+    ignored so an in-flight request cannot repopulate the cache with stale scores.
+    """
+
+    def __init__(self, max_size, ttl=0):
+        """Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of cached scores.
+            ttl (float): Time to live of an entry in seconds (0 means no expiry).
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text):
+        """Return the cache key of a preprocessed text."""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def get_many(self, keys, version):
+        """Look up several keys at once for the given model version.
+
+        Returns:
+            dict: Mapping from key to cached score for every key that was found.
+        """
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            if version != self.version:
+                self.misses += len(keys)
+                return found
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl and entry[1] < now:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[0]
+                self.hits += 1
+        return found
+
+    def put_many(self, items, version):
+        """Store (key, score) pairs computed with the given model version."""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if version != self.version:
+                return
+            for key, score in items:
+                self._entries[key] = (score, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version):
+        """Drop all entries and start caching scores of a new model version."""
+        with self._lock:
+            self._entries.clear()
+            self.version = version
+
+    def stats(self):
+        """Return the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
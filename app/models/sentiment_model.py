@@ -1,23 +1,67 @@
 import os
-import pickle
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
-import matplotlib.pyplot as plt
-import seaborn as sns
-from app.config.config import MODEL_PATH, TEST_SIZE, RANDOM_STATE
-from app.utils.db_utils import get_training_data
+from app.config.config import (MODEL_PATH, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL,
+                               RETRAIN_IN_SUBPROCESS, RETRAIN_NICENESS, RETRAIN_INCREMENTAL)
+from app.models.model_bundle import ModelBundle, load_bundle, read_metadata
+from app.models.prediction_cache import PredictionCache
+from app.models.text_normalizer import TextNormalizer, LEGACY_STEPS
+from app.models.hyperparameters import DEFAULT_HYPERPARAMETERS, load_hyperparameters
+from app.utils.metrics import STAGE_SECONDS, BATCH_SIZE, MODEL_INFO, RETRAIN_SECONDS
+
+# Histograms of the scoring stages outside the model bundle
+PREPROCESS_SECONDS = STAGE_SECONDS.labels(stage='preprocess')
+CACHE_LOOKUP_SECONDS = STAGE_SECONDS.labels(stage='cache_lookup')
+CACHE_STORE_SECONDS = STAGE_SECONDS.labels(stage='cache_store')
+MODEL_BATCH_SIZE = BATCH_SIZE.labels(source='model')
+
+# Training, evaluation and database access are imported on first use (see train_model),
+# so the serving path only loads what it needs for scoring.
 
 class SentimentModel:
-    def __init__(self):
-        """Initialize the sentiment analysis model."""
-        self.model_positive = None
-        self.model_negative = None
-        self.load_or_train_model()
+    def __init__(self, load=True):
+        """Initialize the sentiment analysis model.
+
+        Args:
+            load (bool): Load the model from disk (or train it) right away. Pass False
+                to start with an empty model and call fit_models() yourself.
+        """
+        # The installed ModelBundle. It is only ever replaced as a whole, so readers
+        # take one reference and get a consistent snapshot of both heads.
+        self.bundle = None
+        self.prediction_cache = None
+        if PREDICTION_CACHE_SIZE > 0:
+            self.prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+        if load:
+            self.load_or_train_model()
+
+    @property
+    def model_positive(self):
+        """The positive sentiment pipeline of the installed model."""
+        return self.bundle.model_positive if self.bundle is not None else None
+
+    @property
+    def model_negative(self):
+        """The negative sentiment pipeline of the installed model."""
+        return self.bundle.model_negative if self.bundle is not None else None
+
+    @property
+    def compiled_scorer(self):
+        """The pure NumPy scorer of the installed model."""
+        return self.bundle.compiled_scorer if self.bundle is not None else None
+
+    @property
+    def normalizer(self):
+        """The text normalizer of the installed model, or the configured one if there is none."""
+        return self.bundle.normalizer if self.bundle is not None else TextNormalizer()
+
+    @property
+    def model_version(self):
+        """The version of the installed model."""
+        return self.bundle.version if self.bundle is not None else None
 
     def load_or_train_model(self):
         """Load the model from disk if it exists, otherwise train a new model."""
@@ -25,12 +69,9 @@ class SentimentModel:
         if not os.path.exists(model_dir):
             os.makedirs(model_dir)
         
-        if os.path.exists(f"{MODEL_PATH}_positive.pkl") and os.path.exists(f"{MODEL_PATH}_negative.pkl"):
+        if ModelBundle.exists():
             try:
-                with open(f"{MODEL_PATH}_positive.pkl", 'rb') as f:
-                    self.model_positive = pickle.load(f)
-                with open(f"{MODEL_PATH}_negative.pkl", 'rb') as f:
-                    self.model_negative = pickle.load(f)
+                self.install_bundle(load_bundle())
                 return
             except Exception as e:
                 print(f"Error loading model: {e}")
@@ -38,151 +79,346 @@ class SentimentModel:
         
         self.train_model()
 
-    def preprocess_text(self, texts):
-        """Preprocess the text data for model training and prediction."""
-        # This is a simple implementation. In a production system, you would want to
-        # implement more sophisticated text preprocessing here.
-        return [text.lower() for text in texts]
+    def preprocess_text(self, texts, normalizer=None):
+        """Preprocess the text data for model training and prediction.
+        
+        Args:
+            texts (iterable): The texts to preprocess.
+            normalizer (TextNormalizer): Normalizer to use instead of the installed
+                model's. Training passes the normalizer of the model being trained.
+        """
+        return (normalizer or self.normalizer).normalize(texts)
 
-    def train_model(self):
-        """Train the sentiment analysis model."""
-        # Get training data from the database
-        df = get_training_data()
+    def train_model(self, data=None):
+        """Train the sentiment analysis model.
+        
+        Args:
+            data (tuple): Training data to use instead of the database, in the format
+                returned by load_training_data() (used by the benchmarks).
+        
+        The model is saved before it is evaluated: the evaluation runs afterwards in a
+        background thread (see app/models/evaluation.py).
+        
+        Returns:
+            dict: Wall-clock duration of each training phase in seconds.
+        """
+        from app.models import training, evaluation
+        
+        timings = {}
+        start = time.perf_counter()
+        # Data passed in is expected to be preprocessed with the configured steps
+        normalizer = TextNormalizer()
+        
+        fingerprint = None
+        if data is None:
+            from app.utils.db_utils import get_dataset_fingerprint
+            
+            # Fingerprint the data before reading it: rows added meanwhile only make the
+            # next retrain run instead of being skipped
+            fingerprint = get_dataset_fingerprint()
         
-        if df.empty or len(df) < 10:
+        with training.timed(timings, 'load_data'):
+            X, y_positive, y_negative, watermark = self.load_training_data(normalizer) if data is None else data
+        
+        test_set = None
+        if len(X) < 10:
             print("Not enough training data. Using default model.")
-            # Create simple models with default parameters
-            self.model_positive = Pipeline([
-                ('tfidf', TfidfVectorizer(max_features=5000)),
-                ('clf', LogisticRegression(random_state=RANDOM_STATE))
-            ])
-            self.model_negative = Pipeline([
-                ('tfidf', TfidfVectorizer(max_features=5000)),
-                ('clf', LogisticRegression(random_state=RANDOM_STATE))
-            ])
-            # Fit with dummy data
+            # Fit simple models with default parameters on dummy data
             dummy_X = ["This is a positive text", "This is a negative text"]
             dummy_y_pos = [1, 0]
             dummy_y_neg = [0, 1]
-            self.model_positive.fit(dummy_X, dummy_y_pos)
-            self.model_negative.fit(dummy_X, dummy_y_neg)
+            self.fit_models(normalizer.normalize(dummy_X), dummy_y_pos, dummy_y_neg,
+                            metadata={'fingerprint': fingerprint}, normalizer=normalizer)
         else:
-            # Preprocess text
-            X = self.preprocess_text(df['text'].tolist())
-            y_positive = df['positive'].values
-            y_negative = df['negative'].values
-            
             # Split data into training and testing sets
-            X_train, X_test, y_pos_train, y_pos_test, y_neg_train, y_neg_test = train_test_split(
-                X, y_positive, y_negative, test_size=TEST_SIZE, random_state=RANDOM_STATE
+            X_train, X_test, y_pos_train, y_pos_test, y_neg_train, y_neg_test = training.split_dataset(
+                X, y_positive, y_negative
             )
             
-            # Create and train the positive sentiment model
-            self.model_positive = Pipeline([
-                ('tfidf', TfidfVectorizer(max_features=5000)),
-                ('clf', LogisticRegression(random_state=RANDOM_STATE))
-            ])
-            self.model_positive.fit(X_train, y_pos_train)
-            
-            # Create and train the negative sentiment model
-            self.model_negative = Pipeline([
-                ('tfidf', TfidfVectorizer(max_features=5000)),
-                ('clf', LogisticRegression(random_state=RANDOM_STATE))
-            ])
-            self.model_negative.fit(X_train, y_neg_train)
-            
-            # Evaluate the models
-            self.evaluate_model(X_test, y_pos_test, y_neg_test)
+            # Create and train the positive and negative sentiment models
+            hyperparameters = load_hyperparameters()
+            self.fit_models(X_train, y_pos_train, y_neg_train,
+                            metadata={'model_type': 'full', 'watermark': watermark, 'trained_rows': len(X),
+                                      'fingerprint': fingerprint, 'hyperparameters': hyperparameters},
+                            timings=timings, hyperparameters=hyperparameters, normalizer=normalizer)
+            test_set = (X_test, y_pos_test, y_neg_test)
         
         # Save the models
-        with open(f"{MODEL_PATH}_positive.pkl", 'wb') as f:
-            pickle.dump(self.model_positive, f)
-        with open(f"{MODEL_PATH}_negative.pkl", 'wb') as f:
-            pickle.dump(self.model_negative, f)
-
-    def evaluate_model(self, X_test, y_pos_test, y_neg_test):
-        """Evaluate the model performance and generate confusion matrices."""
-        # Predict on test data
-        y_pos_pred = self.model_positive.predict(X_test)
-        y_neg_pred = self.model_negative.predict(X_test)
-        
-        # Generate confusion matrices
-        cm_positive = confusion_matrix(y_pos_test, y_pos_pred)
-        cm_negative = confusion_matrix(y_neg_test, y_neg_pred)
-        
-        # Calculate precision, recall, and F1-score
-        precision_pos, recall_pos, f1_pos, _ = precision_recall_fscore_support(y_pos_test, y_pos_pred, average='binary')
-        precision_neg, recall_neg, f1_neg, _ = precision_recall_fscore_support(y_neg_test, y_neg_pred, average='binary')
-        
-        # Save evaluation metrics
-        metrics = {
-            'positive': {
-                'precision': precision_pos,
-                'recall': recall_pos,
-                'f1_score': f1_pos
-            },
-            'negative': {
-                'precision': precision_neg,
-                'recall': recall_neg,
-                'f1_score': f1_neg
-            }
-        }
-        
-        with open(os.path.join(os.path.dirname(MODEL_PATH), 'evaluation_metrics.pkl'), 'wb') as f:
-            pickle.dump(metrics, f)
-        
-        # Plot and save confusion matrices
-        self._plot_confusion_matrix(cm_positive, 'Positive Sentiment Confusion Matrix', 
-                                   os.path.join(os.path.dirname(MODEL_PATH), 'confusion_matrix_positive.png'))
-        self._plot_confusion_matrix(cm_negative, 'Negative Sentiment Confusion Matrix', 
-                                   os.path.join(os.path.dirname(MODEL_PATH), 'confusion_matrix_negative.png'))
-        
-        print(f"Model evaluation completed. Metrics saved to {os.path.dirname(MODEL_PATH)}")
-
-    def _plot_confusion_matrix(self, cm, title, save_path):
-        """Plot and save a confusion matrix."""
-        plt.figure(figsize=(8, 6))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
-                   xticklabels=['Negative', 'Positive'], 
-                   yticklabels=['Negative', 'Positive'])
-        plt.title(title)
-        plt.ylabel('True Label')
-        plt.xlabel('Predicted Label')
-        plt.tight_layout()
-        plt.savefig(save_path)
-        plt.close()
+        with training.timed(timings, 'save'):
+            self.bundle.save()
+        
+        # Evaluate the published model in the background
+        if test_set is not None:
+            evaluation.submit_evaluation(self.bundle, *test_set)
+        
+        timings['total'] = time.perf_counter() - start
+        print(f"Training phase timings: {training.format_timings(timings)}")
+        return timings
+
+    def load_training_data(self, normalizer=None):
+        """Stream the training data from the database.
+        
+        Only the preprocessed texts and compact label arrays are kept; no per-row
+        objects are built.
+        
+        Args:
+            normalizer (TextNormalizer): Normalizer of the model being trained
+                (defaults to the configured steps).
+        
+        Returns:
+            tuple: (texts, y_positive, y_negative, watermark), where watermark is the
+                id of the last tweet read.
+        """
+        from app.utils.db_utils import iter_training_data
+        
+        normalizer = normalizer or TextNormalizer()
+        X, y_positive, y_negative = [], [], []
+        watermark = 0
+        for chunk in iter_training_data():
+            X.extend(self.preprocess_text(chunk['text'], normalizer))
+            y_positive.append(chunk['positive'])
+            y_negative.append(chunk['negative'])
+            watermark = int(chunk['id'][-1])
+        
+        if not X:
+            return X, np.array([], dtype=np.int8), np.array([], dtype=np.int8), watermark
+        return X, np.concatenate(y_positive), np.concatenate(y_negative), watermark
+
+    def fit_models(self, X, y_positive, y_negative, metadata=None, timings=None, hyperparameters=None,
+                   normalizer=None):
+        """Fit the positive and negative models and install them as a new bundle.
+        
+        X must be preprocessed with normalizer (defaults to the configured steps),
+        whose steps are saved in the bundle metadata for prediction.
+        """
+        from app.models import training
+        
+        normalizer = normalizer or TextNormalizer()
+        model_positive, model_negative = training.fit_pipelines(X, y_positive, y_negative, timings=timings,
+                                                                hyperparameters=hyperparameters)
+        metadata = {**(metadata or {}), 'normalization': normalizer.steps}
+        self.install_bundle(ModelBundle(model_positive, model_negative, metadata=metadata))
+
+    def train_incremental(self, full=False):
+        """Update the incremental model with the tweets added since the last training run.
+        
+        The saved model's metadata holds a watermark: the id of the last tweet it was
+        trained on. Only newer tweets are fetched, and both heads are updated with
+        partial_fit, so the cost depends on the number of new tweets rather than the
+        size of the table.
+        
+        A new incremental model is trained on all tweets, one chunk at a time, when
+        full is set or when the saved model is not an incremental one (for example a
+        TF-IDF model from train_model()).
+        
+        The tweets selected by training.holdout_mask() are never trained on. Those
+        fetched by this run are used to evaluate the saved model in the background,
+        like the test set of train_model().
+        
+        Returns:
+            int: Number of tweets the model was updated with.
+        """
+        from app.models import training, evaluation
+        from app.utils.db_utils import iter_training_data, get_dataset_fingerprint
+        
+        fingerprint = get_dataset_fingerprint()
+        hyperparameters = load_hyperparameters()
+        bundle = ModelBundle.load() if not full and ModelBundle.exists() else None
+        # Models built with other hyperparameters (a newly promoted sweep winner) are rebuilt
+        if (bundle is not None and bundle.metadata.get('model_type') == 'incremental'
+                and bundle.metadata.get('hyperparameters', DEFAULT_HYPERPARAMETERS) == hyperparameters):
+            # Freshly unpickled pipelines, so updating them never touches a served model
+            model_positive, model_negative = bundle.model_positive, bundle.model_negative
+            watermark = bundle.metadata['watermark']
+            trained_rows = bundle.metadata.get('trained_rows', 0)
+            # Keep normalizing new tweets like the ones the model was trained on
+            normalizer = bundle.normalizer
+        else:
+            model_positive, model_negative = training.build_incremental_pipelines(hyperparameters)
+            watermark = trained_rows = 0
+            normalizer = TextNormalizer()
+        
+        new_rows = 0
+        X_test, y_pos_test, y_neg_test = [], [], []
+        for chunk in iter_training_data(after_id=watermark):
+            texts = np.array(self.preprocess_text(chunk['text'], normalizer), dtype=object)
+            held_out = training.holdout_mask(chunk['id'])
+            train = ~held_out
+            if train.any():
+                training.partial_fit_pipelines(model_positive, model_negative, texts[train],
+                                               chunk['positive'][train], chunk['negative'][train])
+                new_rows += int(train.sum())
+            X_test.extend(texts[held_out])
+            y_pos_test.append(chunk['positive'][held_out])
+            y_neg_test.append(chunk['negative'][held_out])
+            watermark = int(chunk['id'][-1])
+        
+        if new_rows == 0:
+            if bundle is None or bundle.metadata.get('model_type') != 'incremental':
+                # Nothing to train the new model on: fall back to the default model
+                self.train_model()
+            else:
+                print(f"No new tweets since id {bundle.metadata['watermark']}. Keeping model version {bundle.version}.")
+                if self.model_version != bundle.version:
+                    self.install_bundle(bundle)
+            return 0
+        
+        metadata = {'model_type': 'incremental', 'watermark': watermark, 'trained_rows': trained_rows + new_rows,
+                    'fingerprint': fingerprint, 'normalization': normalizer.steps, 'hyperparameters': hyperparameters}
+        self.install_bundle(ModelBundle(model_positive, model_negative, metadata=metadata))
+        self.bundle.save()
+        
+        # Evaluate the published model on the new held-out tweets in the background
+        if X_test:
+            evaluation.submit_evaluation(self.bundle, X_test, np.concatenate(y_pos_test), np.concatenate(y_neg_test))
+        print(f"Incremental training on {new_rows} new tweets completed (watermark {watermark}).")
+        return new_rows
+
+    def install_bundle(self, bundle):
+        """Atomically replace the installed model with a new bundle.
+
+        The prediction cache is switched to the new version first, so scores computed
+        by requests still holding the previous bundle are never cached; then the
+        bundle reference itself is replaced in a single assignment.
+        """
+        if self.prediction_cache is not None:
+            self.prediction_cache.invalidate(bundle.version)
+        self.bundle = bundle
+        MODEL_INFO.clear()
+        MODEL_INFO.labels(version=bundle.version).set(1)
+
+    def evaluate_model(self, X_test, y_pos_test, y_neg_test, timings=None):
+        """Evaluate the installed model and generate confusion matrices, waiting for the result.
+        
+        The metrics are also saved next to the model version, as after training.
+        """
+        from app.models import training, evaluation
+        
+        with training.timed(timings, 'evaluate'):
+            return evaluation.submit_evaluation(self.bundle, X_test, y_pos_test, y_neg_test).result()
 
     def predict_sentiment(self, texts):
         """Predict sentiment scores for a list of texts."""
         # Ensure models are loaded
-        if self.model_positive is None or self.model_negative is None:
+        if self.bundle is None:
             self.load_or_train_model()
         
-        # Preprocess texts
-        processed_texts = self.preprocess_text(texts)
+        # Score the whole request with one snapshot of the model
+        bundle = self.bundle
+        
+        # Preprocess texts exactly as the snapshot's training data was
+        with PREPROCESS_SECONDS.time():
+            processed_texts = self.preprocess_text(texts, bundle.normalizer)
         
-        # Predict positive and negative probabilities
-        pos_probs = self.model_positive.predict_proba(processed_texts)[:, 1]
-        neg_probs = self.model_negative.predict_proba(processed_texts)[:, 1]
+        if self.prediction_cache is None:
+            MODEL_BATCH_SIZE.observe(len(processed_texts))
+            return bundle.score(processed_texts)
+        
+        # Serve repeated texts from the cache and score each distinct miss once
+        with CACHE_LOOKUP_SECONDS.time():
+            keys = [PredictionCache.key(text) for text in processed_texts]
+            scores = self.prediction_cache.get_many(keys, bundle.version)
+            
+            missing = {}
+            for key, text in zip(keys, processed_texts):
+                if key not in scores and key not in missing:
+                    missing[key] = text
         
-        # Calculate sentiment scores between -1 and 1
-        # Positive sentiment increases the score, negative sentiment decreases it
-        sentiment_scores = pos_probs - neg_probs
+        if missing:
+            MODEL_BATCH_SIZE.observe(len(missing))
+            missing_scores = bundle.score(list(missing.values()))
+            with CACHE_STORE_SECONDS.time():
+                computed = dict(zip(missing.keys(), missing_scores.tolist()))
+                self.prediction_cache.put_many(computed.items(), bundle.version)
+                scores.update(computed)
         
-        return sentiment_scores
+        return np.array([scores[key] for key in keys])
 
-    def retrain_model(self):
-        """Retrain the model with the latest data."""
+    def retrain_model(self, full=False, force=False):
+        """Retrain the model with the latest data.
+        
+        Nothing is done when the fingerprint of the training data (row count, max id
+        and label checksum) matches the one saved with the current model, unless force
+        is set. Without RETRAIN_INCREMENTAL, promoting new hyperparameters (see
+        scripts/retrain_model.py --sweep) or changing TEXT_NORMALIZATION also
+        triggers a retrain.
+        
+        With RETRAIN_INCREMENTAL enabled, the model is only updated with the tweets
+        added since the last run (see train_incremental()); pass full=True to rebuild
+        it from all tweets instead.
+        
+        With RETRAIN_IN_SUBPROCESS enabled, training runs in a separate low-priority
+        process that saves a complete new bundle to disk. The serving process only
+        loads that bundle and swaps it in, so it keeps answering requests with the
+        previous model while training runs.
+        
+        Returns:
+            bool: True if the model was retrained, False if it was skipped.
+        """
+        from app.utils.db_utils import get_dataset_fingerprint
+        
+        if not force:
+            metadata = read_metadata()
+            saved_fingerprint = metadata.get('fingerprint')
+            # Incremental models keep the normalization they were built with (see train_incremental)
+            same_hyperparameters = (
+                metadata.get('hyperparameters', DEFAULT_HYPERPARAMETERS) == load_hyperparameters()
+                and (RETRAIN_INCREMENTAL or metadata.get('normalization', LEGACY_STEPS) == TextNormalizer().steps))
+            if saved_fingerprint is not None and same_hyperparameters and saved_fingerprint == get_dataset_fingerprint():
+                print(f"Training data unchanged since model version {self.model_version}. Skipping retraining.")
+                return False
+        
         print("Retraining sentiment analysis model...")
-        self.train_model()
-        print("Model retraining completed.")
+        mode = 'incremental' if RETRAIN_INCREMENTAL and not full else 'full'
+        with RETRAIN_SECONDS.labels(mode=mode).time():
+            if RETRAIN_IN_SUBPROCESS:
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_lower_priority) as executor:
+                    version = executor.submit(_train_and_save, full).result()
+                    if version != self.model_version:
+                        self.install_bundle(load_bundle())
+                    # The new model is already being served; let the training process
+                    # finish evaluating it before it exits
+                    executor.submit(_wait_for_evaluations).result()
+            else:
+                _train(self, full)
+        print(f"Model retraining completed. Installed model version {self.model_version}.")
+        return True
+
+def _lower_priority():
+    """Lower the CPU priority of the training process."""
+    if hasattr(os, 'nice'):
+        os.nice(RETRAIN_NICENESS)
+
+def _train(model, full):
+    """Run the configured training mode on a model."""
+    if RETRAIN_INCREMENTAL:
+        model.train_incremental(full=full)
+    else:
+        model.train_model()
+
+def _train_and_save(full=False):
+    """Train and save a new model bundle (runs in the training process)."""
+    model = SentimentModel(load=False)
+    _train(model, full)
+    return model.model_version
+
+def _wait_for_evaluations():
+    """Wait for the background evaluation of the trained model (runs in the training process)."""
+    from app.models.evaluation import wait_for_evaluations
+    
+    wait_for_evaluations()
 
 # Singleton instance of the model
 model_instance = None
+_model_instance_lock = threading.Lock()
 
 def get_model_instance():
     """Get the singleton instance of the SentimentModel."""
     global model_instance
     if model_instance is None:
-        model_instance = SentimentModel()
+        # Only one thread may load or train the model on concurrent first requests
+        with _model_instance_lock:
+            if model_instance is None:
+                model_instance = SentimentModel()
     return model_instance
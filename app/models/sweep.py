@@ -0,0 +1,298 @@
+"""
+Hyperparameter sweep for the TF-IDF sentiment model.
+
+The corpus is tokenized once. For every n-gram range in the grid, the term counts
+of the whole corpus are computed once and cached on disk as per-fold sparse
+matrices. Each candidate (max_features, ngram_range, C) then only selects its
+vocabulary from the cached counts, applies the TF-IDF weighting and fits the two
+logistic heads, so candidates are evaluated in a process pool without ever
+re-tokenizing the corpus.
+
+Like app/models/training.py, this module is only imported when a sweep runs.
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import normalize
+from app.config.config import RANDOM_STATE, SWEEP_DIR
+from app.models.hyperparameters import DEFAULT_HYPERPARAMETERS, save_hyperparameters
+
+# Settings used for any key missing from the sweep configuration file
+DEFAULT_SWEEP_CONFIG = {
+    'folds': 3,
+    'max_features': [DEFAULT_HYPERPARAMETERS['max_features']],
+    'ngram_range': [DEFAULT_HYPERPARAMETERS['ngram_range']],
+    'C': [DEFAULT_HYPERPARAMETERS['C']],
+    'workers': None,
+    # Latency is measured as the time to score one batch of this many tweets
+    'latency_batch_size': 64,
+    # Candidates slower or larger than these limits cannot be promoted (null: no limit)
+    'max_latency_ms': None,
+    'max_model_size_mb': None,
+}
+
+def load_sweep_config(path):
+    """Read a YAML sweep configuration and fill in the defaults."""
+    import yaml
+
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    unknown = set(config) - set(DEFAULT_SWEEP_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown sweep configuration keys: {', '.join(sorted(unknown))}")
+    return {**DEFAULT_SWEEP_CONFIG, **config}
+
+def iter_candidates(config):
+    """Yield every combination of the grid as a hyperparameter dict."""
+    for max_features, ngram_range, C in itertools.product(config['max_features'], config['ngram_range'], config['C']):
+        yield {'max_features': int(max_features), 'ngram_range': [int(n) for n in ngram_range], 'C': float(C)}
+
+class _NgramAnalyzer:
+    """Build word n-grams from pre-tokenized documents, like TfidfVectorizer does from text."""
+
+    def __init__(self, ngram_range):
+        self.min_n, self.max_n = ngram_range
+
+    def __call__(self, tokens):
+        if self.min_n == 1 and self.max_n == 1:
+            return tokens
+        ngrams = list(tokens) if self.min_n == 1 else []
+        for n in range(max(self.min_n, 2), self.max_n + 1):
+            ngrams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngrams
+
+def _corpus_key(texts, y_positive, y_negative, n_folds):
+    """Hash the corpus and fold count, to reuse a cache built from the same data."""
+    digest = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(np.asarray(y_positive, dtype=np.int8).tobytes())
+    digest.update(np.asarray(y_negative, dtype=np.int8).tobytes())
+    digest.update(str(n_folds).encode('ascii'))
+    return digest.hexdigest()
+
+def build_fold_cache(texts, y_positive, y_negative, ngram_ranges, n_folds, cache_dir):
+    """Tokenize the corpus once and cache the term counts of every fold on disk.
+
+    Layout of cache_dir: fold_<k>/labels.npz holds the row indices and labels of the
+    fold's training and test sets, and ngram_<min>_<max>/ holds terms.npy plus
+    fold_<k>_train.npz / fold_<k>_test.npz count matrices for each n-gram range.
+    Matrices already present are reused.
+
+    Returns:
+        str: cache_dir
+    """
+    folds = list(KFold(n_splits=n_folds, shuffle=True, random_state=RANDOM_STATE).split(texts))
+    y_positive = np.asarray(y_positive, dtype=np.int8)
+    y_negative = np.asarray(y_negative, dtype=np.int8)
+    for k, (train_index, test_index) in enumerate(folds):
+        path = os.path.join(cache_dir, f"fold_{k}", 'labels.npz')
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(path, train_index=train_index, test_index=test_index,
+                     y_pos_train=y_positive[train_index], y_pos_test=y_positive[test_index],
+                     y_neg_train=y_negative[train_index], y_neg_test=y_negative[test_index])
+
+    tokens = None
+    for ngram_range in ngram_ranges:
+        ngram_dir = os.path.join(cache_dir, f"ngram_{ngram_range[0]}_{ngram_range[1]}")
+        if os.path.exists(os.path.join(ngram_dir, 'terms.npy')):
+            continue
+        if tokens is None:
+            # Same tokenization as TfidfVectorizer's default analyzer, done once for all n-gram ranges
+            analyze = CountVectorizer().build_analyzer()
+            tokens = [analyze(text) for text in texts]
+
+        counter = CountVectorizer(analyzer=_NgramAnalyzer(ngram_range))
+        counts = counter.fit_transform(tokens).tocsr()
+        terms = np.array(sorted(counter.vocabulary_, key=counter.vocabulary_.get), dtype=str)
+
+        os.makedirs(f"{ngram_dir}.tmp", exist_ok=True)
+        for k, (train_index, test_index) in enumerate(folds):
+            sp.save_npz(os.path.join(f"{ngram_dir}.tmp", f"fold_{k}_train.npz"), counts[train_index])
+            sp.save_npz(os.path.join(f"{ngram_dir}.tmp", f"fold_{k}_test.npz"), counts[test_index])
+        np.save(os.path.join(f"{ngram_dir}.tmp", 'terms.npy'), terms)
+        os.replace(f"{ngram_dir}.tmp", ngram_dir)
+        print(f"Cached term counts for n-grams {tuple(ngram_range)}: {counts.shape[1]} terms")
+    return cache_dir
+
+def _tfidf_features(train_counts, test_counts, max_features):
+    """Reproduce TfidfVectorizer(max_features) on cached counts.
+
+    The max_features most frequent terms of the training fold are kept, weighted with
+    the smoothed IDF of the training fold and L2-normalized.
+
+    Returns:
+        tuple: (X_train, X_test, columns, idf)
+    """
+    term_frequencies = np.asarray(train_counts.sum(axis=0)).ravel()
+    columns = np.flatnonzero(term_frequencies)
+    if len(columns) > max_features:
+        columns = columns[np.argsort(-term_frequencies[columns], kind='stable')[:max_features]]
+    columns.sort()
+
+    train_counts = train_counts[:, columns]
+    document_frequencies = np.bincount(train_counts.indices, minlength=len(columns))
+    idf = np.log((1 + train_counts.shape[0]) / (1 + document_frequencies)) + 1
+    weights = sp.diags(idf)
+    X_train = normalize(train_counts @ weights)
+    X_test = normalize(test_counts[:, columns] @ weights)
+    return X_train, X_test, columns, idf
+
+def _measure_latency(terms, ngram_range, idf, coef, intercept, texts, batch_size, repeats=20):
+    """Median time in ms to score one batch with the candidate's vocabulary and weights.
+
+    Each repeat vectorizes the batch and computes the sentiment scores, like the
+    compiled scorer does.
+    """
+    vectorizer = CountVectorizer(vocabulary={term: i for i, term in enumerate(terms)},
+                                 ngram_range=tuple(ngram_range))
+    weights = sp.diags(idf)
+    batch = texts[:batch_size]
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        features = normalize(vectorizer.transform(batch) @ weights)
+        probs = 1.0 / (1.0 + np.exp(-(features @ coef + intercept)))
+        # Only the time to compute the scores is needed
+        probs[:, 0] - probs[:, 1]
+        durations.append(time.perf_counter() - start)
+    return float(np.median(durations)) * 1000
+
+def evaluate_candidate(candidate, cache_dir, n_folds, latency_texts, latency_batch_size):
+    """Cross-validate one candidate on the cached folds (runs in a worker process).
+
+    Returns:
+        dict: The candidate with its mean F1 per head, batch latency and model size.
+    """
+    ngram_dir = os.path.join(cache_dir, f"ngram_{candidate['ngram_range'][0]}_{candidate['ngram_range'][1]}")
+    f1_positive, f1_negative = [], []
+    for k in range(n_folds):
+        labels = np.load(os.path.join(cache_dir, f"fold_{k}", 'labels.npz'))
+        X_train, X_test, columns, idf = _tfidf_features(
+            sp.load_npz(os.path.join(ngram_dir, f"fold_{k}_train.npz")),
+            sp.load_npz(os.path.join(ngram_dir, f"fold_{k}_test.npz")),
+            candidate['max_features'],
+        )
+
+        heads = []
+        for head, scores in (('pos', f1_positive), ('neg', f1_negative)):
+            clf = LogisticRegression(C=candidate['C'], random_state=RANDOM_STATE)
+            clf.fit(X_train, labels[f"y_{head}_train"])
+            scores.append(f1_score(labels[f"y_{head}_test"], clf.predict(X_test), zero_division=0))
+            heads.append(clf)
+
+        if k == 0:
+            # Size and speed of the model fitted on the first fold
+            terms = np.load(os.path.join(ngram_dir, 'terms.npy'))[columns]
+            coef = np.column_stack([heads[0].coef_[0], heads[1].coef_[0]])
+            intercept = np.array([heads[0].intercept_[0], heads[1].intercept_[0]])
+            model_size = len(pickle.dumps(({term: i for i, term in enumerate(terms)}, idf, coef, intercept)))
+            latency_ms = _measure_latency(terms, candidate['ngram_range'], idf, coef, intercept,
+                                          latency_texts, latency_batch_size)
+
+    return {
+        **candidate,
+        'f1': float(np.mean(f1_positive) + np.mean(f1_negative)) / 2,
+        'f1_positive': float(np.mean(f1_positive)),
+        'f1_negative': float(np.mean(f1_negative)),
+        'latency_ms': latency_ms,
+        'model_size_mb': model_size / 1024 / 1024,
+    }
+
+def format_leaderboard(leaderboard):
+    """Format the leaderboard as a Markdown table."""
+    lines = [
+        "| Rank | max_features | ngram_range | C | F1 | F1 positive | F1 negative | Latency (ms/batch) | Model size (MB) |",
+        "| ---- | ------------ | ----------- | - | -- | ----------- | ----------- | ------------------ | --------------- |",
+    ]
+    for rank, entry in enumerate(leaderboard, start=1):
+        lines.append(f"| {rank} | {entry['max_features']} | {tuple(entry['ngram_range'])} | {entry['C']:g} "
+                     f"| {entry['f1']:.4f} | {entry['f1_positive']:.4f} | {entry['f1_negative']:.4f} "
+                     f"| {entry['latency_ms']:.2f} | {entry['model_size_mb']:.2f} |")
+    return '\n'.join(lines)
+
+def select_winner(leaderboard, config):
+    """Return the best-scoring candidate within the latency and size limits, or None."""
+    for entry in leaderboard:
+        if config['max_latency_ms'] is not None and entry['latency_ms'] > config['max_latency_ms']:
+            continue
+        if config['max_model_size_mb'] is not None and entry['model_size_mb'] > config['max_model_size_mb']:
+            continue
+        return entry
+    return None
+
+def run_sweep(config_path, texts, y_positive, y_negative, promote=True):
+    """Run a hyperparameter sweep on preprocessed texts and promote the winner.
+
+    Args:
+        config_path (str): YAML file with the grid (max_features, ngram_range, C
+            lists) and the sweep settings (see DEFAULT_SWEEP_CONFIG).
+        texts (list): Preprocessed training texts.
+        y_positive (array): Positive labels.
+        y_negative (array): Negative labels.
+        promote (bool): Save the winning configuration for the next trainings.
+
+    Returns:
+        tuple: (leaderboard, winner), the leaderboard sorted by F1 then latency.
+    """
+    config = load_sweep_config(config_path)
+    candidates = list(iter_candidates(config))
+    ngram_ranges = sorted({tuple(candidate['ngram_range']) for candidate in candidates})
+    n_folds = config['folds']
+
+    cache_dir = os.path.join(SWEEP_DIR, 'cache', _corpus_key(texts, y_positive, y_negative, n_folds))
+    start = time.perf_counter()
+    build_fold_cache(texts, y_positive, y_negative, ngram_ranges, n_folds, cache_dir)
+    print(f"Fold cache ready in {time.perf_counter() - start:.2f}s ({cache_dir})")
+
+    # Score batches of held-out style tweets, as the API does
+    latency_texts = list(texts[:config['latency_batch_size']])
+
+    start = time.perf_counter()
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=config['workers'], mp_context=context) as executor:
+        futures = [executor.submit(evaluate_candidate, candidate, cache_dir, n_folds, latency_texts,
+                                   config['latency_batch_size'])
+                   for candidate in candidates]
+        leaderboard = [future.result() for future in futures]
+    print(f"Evaluated {len(candidates)} candidates in {time.perf_counter() - start:.2f}s")
+
+    leaderboard.sort(key=lambda entry: (-entry['f1'], entry['latency_ms']))
+    winner = select_winner(leaderboard, config)
+
+    run_dir = os.path.join(SWEEP_DIR, datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S'))
+    os.makedirs(run_dir, exist_ok=True)
+    with open(os.path.join(run_dir, 'leaderboard.json'), 'w', encoding='utf-8') as f:
+        json.dump({'config': config, 'leaderboard': leaderboard, 'winner': winner}, f, indent=2)
+    with open(os.path.join(run_dir, 'leaderboard.md'), 'w', encoding='utf-8') as f:
+        f.write(format_leaderboard(leaderboard) + '\n')
+    print(format_leaderboard(leaderboard))
+    print(f"Leaderboard saved to {run_dir}")
+
+    if winner is None:
+        print("No candidate satisfies the latency and model size limits. Nothing promoted.")
+    elif promote:
+        save_hyperparameters(winner, f1=winner['f1'], latency_ms=winner['latency_ms'],
+                             model_size_mb=winner['model_size_mb'], sweep=run_dir)
+        print(f"Promoted max_features={winner['max_features']}, ngram_range={tuple(winner['ngram_range'])}, "
+              f"C={winner['C']:g} (F1 {winner['f1']:.4f}).")
+        if tuple(winner['ngram_range']) != (1, 1):
+            print(f"Warning: models trained with ngram_range={tuple(winner['ngram_range'])} cannot be compiled. "
+                  "They have no compiled scorer or memory-mapped scoring artifact and are served from the "
+                  "pickled pipelines.")
+    return leaderboard, winner
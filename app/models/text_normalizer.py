@@ -0,0 +1,93 @@
+"""
+Text normalization applied to tweets before training and scoring.
+
+Texts are NFKC-normalized (full-width and ligature forms become plain
+characters) and lowercased. URLs, @mentions and numbers are replaced with one
+token each (_url_, _user_, _num_). Hashtags lose their '#'. Letters repeated
+three or more times ("soooo") are shortened to two. Without this, every
+variant would be its own vocabulary entry and prediction cache key.
+
+Normalization works on whole batches: the texts are joined with a separator
+character, each precompiled regular expression runs once over the joined
+string, and the result is split again. This keeps the per-tweet cost to a
+few C-level passes, with no Python code per tweet and step.
+
+The steps a model was trained with are saved in its metadata (see
+ModelBundle.normalizer), so prediction always normalizes exactly as training
+did, even after TEXT_NORMALIZATION changes.
+"""
+
+import re
+import unicodedata
+from app.config.config import TEXT_NORMALIZATION
+
+# Joins the texts of a batch. It is whitespace for the regular expressions, so
+# no substitution matches across two texts, and no step produces it.
+SEPARATOR = '\x1e'
+
+# All steps, in the order they are applied
+STEPS = ['unicode', 'lowercase', 'urls', 'mentions', 'hashtags', 'numbers', 'elongations']
+
+# Steps of models saved before normalization was configurable
+LEGACY_STEPS = ['lowercase']
+
+# Precompiled (pattern, replacement) pairs of the regular expression steps. Patterns
+# starting with a literal are found with a fast substring search, so they are
+# preferred over more precise lookbehinds, which make the engine try every position.
+SUBSTITUTIONS = {
+    'urls': [(re.compile(r'https?://\S+'), '_url_'), (re.compile(r'www\.\S+'), '_url_')],
+    'mentions': [(re.compile(r'@\w+'), '_user_')],
+    'hashtags': [(re.compile(r'#(?=\w)'), '')],
+    'numbers': [(re.compile(r'\b\d+(?:[.,]\d+)*\b'), '_num_')],
+    # ASCII letters only: a Unicode letter class makes this step several times slower
+    'elongations': [(re.compile(r'([a-zA-Z])\1\1+'), r'\1\1')],
+}
+
+class TextNormalizer:
+    """Normalizes batches of texts with a fixed list of steps."""
+
+    def __init__(self, steps=None):
+        """Initialize the normalizer.
+
+        Args:
+            steps (list): Names of the steps to apply (see STEPS), in any order.
+                Defaults to the TEXT_NORMALIZATION configuration.
+
+        Raises:
+            ValueError: If a step is unknown.
+        """
+        steps = TEXT_NORMALIZATION if steps is None else steps
+        unknown = sorted(set(steps) - set(STEPS))
+        if unknown:
+            raise ValueError(f"Unknown text normalization steps: {', '.join(unknown)}")
+        self.steps = [step for step in STEPS if step in steps]
+        self._substitutions = [substitution for step in self.steps for substitution in SUBSTITUTIONS.get(step, [])]
+
+    def normalize(self, texts):
+        """Normalize a batch of texts.
+
+        Args:
+            texts (iterable): The texts to normalize.
+
+        Returns:
+            list: The normalized texts, in the same order.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        joined = SEPARATOR.join(texts)
+        if joined.count(SEPARATOR) != len(texts) - 1:
+            # A text contains the separator itself: normalize the texts one by one
+            return [self._normalize(text) for text in texts]
+        return self._normalize(joined).split(SEPARATOR)
+
+    def _normalize(self, text):
+        """Apply every step to one string."""
+        if 'unicode' in self.steps:
+            text = unicodedata.normalize('NFKC', text)
+        if 'lowercase' in self.steps:
+            text = text.lower()
+        for pattern, replacement in self._substitutions:
+            text = pattern.sub(replacement, text)
+        return text
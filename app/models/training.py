@@ -0,0 +1,129 @@
+"""
+Training of the sentiment analysis models.
+
+This module is imported lazily by SentimentModel on the first training run, so a
+serving process never loads sklearn's model selection module. Evaluation and
+plotting run after the model is published, in app/models/evaluation.py.
+"""
+
+import time
+from contextlib import contextmanager
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.model_selection import train_test_split
+from app.config.config import TEST_SIZE, RANDOM_STATE, HASHING_N_FEATURES, TRAINING_N_JOBS
+from app.models.hyperparameters import load_hyperparameters
+
+# SGDClassifier's logistic loss is called 'log_loss' since scikit-learn 1.1 ('log' before, removed in 1.3)
+LOG_LOSS = 'log_loss' if tuple(int(part) for part in sklearn.__version__.split('.')[:2]) >= (1, 1) else 'log'
+# SGDClassifier's default regularization, used for incremental models at C=1
+SGD_ALPHA = 1e-4
+
+@contextmanager
+def timed(timings, phase):
+    """Record the wall-clock duration of a training phase in seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = time.perf_counter() - start
+
+def format_timings(timings):
+    """Format phase timings as a single log line."""
+    return ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items())
+
+def split_dataset(X, y_positive, y_negative):
+    """Split texts and both label columns into training and testing sets."""
+    return train_test_split(X, y_positive, y_negative, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+def _fit_head(features, y, C):
+    """Fit one logistic head (runs in a joblib worker)."""
+    clf = LogisticRegression(C=C, random_state=RANDOM_STATE)
+    clf.fit(features, y)
+    return clf
+
+def fit_pipelines(X, y_positive, y_negative, timings=None, hyperparameters=None):
+    """Fit the positive and negative models on a single shared TF-IDF vocabulary.
+
+    The text is tokenized and vectorized once, then both logistic heads are fitted
+    on the same feature matrix, concurrently in TRAINING_N_JOBS worker processes.
+    joblib memory-maps the feature arrays, so the workers share them instead of
+    each receiving a copy. Each head is still wrapped in its own Pipeline so the
+    pickled models keep their original format.
+
+    Args:
+        timings (dict): If given, receives the duration of the 'vectorize' and
+            'fit' phases.
+        hyperparameters (dict): max_features, ngram_range and C (default: the
+            configuration promoted by the last sweep, see load_hyperparameters()).
+
+    Returns:
+        tuple: (model_positive, model_negative)
+    """
+    hyperparameters = hyperparameters or load_hyperparameters()
+    tfidf = TfidfVectorizer(max_features=hyperparameters['max_features'],
+                            ngram_range=tuple(hyperparameters['ngram_range']))
+    with timed(timings, 'vectorize'):
+        features = tfidf.fit_transform(X)
+
+    with timed(timings, 'fit'):
+        clf_positive, clf_negative = Parallel(n_jobs=TRAINING_N_JOBS)(
+            delayed(_fit_head)(features, y, hyperparameters['C']) for y in (y_positive, y_negative)
+        )
+
+    model_positive = Pipeline([('tfidf', tfidf), ('clf', clf_positive)])
+    model_negative = Pipeline([('tfidf', tfidf), ('clf', clf_negative)])
+    return model_positive, model_negative
+
+def build_incremental_pipelines(hyperparameters=None):
+    """Create untrained positive and negative models for incremental training.
+
+    Both heads share one stateless HashingVectorizer, so the feature space never
+    depends on the data seen so far, and use logistic regression trained by SGD,
+    which can be updated with partial_fit.
+
+    The promoted hyperparameters apply as far as they can: ngram_range sets the
+    n-grams that are hashed, and C scales the SGD regularization (alpha) inversely,
+    from SGDClassifier's default alpha at C=1. max_features has no equivalent, since
+    the hashed feature space always has HASHING_N_FEATURES columns.
+
+    Args:
+        hyperparameters (dict): max_features, ngram_range and C (default: the
+            configuration promoted by the last sweep, see load_hyperparameters()).
+
+    Returns:
+        tuple: (model_positive, model_negative)
+    """
+    hyperparameters = hyperparameters or load_hyperparameters()
+    hashing = HashingVectorizer(n_features=HASHING_N_FEATURES, ngram_range=tuple(hyperparameters['ngram_range']),
+                                alternate_sign=False, norm='l2')
+    alpha = SGD_ALPHA / hyperparameters['C']
+    clf_positive = SGDClassifier(loss=LOG_LOSS, alpha=alpha, random_state=RANDOM_STATE)
+    clf_negative = SGDClassifier(loss=LOG_LOSS, alpha=alpha, random_state=RANDOM_STATE)
+
+    model_positive = Pipeline([('hashing', hashing), ('clf', clf_positive)])
+    model_negative = Pipeline([('hashing', hashing), ('clf', clf_negative)])
+    return model_positive, model_negative
+
+def holdout_mask(ids):
+    """Select the tweets held out from incremental training for evaluation.
+
+    A tweet is held out when its id falls in the first TEST_SIZE share of each
+    block of 100 ids. The choice only depends on the id, so a held-out tweet is
+    never trained on by any later incremental run either.
+
+    Returns:
+        ndarray: Boolean mask, True for the held-out tweets.
+    """
+    return np.asarray(ids) % 100 < round(TEST_SIZE * 100)
+
+def partial_fit_pipelines(model_positive, model_negative, X, y_positive, y_negative):
+    """Update both incremental models in place with one batch of preprocessed texts."""
+    features = model_positive.named_steps['hashing'].transform(X)
+    model_positive.named_steps['clf'].partial_fit(features, y_positive, classes=[0, 1])
+    model_negative.named_steps['clf'].partial_fit(features, y_negative, classes=[0, 1])
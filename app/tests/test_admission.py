@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app import create_app
+from app.utils.admission import AdmissionController, get_admission_controller
+
+class TestAdmission(unittest.TestCase):
+    """Test cases for the analyze request limits and admission control."""
+
+    def test_admission_controller(self):
+        """Test that requests are admitted up to the in-flight limit, and always when idle."""
+        admission = AdmissionController(max_in_flight=10)
+        self.assertTrue(admission.try_acquire(25))
+        self.assertFalse(admission.try_acquire(1))
+        admission.release(25)
+
+        self.assertTrue(admission.try_acquire(6))
+        self.assertTrue(admission.try_acquire(4))
+        self.assertFalse(admission.try_acquire(1))
+        admission.release(6)
+        admission.release(4)
+        self.assertEqual(admission.stats(), {'max_in_flight': 10, 'in_flight': 0, 'admitted': 3, 'rejected': 2})
+
+        unlimited = AdmissionController(max_in_flight=0)
+        self.assertTrue(unlimited.try_acquire(10 ** 6))
+        self.assertTrue(unlimited.try_acquire(10 ** 6))
+
+    def test_analyze_limits(self):
+        """Test that oversized requests get 413 and requests over the in-flight limit get 429."""
+        client = create_app(init_db=False, enable_scheduler=False).test_client()
+
+        with mock.patch('app.controllers.sentiment_controller.ANALYZE_MAX_BATCH', 2):
+            response = client.post('/api/sentiment/analyze', json={'tweets': ['a', 'b', 'c']})
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('/analyze/stream', response.get_json()['error'])
+
+        with mock.patch('app.controllers.sentiment_controller.ANALYZE_MAX_TWEET_LENGTH', 5):
+            response = client.post('/api/sentiment/analyze', json={'tweets': ['too long']})
+        self.assertEqual(response.status_code, 413)
+
+        with mock.patch('app.controllers.sentiment_controller.ANALYZE_MAX_BODY_BYTES', 10):
+            response = client.post('/api/sentiment/analyze', json={'tweets': ['a body above ten bytes']})
+        self.assertEqual(response.status_code, 413)
+
+        admission = get_admission_controller()
+        self.assertTrue(admission.try_acquire(admission.max_in_flight))
+        try:
+            response = client.post('/api/sentiment/analyze', json={'tweets': ['busy']})
+        finally:
+            admission.release(admission.max_in_flight)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.annotations import AnnotationError, iter_annotation_file
+
+class TestAnnotations(unittest.TestCase):
+    """Test cases for reading annotated tweet files."""
+
+    def test_errors_number_records_alike_in_every_format(self):
+        """Test that the same invalid record gets the same number in CSV and JSONL files."""
+        files = {
+            'annotations.csv': 'text,positive,negative\nGreat product!,1,0\n\nNot sure,2,0\n',
+            'annotations.jsonl': ('{"text": "Great product!", "positive": 1}\n\n'
+                                  '{"text": "Not sure", "positive": 2}\n'),
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, content in files.items():
+                path = os.path.join(tmp_dir, name)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                with self.assertRaises(AnnotationError) as context:
+                    list(iter_annotation_file(path))
+                self.assertEqual(context.exception.record_number, 2, name)
+                self.assertTrue(str(context.exception).startswith('Record 2 (counting from 1'), name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import struct
 import unittest
 
 # Add the project root directory to the Python path
@@ -80,6 +81,60 @@ class TestSentimentAPI(unittest.TestCase):
         # Check the error message
         self.assertIn('error', data)
     
+    def test_analyze_sentiment_compact_formats(self):
+        """Test that the compact response formats return one score per tweet, in order."""
+        tweets = ["I love this product!", "This is terrible!", "I love this product!"]
+        
+        response = self.client.post(
+            '/api/sentiment/analyze',
+            data=json.dumps({'tweets': tweets}),
+            content_type='application/json'
+        )
+        by_tweet = json.loads(response.data)
+        
+        # JSON array aligned with the input, duplicates included
+        response = self.client.post(
+            '/api/sentiment/analyze',
+            data=json.dumps({'tweets': tweets}),
+            content_type='application/json',
+            headers={'Accept': 'application/vnd.sentiment.scores+json'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'application/vnd.sentiment.scores+json')
+        self.assertEqual(json.loads(response.data), [by_tweet[tweet] for tweet in tweets])
+        
+        # Little-endian float32 values, 4 bytes per tweet
+        response = self.client.post(
+            '/api/sentiment/analyze',
+            data=json.dumps({'tweets': tweets}),
+            content_type='application/json',
+            headers={'Accept': 'application/vnd.sentiment.scores.float32'}
+        )
+        self.assertEqual(response.status_code, 200)
+        scores = struct.unpack(f'<{len(tweets)}f', response.data)
+        for tweet, score in zip(tweets, scores):
+            self.assertAlmostEqual(score, by_tweet[tweet], places=6)
+        
+        # Other formats fall back to the JSON object
+        response = self.client.post(
+            '/api/sentiment/analyze',
+            data=json.dumps({'tweets': tweets}),
+            content_type='application/json',
+            headers={'Accept': 'text/html'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.json, by_tweet)
+        
+        # Unless the client explicitly excludes JSON
+        response = self.client.post(
+            '/api/sentiment/analyze',
+            data=json.dumps({'tweets': tweets}),
+            content_type='application/json',
+            headers={'Accept': 'text/csv, application/json;q=0'}
+        )
+        self.assertEqual(response.status_code, 406)
+    
     def test_analyze_sentiment_invalid_type(self):
         """Test the analyze sentiment endpoint with invalid input type."""
         # Make a request to the API with non-list tweets
@@ -98,5 +153,80 @@ class TestSentimentAPI(unittest.TestCase):
         # Check the error message
         self.assertIn('error', data)
 
+    def test_analyze_sentiment_stream(self):
+        """Test the streaming endpoint with newline-delimited JSON input."""
+        tweets = ["I love this product!", "This is terrible!", "I love this product!"]
+        body = '\n'.join(json.dumps(tweet) for tweet in tweets) + '\n'
+        
+        # Make a request to the API
+        response = self.client.post(
+            '/api/sentiment/analyze/stream',
+            data=body,
+            content_type='application/x-ndjson'
+        )
+        
+        # Check the response
+        self.assertEqual(response.status_code, 200)
+        
+        # Parse one result per line, in input order
+        results = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual([result['tweet'] for result in results], tweets)
+        for result in results:
+            self.assertGreaterEqual(result['score'], -1)
+            self.assertLessEqual(result['score'], 1)
+    
+    def test_analyze_sentiment_stream_invalid_line(self):
+        """Test that the streaming endpoint reports an invalid line."""
+        response = self.client.post(
+            '/api/sentiment/analyze/stream',
+            data='"I love this product!"\n42\n',
+            content_type='application/x-ndjson'
+        )
+        
+        # The valid line is scored, then the error is streamed
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(lines[0]['tweet'], "I love this product!")
+        self.assertIn('error', lines[-1])
+        self.assertEqual(lines[-1]['line'], 2)
+    
+    def test_cache_stats(self):
+        """Test that repeated tweets are served from the prediction cache."""
+        tweets = ["Cached tweet for the stats test", "Cached tweet for the stats test"]
+        
+        # Score the same tweets twice
+        for _ in range(2):
+            response = self.client.post(
+                '/api/sentiment/analyze',
+                data=json.dumps({'tweets': tweets}),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+        
+        # Check the cache counters
+        response = self.client.get('/api/sentiment/cache')
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.data)
+        if data['enabled']:
+            self.assertGreaterEqual(data['hits'], 2)
+            self.assertGreaterEqual(data['size'], 1)
+
+    def test_save_annotations_invalid_label(self):
+        """Test that an invalid annotation is rejected before anything is saved."""
+        annotations = [
+            {'text': 'Great product!', 'positive': 1, 'negative': 0},
+            {'text': 'Not sure about this one', 'positive': 2, 'negative': 0}
+        ]
+        
+        response = self.client.post(
+            '/api/sentiment/annotations',
+            data=json.dumps({'annotations': annotations}),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 400)
+        data = json.loads(response.data)
+        self.assertIn('Record 2', data['error'])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
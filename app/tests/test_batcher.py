@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.batcher import MicroBatcher, BatcherUnavailable
+
+def predict_concurrently(batcher, requests):
+    """Call batcher.predict from one thread per request and return the results (or errors) in order."""
+    results = [None] * len(requests)
+
+    def call(i):
+        try:
+            results[i] = batcher.predict(requests[i], timeout=10)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class TestMicroBatcher(unittest.TestCase):
+    """Test cases for the micro-batching layer in front of the model."""
+
+    def test_requests_are_merged_and_scattered_in_order(self):
+        """Test that concurrent requests share one model call and each gets its own scores."""
+        calls = []
+
+        def predict_fn(texts):
+            calls.append(list(texts))
+            return [float(text) for text in texts]
+
+        # A long window, so the requests of all threads land in the same batch
+        batcher = MicroBatcher(predict_fn, window_ms=500, max_batch=1000)
+        requests = [[str(i * 10 + j) for j in range(i + 1)] for i in range(4)]
+        results = predict_concurrently(batcher, requests)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(calls[0], key=float), sorted(sum(requests, []), key=float))
+        self.assertEqual(results, [[float(text) for text in texts] for texts in requests])
+        self.assertEqual(batcher.stats(), {
+            'window_ms': 500.0, 'max_batch': 1000, 'batches': 1, 'requests': 4, 'tweets': 10,
+            'mean_requests_per_batch': 4.0, 'mean_tweets_per_batch': 10.0, 'largest_batch': 10,
+        })
+
+    def test_model_error_reaches_every_request(self):
+        """Test that an exception of the model call is raised in every request of the batch."""
+        def predict_fn(texts):
+            raise ValueError("model failed")
+
+        batcher = MicroBatcher(predict_fn, window_ms=500, max_batch=1000)
+        results = predict_concurrently(batcher, [["a"], ["b", "c"], ["d"]])
+
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+        self.assertEqual(batcher.stats()['batches'], 0)
+
+        # The worker keeps serving later batches
+        batcher.predict_fn = lambda texts: [1.0] * len(texts)
+        self.assertEqual(batcher.predict(["e"], timeout=10), [1.0])
+
+    def test_requests_do_not_wait_forever(self):
+        """Test that requests time out on a stuck model call and fail at once without a worker thread."""
+        release = threading.Event()
+
+        def predict_fn(texts):
+            release.wait()
+            return [0.0] * len(texts)
+
+        batcher = MicroBatcher(predict_fn, window_ms=0, max_batch=1000)
+        try:
+            with self.assertRaises(BatcherUnavailable):
+                batcher.predict(["a"], timeout=0.2)
+        finally:
+            release.set()
+
+        # Stand in for a worker thread that died
+        batcher._worker = threading.Thread(target=lambda: None)
+        batcher._worker.start()
+        batcher._worker.join()
+        with self.assertRaises(BatcherUnavailable):
+            batcher.predict(["b"])
+
+if __name__ == '__main__':
+    unittest.main()
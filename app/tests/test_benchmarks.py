@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.compare import compare
+
+class TestBenchmarkComparison(unittest.TestCase):
+    """Test cases for the regression check of the benchmark suite."""
+
+    def regressed(self, metrics, baseline, **kwargs):
+        return {metric for metric, _, _, _, regressed in compare(metrics, baseline, **kwargs) if regressed}
+
+    def test_slower_durations_and_lower_throughput_regress(self):
+        """Test that durations regress when they grow and throughputs when they shrink."""
+        baseline = {'inference.batch_100.p50_ms': 10.0, 'inference.batch_100.throughput_per_s': 1000.0,
+                    'training.rows_10000.total_s': 2.0}
+        slower = {'inference.batch_100.p50_ms': 15.0, 'inference.batch_100.throughput_per_s': 700.0,
+                  'training.rows_10000.total_s': 2.1}
+        self.assertEqual(self.regressed(slower, baseline),
+                         {'inference.batch_100.p50_ms', 'inference.batch_100.throughput_per_s'})
+
+        faster = {'inference.batch_100.p50_ms': 5.0, 'inference.batch_100.throughput_per_s': 2000.0,
+                  'training.rows_10000.total_s': 1.0}
+        self.assertEqual(self.regressed(faster, baseline), set())
+
+    def test_noise_floor_and_missing_metrics(self):
+        """Test that tiny absolute slowdowns and metrics missing from one run are not flagged."""
+        baseline = {'inference.batch_1.p50_ms': 0.1, 'api.batch_1.p50_ms': 1.0}
+        current = {'inference.batch_1.p50_ms': 0.2, 'training.rows_1000000.total_s': 60.0}
+        rows = compare(current, baseline, min_delta_ms=1.0)
+        self.assertEqual([row[0] for row in rows], ['inference.batch_1.p50_ms'])
+        self.assertFalse(rows[0][4])
+        self.assertTrue(compare(current, baseline, min_delta_ms=0.05)[0][4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models.sentiment_model import SentimentModel
+from app.models.compiled_scorer import CompiledScorer
+
+TRAIN_TWEETS = [
+    "I love this new product! It's amazing!",
+    "This is terrible, I'm very disappointed.",
+    "The service was okay, nothing special.",
+    "Great customer service and fast delivery.",
+    "The product arrived damaged and customer service was unhelpful.",
+    "I'm really enjoying using this app, it's so intuitive!",
+    "This update has made everything worse, I can't find anything now.",
+    "Just a normal day, nothing exciting happened.",
+    "Absolutely thrilled with my purchase, best decision ever!",
+    "Worst experience ever, will never use this service again.",
+    "The new features are impressive, but there are still some bugs.",
+    "Poor quality and overpriced, avoid at all costs.",
+]
+TRAIN_POSITIVE = [1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0]
+TRAIN_NEGATIVE = [0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1, 1]
+
+QUERY_TWEETS = [
+    "I love this product!",
+    "This is terrible!",
+    "love love love the service, great great",
+    "completely unknown vocabulary here",
+    "",
+    "!!!",
+    "Customer SERVICE was unhelpful and the delivery was slow",
+]
+
+class TestCompiledScorer(unittest.TestCase):
+    """Test cases for the pure NumPy compiled scorer."""
+
+    def setUp(self):
+        """Fit a small model without touching the database."""
+        self.model = SentimentModel(load=False)
+        self.model.fit_models(self.model.preprocess_text(TRAIN_TWEETS), TRAIN_POSITIVE, TRAIN_NEGATIVE)
+        self.processed = self.model.preprocess_text(QUERY_TWEETS)
+
+    def test_score_parity_with_pipelines(self):
+        """Test that the compiled scorer matches the sklearn pipelines to 1e-9."""
+        reference = self.model.bundle.predict_pipelines(self.processed)
+        scores = self.model.compiled_scorer.predict_sentiment(self.processed)
+        np.testing.assert_allclose(scores, reference, rtol=0, atol=1e-9)
+
+    def test_score_parity_with_independent_vectorizers(self):
+        """Test parity for legacy models trained with one vectorizer per pipeline."""
+        X = self.model.preprocess_text(TRAIN_TWEETS)
+        model_positive = Pipeline([('tfidf', TfidfVectorizer(max_features=5000)), ('clf', LogisticRegression())])
+        model_negative = Pipeline([('tfidf', TfidfVectorizer(max_features=5000)), ('clf', LogisticRegression())])
+        model_positive.fit(X, TRAIN_POSITIVE)
+        model_negative.fit(X, TRAIN_NEGATIVE)
+
+        scorer = CompiledScorer.from_pipelines(model_positive, model_negative)
+        reference = (model_positive.predict_proba(self.processed)[:, 1]
+                     - model_negative.predict_proba(self.processed)[:, 1])
+        np.testing.assert_allclose(scorer.predict_sentiment(self.processed), reference, rtol=0, atol=1e-9)
+
+    def test_save_and_load(self):
+        """Test that the memory-mapped artifact scores identically after reloading."""
+        reference = self.model.bundle.predict_pipelines(self.processed)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'scorer')
+            self.model.compiled_scorer.save(path)
+            scorer = CompiledScorer.load(path, mmap_mode='r')
+
+            # The arrays are read-only views of the mapped files, not private copies
+            self.assertIsInstance(scorer.idf.base, np.memmap)
+            self.assertFalse(scorer.coef.flags.writeable)
+            np.testing.assert_allclose(scorer.predict_sentiment(self.processed), reference, rtol=0, atol=1e-9)
+
+    def test_predict_sentiment_matches_reference(self):
+        """Test that predict_sentiment returns the reference scores for a small batch."""
+        reference = self.model.bundle.predict_pipelines(self.processed)
+        np.testing.assert_allclose(self.model.predict_sentiment(QUERY_TWEETS), reference, rtol=0, atol=1e-9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import threading
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.db_pool import ConnectionPool, PoolTimeout
+
+class FakeConnection:
+    """In-memory stand-in for a DB-API connection."""
+
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+
+    def rollback(self):
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+class TestConnectionPool(unittest.TestCase):
+    """Test cases for the database connection pool."""
+
+    def setUp(self):
+        """Count the connections opened by the pool."""
+        self.opened = []
+
+    def connect(self):
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def test_connections_are_reused(self):
+        """Test that sequential checkouts reuse one connection and roll it back after use."""
+        pool = ConnectionPool(self.connect, min_size=1, max_size=4)
+        for _ in range(10):
+            with pool.connection() as connection:
+                self.assertIs(connection, self.opened[0])
+
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(self.opened[0].rollbacks, 10)
+        stats = pool.stats()
+        self.assertEqual(stats['checkouts'], 10)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['in_use'], 0)
+
+    def test_max_size_and_timeout(self):
+        """Test that the pool never exceeds max_size and times out when exhausted."""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=2, timeout=0.05)
+        first, second = pool.acquire(), pool.acquire()
+        self.assertEqual(pool.stats()['utilization'], 1.0)
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+        # A waiting borrower gets the connection released by another thread
+        threading.Timer(0.02, pool.release, args=(first,)).start()
+        pool.timeout = 1
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(len(self.opened), 2)
+        self.assertGreater(pool.stats()['wait_time_max_ms'], 0)
+        pool.release(second)
+
+    def test_dead_connection_is_replaced_on_checkout(self):
+        """Test that a connection failing its health check is closed and replaced."""
+        pool = ConnectionPool(self.connect, min_size=1, max_size=1)
+        self.opened[0].alive = False
+
+        with pool.connection() as connection:
+            self.assertIs(connection, self.opened[1])
+        self.assertTrue(self.opened[0].closed)
+        self.assertEqual(pool.stats()['failed_health_checks'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_max_lifetime(self):
+        """Test that connections older than max_lifetime are recycled."""
+        pool = ConnectionPool(self.connect, min_size=1, max_size=1, max_lifetime=0.01)
+        time.sleep(0.02)
+
+        with pool.connection() as connection:
+            self.assertIs(connection, self.opened[1])
+        self.assertTrue(self.opened[0].closed)
+        self.assertGreaterEqual(pool.stats()['connections_recycled'], 1)
+
+    def test_broken_connection_is_discarded_after_error(self):
+        """Test that a connection that cannot be rolled back is not returned to the pool."""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=1)
+        with self.assertRaises(ConnectionError):
+            with pool.connection() as connection:
+                connection.alive = False
+                raise ConnectionError("lost connection during query")
+
+        self.assertTrue(self.opened[0].closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models import training, evaluation
+from app.models.model_bundle import ModelBundle
+from scripts.benchmark_inference import generate_corpus
+
+class TestEvaluation(unittest.TestCase):
+    """Test cases for the background evaluation of published models."""
+
+    def test_metrics_are_saved_per_version(self):
+        """Test that a background evaluation writes the metrics and plots of its model version."""
+        texts, y_positive, y_negative = generate_corpus(1000)
+        texts = [text.lower() for text in texts]
+        model_positive, model_negative = training.fit_pipelines(texts[:800], y_positive[:800], y_negative[:800])
+        bundle = ModelBundle(model_positive, model_negative, metadata={'trained_rows': 800})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'sentiment_model.pkl')
+            bundle.save(model_path)
+            self.assertIsNone(evaluation.load_evaluation(model_path=model_path))
+
+            future = evaluation.submit_evaluation(bundle, texts[800:], y_positive[800:], y_negative[800:],
+                                                  model_path=model_path)
+            metrics = future.result()
+            self.assertEqual(evaluation.load_evaluation(model_path=model_path), metrics)
+
+            output_dir = evaluation.evaluation_dir(bundle.version, model_path)
+            self.assertEqual(sorted(os.listdir(output_dir)),
+                             ['confusion_matrix_negative.png', 'confusion_matrix_positive.png', 'metrics.json'])
+
+        self.assertEqual((metrics['version'], metrics['trained_rows'], metrics['test_rows']), (bundle.version, 800, 200))
+        for head, y_test in (('positive', y_positive[800:]), ('negative', y_negative[800:])):
+            self.assertEqual(sum(map(sum, metrics[head]['confusion_matrix'])), 200)
+            self.assertEqual(metrics[head]['support'], int(sum(y_test)))
+            self.assertGreater(metrics[head]['f1_score'], 0.5)
+
+    def test_heads_are_evaluated_concurrently(self):
+        """Test that the positive and negative heads are evaluated at the same time."""
+        texts, y_positive, y_negative = generate_corpus(500)
+        texts = [text.lower() for text in texts]
+        model_positive, model_negative = training.fit_pipelines(texts[:400], y_positive[:400], y_negative[:400])
+
+        # Each head waits for the other one: evaluating them one after the other breaks the barrier
+        barrier = threading.Barrier(2, timeout=10)
+        evaluate_head = evaluation._evaluate_head
+
+        def evaluate_with_barrier(clf, features, y_true):
+            barrier.wait()
+            return evaluate_head(clf, features, y_true)
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.object(evaluation, '_evaluate_head', side_effect=evaluate_with_barrier) as patched:
+            metrics = evaluation.evaluate_models(model_positive, model_negative, 'v1', texts[400:], y_positive[400:],
+                                                 y_negative[400:], model_path=os.path.join(tmp_dir, 'sentiment_model.pkl'))
+
+        self.assertEqual(patched.call_count, 2)
+        self.assertFalse(barrier.broken)
+        self.assertEqual(metrics['positive']['support'], int(sum(y_positive[400:])))
+        self.assertEqual(metrics['negative']['support'], int(sum(y_negative[400:])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models import training
+from app.models.model_bundle import ModelBundle, load_bundle
+from scripts.benchmark_inference import generate_corpus
+
+QUERY_TWEETS = ["i love this product!", "this is terrible!", "", "completely unknown vocabulary here"]
+
+class TestIncrementalTraining(unittest.TestCase):
+    """Test cases for the hashing + partial_fit incremental models."""
+
+    def setUp(self):
+        """Generate a synthetic corpus split into two training runs."""
+        texts, self.y_positive, self.y_negative = generate_corpus(2000)
+        self.texts = [text.lower() for text in texts]
+
+    def partial_fit(self, model_positive, model_negative, start, stop):
+        training.partial_fit_pipelines(model_positive, model_negative, self.texts[start:stop],
+                                       self.y_positive[start:stop], self.y_negative[start:stop])
+
+    def test_fused_scores_match_pipelines(self):
+        """Test that the fused path scores incremental models like the pipelines."""
+        model_positive, model_negative = training.build_incremental_pipelines()
+        self.partial_fit(model_positive, model_negative, 0, 1000)
+        bundle = ModelBundle(model_positive, model_negative)
+
+        self.assertIsNone(bundle.compiled_scorer)
+        self.assertIsNotNone(bundle.fused_weights)
+        np.testing.assert_allclose(bundle.predict_fused(QUERY_TWEETS), bundle.predict_pipelines(QUERY_TWEETS),
+                                   rtol=0, atol=1e-9)
+
+    def test_resume_from_saved_model(self):
+        """Test that a saved incremental model can be updated again after reloading."""
+        model_positive, model_negative = training.build_incremental_pipelines()
+        self.partial_fit(model_positive, model_negative, 0, 1000)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'sentiment_model.pkl')
+            ModelBundle(model_positive, model_negative,
+                        metadata={'model_type': 'incremental', 'watermark': 1000}).save(model_path)
+            loaded = ModelBundle.load(model_path)
+
+        self.assertEqual(loaded.metadata['watermark'], 1000)
+        np.testing.assert_allclose(loaded.score(QUERY_TWEETS), ModelBundle(model_positive, model_negative).score(QUERY_TWEETS),
+                                   rtol=0, atol=1e-12)
+
+        # Continuing on the reloaded copy matches continuing on the original models
+        self.partial_fit(model_positive, model_negative, 1000, 2000)
+        self.partial_fit(loaded.model_positive, loaded.model_negative, 1000, 2000)
+        np.testing.assert_allclose(loaded.predict_pipelines(QUERY_TWEETS),
+                                   ModelBundle(model_positive, model_negative).predict_pipelines(QUERY_TWEETS),
+                                   rtol=0, atol=1e-12)
+
+    def test_promoted_hyperparameters(self):
+        """Test that incremental models hash the promoted n-grams and scale SGD's alpha by 1 / C."""
+        model_positive, model_negative = training.build_incremental_pipelines(
+            {'max_features': 5000, 'ngram_range': [1, 2], 'C': 4.0})
+        for model in (model_positive, model_negative):
+            self.assertEqual(model.named_steps['hashing'].ngram_range, (1, 2))
+            self.assertEqual(model.named_steps['clf'].alpha, training.SGD_ALPHA / 4.0)
+
+    def test_mmap_falls_back_to_pipelines(self):
+        """Test that incremental models, which have no scoring artifact, load from the pickled pipelines."""
+        model_positive, model_negative = training.build_incremental_pipelines()
+        self.partial_fit(model_positive, model_negative, 0, 1000)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'sentiment_model.pkl')
+            ModelBundle(model_positive, model_negative, metadata={'model_type': 'incremental'}).save(model_path)
+            self.assertIsNone(ModelBundle.load_mmap(model_path))
+            loaded = load_bundle(model_path)
+
+        self.assertIsNotNone(loaded.model_positive)
+        np.testing.assert_allclose(loaded.score(QUERY_TWEETS), ModelBundle(model_positive, model_negative).score(QUERY_TWEETS),
+                                   rtol=0, atol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
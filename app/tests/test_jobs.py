@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures import Future
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils import jobs
+from app.utils.ndjson import dumps_line
+from app.models.sentiment_model import SentimentModel
+
+class TestJobs(unittest.TestCase):
+    """Test cases for the bulk scoring job workers and job manager."""
+
+    def test_worker_only_loads_saved_model(self):
+        """Test that a shard fails instead of training a model when none is saved."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'sentiment_model.pkl')
+            input_path = os.path.join(tmp_dir, 'input_00000.ndjson')
+            output_path = os.path.join(tmp_dir, 'results_00000.ndjson')
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write(dumps_line("I love it") + dumps_line("I hate it"))
+
+            with mock.patch('app.utils.jobs.MODEL_PATH', model_path), \
+                 mock.patch('app.utils.jobs._worker_model', None):
+                with mock.patch.object(SentimentModel, 'train_model') as train_model:
+                    with self.assertRaises(FileNotFoundError):
+                        jobs._score_shard(input_path, output_path)
+                    train_model.assert_not_called()
+                self.assertFalse(os.path.exists(output_path))
+
+                model = SentimentModel(load=False)
+                model.fit_models(model.preprocess_text(["I love it", "I hate it", "great", "awful"]),
+                                 [1, 0, 1, 0], [0, 1, 0, 1])
+                model.bundle.save(model_path)
+                self.assertEqual(jobs._score_shard(input_path, output_path), 2)
+
+    def test_running_job_is_not_deleted(self):
+        """Test that a job is only deleted once none of its shards is being scored."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = jobs.JobManager(jobs_dir=tmp_dir)
+            job_id = manager.submit([])
+            shard = Future()
+            shard.set_running_or_notify_cancel()
+            manager._jobs[job_id].update(status='failed', futures=[shard])
+
+            self.assertFalse(manager.delete(job_id))
+            self.assertTrue(os.path.isdir(os.path.join(tmp_dir, job_id)))
+
+            shard.set_result(0)
+            self.assertTrue(manager.delete(job_id))
+            self.assertFalse(os.path.isdir(os.path.join(tmp_dir, job_id)))
+            self.assertIsNone(manager.get(job_id))
+
+if __name__ == '__main__':
+    unittest.main()
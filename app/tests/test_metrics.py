@@ -0,0 +1,45 @@
+import os
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app import create_app
+from app.utils.metrics import Counter, Histogram, render
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the metrics registry and the /metrics endpoint."""
+
+    def test_histogram_exposition(self):
+        """Test that histogram buckets are cumulative and include the upper bound."""
+        registry = []
+        histogram = Histogram('test_seconds', 'Test histogram.', ['stage'], buckets=(0.1, 1.0), registry=registry)
+        stage = histogram.labels(stage='parse "json"')
+        for value in (0.05, 0.1, 0.5, 2.0):
+            stage.observe(value)
+        Counter('test_requests', 'Test counter.', registry=registry).labels().inc(3)
+
+        lines = render(registry).splitlines()
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{stage="parse \\"json\\"",le="0.1"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="parse \\"json\\"",le="1"} 3', lines)
+        self.assertIn('test_seconds_bucket{stage="parse \\"json\\"",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_sum{stage="parse \\"json\\""} 2.65', lines)
+        self.assertIn('test_seconds_count{stage="parse \\"json\\""} 4', lines)
+        self.assertIn('# TYPE test_requests_total counter', lines)
+        self.assertIn('test_requests_total 3', lines)
+
+    def test_metrics_endpoint_counts_requests(self):
+        """Test that /metrics exposes request counts labelled with the route pattern."""
+        client = create_app(init_db=False, enable_scheduler=False).test_client()
+        client.get('/api/sentiment/jobs/unknown-job')
+
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        self.assertIn('sentiment_http_requests_total{method="GET",endpoint="/api/sentiment/jobs/<job_id>",status="404"}',
+                      response.get_data(as_text=True))
+
+if __name__ == '__main__':
+    unittest.main()
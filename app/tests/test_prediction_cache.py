@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models.prediction_cache import PredictionCache
+
+class TestPredictionCache(unittest.TestCase):
+    """Test cases for the LRU cache of sentiment scores."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted at capacity."""
+        cache = PredictionCache(max_size=2)
+        cache.invalidate('v1')
+        cache.put_many([('a', 0.1), ('b', 0.2)], 'v1')
+        # Reading 'a' makes 'b' the least recently used entry
+        self.assertEqual(cache.get_many(['a'], 'v1'), {'a': 0.1})
+        cache.put_many([('c', 0.3)], 'v1')
+
+        self.assertEqual(cache.get_many(['a', 'b', 'c'], 'v1'), {'a': 0.1, 'c': 0.3})
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['evictions'], stats['hits'], stats['misses']), (2, 1, 3, 1))
+        self.assertEqual(stats['hit_rate'], 0.75)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after their time to live."""
+        cache = PredictionCache(max_size=10, ttl=60)
+        cache.invalidate('v1')
+        with mock.patch('app.models.prediction_cache.time.monotonic', return_value=1000.0):
+            cache.put_many([('a', 0.5)], 'v1')
+        with mock.patch('app.models.prediction_cache.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache.get_many(['a'], 'v1'), {'a': 0.5})
+        with mock.patch('app.models.prediction_cache.time.monotonic', return_value=1061.0):
+            self.assertEqual(cache.get_many(['a'], 'v1'), {})
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_model_version_change(self):
+        """Test that a new model version clears the cache and stale versions are ignored."""
+        cache = PredictionCache(max_size=10)
+        cache.invalidate('v1')
+        cache.put_many([('a', 0.5)], 'v1')
+        cache.invalidate('v2')
+
+        self.assertEqual(cache.get_many(['a'], 'v2'), {})
+        # A request still scoring with the previous model neither reads nor writes
+        cache.put_many([('b', 0.5)], 'v1')
+        self.assertEqual(cache.get_many(['b'], 'v2'), {})
+        self.assertEqual(cache.get_many(['a'], 'v1'), {})
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_key_stability(self):
+        """Test that keys only depend on the text (not on the process) and are fixed-size digests."""
+        self.assertEqual(PredictionCache.key("i love it").hex(), '24fc33a7f39d9b98c226604f92dc6c68')
+        self.assertNotEqual(PredictionCache.key("i love it"), PredictionCache.key("i love it!"))
+        self.assertEqual(len(PredictionCache.key("😍" * 1000)), 16)
+
+if __name__ == '__main__':
+    unittest.main()
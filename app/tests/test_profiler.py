@@ -0,0 +1,46 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app import create_app
+from app.utils.profiler import RequestProfiler, init_profiler
+
+class TestRequestProfiler(unittest.TestCase):
+    """Test cases for the opt-in request profiling hook."""
+
+    def test_disabled_registers_no_hooks(self):
+        """Test that an app without profiling has no profiling hooks to run."""
+        app = create_app(init_db=False, enable_scheduler=False, profiling=False)
+        hooks = [hook for funcs in (app.before_request_funcs, app.after_request_funcs, app.teardown_request_funcs)
+                 for hooks in funcs.values() for hook in hooks]
+        self.assertFalse(any(isinstance(getattr(hook, '__self__', None), RequestProfiler) for hook in hooks))
+
+    def test_header_profiles_request_with_rotation(self):
+        """Test that the debug header profiles a request and that old profiles are rotated out."""
+        app = create_app(init_db=False, enable_scheduler=False, profiling=False)
+        with tempfile.TemporaryDirectory() as profile_dir:
+            init_profiler(app, directory=profile_dir, sample_rate=0, header='X-Profile', max_files=2)
+            client = app.test_client()
+
+            self.assertNotIn('X-Profile-Id', client.get('/api/sentiment/batcher').headers)
+            self.assertEqual(os.listdir(profile_dir), [])
+
+            profile_ids = [client.get('/api/sentiment/batcher', headers={'X-Profile': '1'}).headers['X-Profile-Id']
+                           for _ in range(3)]
+            self.assertEqual(sorted(os.listdir(profile_dir)),
+                             sorted(f"{profile_id}{suffix}" for profile_id in profile_ids[1:]
+                                    for suffix in ('.prof', '.prof.json')))
+
+            with open(os.path.join(profile_dir, f"{profile_ids[-1]}.prof.json"), 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            self.assertEqual(metadata['endpoint'], '/api/sentiment/batcher')
+            self.assertEqual(metadata['status'], 200)
+            self.assertFalse(metadata['sampled'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import runpy
+import tempfile
+import subprocess
+import unittest
+from unittest import mock
+
+# Add the project root directory to the Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(PROJECT_ROOT)
+
+from app.models.sentiment_model import SentimentModel
+
+# Budgets for a serving-only start, generous enough for a loaded CI machine
+# (override with the environment variables of the same name)
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', 1000))
+COLD_START_BUDGET_MS = float(os.getenv('COLD_START_BUDGET_MS', 2500))
+
+# Packages that only training, evaluation, the database or the scheduler need
+TRAINING_STACK = ['matplotlib', 'seaborn', 'sklearn', 'pandas', 'pymysql', 'apscheduler']
+
+SERVING_STARTUP = "from app import create_app; create_app(init_db=False, enable_scheduler=False)"
+
+COLD_START = """
+import sys, json, time
+start = time.perf_counter()
+from app import create_app
+client = create_app().test_client()
+response = client.post('/api/sentiment/analyze', json={'tweets': ['I love this product!']})
+elapsed_ms = (time.perf_counter() - start) * 1000
+loaded = sorted({name.split('.')[0] for name in sys.modules})
+print(json.dumps({'status': response.status_code, 'elapsed_ms': elapsed_ms, 'modules': loaded}))
+"""
+
+def run_python(args, env=None):
+    """Run a Python subprocess from the project root and return the completed process."""
+    return subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into {module: cumulative microseconds}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+class TestServingStartup(unittest.TestCase):
+    """Import-time and cold-start budget of a serving-only instance."""
+
+    def test_serving_imports_exclude_training_stack(self):
+        """Test that creating the app does not import the training or plotting stack."""
+        result = run_python(['-X', 'importtime', '-c', SERVING_STARTUP])
+        loaded = {name.split('.')[0] for name in parse_importtime(result.stderr)}
+        for package in TRAINING_STACK:
+            self.assertNotIn(package, loaded)
+
+    def test_import_time_budget(self):
+        """Test that importing the app stays within the import-time budget."""
+        result = run_python(['-X', 'importtime', '-c', SERVING_STARTUP])
+        import_ms = parse_importtime(result.stderr)['app'] / 1000
+        print(f"\napp import time: {import_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)")
+        self.assertLess(import_ms, IMPORT_TIME_BUDGET_MS)
+
+    def test_cold_start_with_mmap_model(self):
+        """Test that a serving-only instance answers its first request without sklearn."""
+        model = SentimentModel(load=False)
+        model.fit_models(model.preprocess_text(["I love it", "I hate it", "great product", "awful service"]),
+                         [1, 0, 1, 0], [0, 1, 0, 1])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'sentiment_model.pkl')
+            model.bundle.save(model_path)
+
+            env = dict(os.environ, MODEL_PATH=model_path, MODEL_MMAP='True', SERVING_ONLY='True',
+                       INFERENCE_MODE='fused', MICROBATCH_ENABLED='False')
+            env.pop('INIT_DB', None)
+            env.pop('ENABLE_SCHEDULER', None)
+            result = json.loads(run_python(['-c', COLD_START], env=env).stdout.splitlines()[-1])
+
+        print(f"\ncold start to first response: {result['elapsed_ms']:.0f} ms (budget {COLD_START_BUDGET_MS:.0f} ms)")
+        self.assertEqual(result['status'], 200)
+        for package in TRAINING_STACK:
+            self.assertNotIn(package, result['modules'])
+        self.assertLess(result['elapsed_ms'], COLD_START_BUDGET_MS)
+
+    def test_spawned_processes_do_not_create_app(self):
+        """Test that retraining and job worker processes spawned by app/app.py do not create an app."""
+        # A spawned process re-runs the main module of its parent under this name
+        with mock.patch('app.create_app') as create_app:
+            runpy.run_path(os.path.join(PROJECT_ROOT, 'app', 'app.py'), run_name='__mp_main__')
+        create_app.assert_not_called()
+
+    def test_wsgi_entry_point_creates_app_on_access(self):
+        """Test that app.app:app still names the WSGI application, created on first access."""
+        import app.app as entry_point
+
+        with mock.patch.object(entry_point, 'create_app') as create_app, mock.patch.object(entry_point, '_app', None):
+            self.assertIs(entry_point.app, create_app.return_value)
+            self.assertIs(entry_point.app, create_app.return_value)
+        create_app.assert_called_once_with()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models.text_normalizer import TextNormalizer, STEPS, LEGACY_STEPS, SEPARATOR
+from app.models.model_bundle import ModelBundle
+from app.models.sentiment_model import SentimentModel
+from benchmarks.suites import noisy_tweets
+
+# Per-tweet normalization budget, generous enough for a loaded CI machine
+# (override with the environment variable of the same name)
+NORMALIZATION_BUDGET_US = float(os.getenv('NORMALIZATION_BUDGET_US', 50))
+
+class TestTextNormalizer(unittest.TestCase):
+    """Test cases for the text normalization applied in training and prediction."""
+
+    def test_normalize(self):
+        """Test every step, and that batches give the same result as single texts."""
+        normalizer = TextNormalizer(STEPS)
+        texts = ["Check https://t.co/AbC and www.example.com @Bob_1 #Love it!",
+                 "Soooo GOOOD, 1,000 times better than covid19 😍",
+                 "ｆｕｌｌ ｗｉｄｔｈ ﬁne",
+                 ""]
+        expected = ["check _url_ and _url_ _user_ love it!",
+                    "soo good, _num_ times better than covid19 😍",
+                    "full width fine",
+                    ""]
+        self.assertEqual(normalizer.normalize(texts), expected)
+        self.assertEqual(normalizer.normalize(texts), [normalizer.normalize([text])[0] for text in texts])
+
+        # Texts containing the separator are normalized one by one
+        self.assertEqual(normalizer.normalize([f"A{SEPARATOR}B", "@c"]), [f"a{SEPARATOR}b", "_user_"])
+        self.assertEqual(TextNormalizer(LEGACY_STEPS).normalize(texts), [text.lower() for text in texts])
+        with self.assertRaises(ValueError):
+            TextNormalizer(['lowercase', 'stemming'])
+
+    def test_model_keeps_training_normalization(self):
+        """Test that a saved model predicts with the steps it was trained with."""
+        model = SentimentModel(load=False)
+        texts = ["I love it http://a.io", "I hate it @x", "great product", "awful service"]
+        model.fit_models(model.preprocess_text(texts), [1, 0, 1, 0], [0, 1, 0, 1],
+                         normalizer=TextNormalizer(['lowercase', 'urls']))
+        self.assertEqual(model.bundle.metadata['normalization'], ['lowercase', 'urls'])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'sentiment_model.pkl')
+            model.bundle.save(model_path)
+            for bundle in (ModelBundle.load(model_path), ModelBundle.load_mmap(model_path)):
+                self.assertEqual(bundle.normalizer.normalize(["LOVE @you http://a.io"]), ["love @you _url_"])
+
+        # Models saved before normalization was configurable were only lowercased
+        self.assertEqual(ModelBundle(None, None).normalizer.steps, LEGACY_STEPS)
+
+    def test_normalization_budget(self):
+        """Test that normalizing a large batch stays within the per-tweet budget."""
+        normalizer = TextNormalizer(STEPS)
+        tweets = noisy_tweets(10000)
+        durations = []
+        for _ in range(3):
+            start = time.perf_counter()
+            normalizer.normalize(tweets)
+            durations.append(time.perf_counter() - start)
+        per_tweet_us = min(durations) / len(tweets) * 1e6
+        print(f"\ntext normalization: {per_tweet_us:.1f} us per tweet (budget {NORMALIZATION_BUDGET_US:.0f} us)")
+        self.assertLess(per_tweet_us, NORMALIZATION_BUDGET_US)
+
+if __name__ == '__main__':
+    unittest.main()
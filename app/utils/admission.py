@@ -0,0 +1,64 @@
+import threading
+from app.config.config import MAX_IN_FLIGHT_TWEETS
+from app.utils.metrics import IN_FLIGHT_TWEETS, SHED_REQUESTS
+
+IN_FLIGHT = IN_FLIGHT_TWEETS.labels()
+SHED = SHED_REQUESTS.labels()
+
+class AdmissionController:
+    """Bounds the number of tweets being scored at once by /analyze requests.
+
+    A request is admitted if its tweets fit under the limit alongside the tweets
+    already in flight. Otherwise it is rejected right away, and the client should
+    retry later. Queueing it would add its wait to the latency of every request
+    behind it. A request is always admitted when nothing else is in flight, so
+    a batch larger than the limit (but within the batch size limit) is slow
+    rather than refused forever.
+    """
+
+    def __init__(self, max_in_flight):
+        """Initialize the controller.
+
+        Args:
+            max_in_flight (int): Maximum number of tweets in flight (0 disables the limit).
+        """
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, n_tweets):
+        """Admit a request of n_tweets, returning False if it must be rejected."""
+        with self._lock:
+            if self.max_in_flight and self.in_flight and self.in_flight + n_tweets > self.max_in_flight:
+                self.rejected += 1
+                SHED.inc()
+                return False
+            self.in_flight += n_tweets
+            self.admitted += 1
+            IN_FLIGHT.set(self.in_flight)
+            return True
+
+    def release(self, n_tweets):
+        """Release the tweets of a finished request."""
+        with self._lock:
+            self.in_flight -= n_tweets
+            IN_FLIGHT.set(self.in_flight)
+
+    def stats(self):
+        """Return the in-flight count and the admitted and rejected request counters."""
+        with self._lock:
+            return {
+                'max_in_flight': self.max_in_flight,
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+            }
+
+# Singleton instance shared by the request threads of this process
+admission_instance = AdmissionController(MAX_IN_FLIGHT_TWEETS)
+
+def get_admission_controller():
+    """Get the singleton admission controller."""
+    return admission_instance
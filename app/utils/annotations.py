@@ -0,0 +1,90 @@
+import csv
+import json
+
+class AnnotationError(ValueError):
+    """Raised when an annotated tweet record is invalid.
+
+    Records are numbered from 1 in the same way for every input format: the items
+    of a JSON list, the non-empty lines of a JSONL body and the data rows of a CSV
+    file (after its header).
+    """
+
+    def __init__(self, record_number, message):
+        super().__init__(f"Record {record_number} (counting from 1, without blank lines or the CSV header): {message}")
+        self.record_number = record_number
+
+def _parse_label(value, name, record_number):
+    """Parse a 0/1 label given as an int, a bool or a string (as read from CSV)."""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        value = {'0': 0, '1': 1, 'false': 0, 'true': 1, '': 0}.get(value, value)
+    if isinstance(value, bool):
+        value = int(value)
+    if value not in (0, 1) or isinstance(value, float):
+        raise AnnotationError(record_number, f"'{name}' must be 0 or 1")
+    return value
+
+def parse_annotation(record, record_number):
+    """Validate an annotated tweet and return it as a (text, positive, negative) row.
+
+    Args:
+        record (dict): Object with a 'text' string and optional 'positive' and
+            'negative' labels (0 or 1, default 0).
+        record_number (int): Position of the record, used in error messages.
+
+    Raises:
+        AnnotationError: If the record is not a valid annotated tweet.
+    """
+    if not isinstance(record, dict):
+        raise AnnotationError(record_number, "expected an object with a 'text' field")
+    text = record.get('text')
+    if not isinstance(text, str) or not text.strip():
+        raise AnnotationError(record_number, "'text' must be a non-empty string")
+    return (text,
+            _parse_label(record.get('positive', 0), 'positive', record_number),
+            _parse_label(record.get('negative', 0), 'negative', record_number))
+
+def iter_annotations(records):
+    """Validate annotated tweet records lazily.
+
+    Yields:
+        tuple: A (text, positive, negative) row for each record, in order.
+    """
+    for record_number, record in enumerate(records, start=1):
+        yield parse_annotation(record, record_number)
+
+def iter_jsonl_records(lines):
+    """Parse one JSON object per non-empty line (lines may be bytes or str).
+
+    Blank lines are skipped and not counted, so errors are numbered by record like
+    those of iter_annotations().
+    """
+    record_number = 0
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        record_number += 1
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise AnnotationError(record_number, f"invalid JSON ({e})")
+
+def iter_annotation_file(path):
+    """Read annotated tweets from a CSV file (with a header row) or a JSONL file.
+
+    The format is chosen from the file extension: .csv, or .jsonl/.ndjson.
+
+    Yields:
+        tuple: A (text, positive, negative) row for each record, in order.
+    """
+    extension = path.lower().rsplit('.', 1)[-1]
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if extension == 'csv':
+            yield from iter_annotations(csv.DictReader(f))
+        elif extension in ('jsonl', 'ndjson'):
+            yield from iter_annotations(iter_jsonl_records(f))
+        else:
+            raise ValueError(f"Unsupported annotation file format: {path} (expected .csv, .jsonl or .ndjson)")
@@ -0,0 +1,140 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from app.models.sentiment_model import get_model_instance
+from app.config.config import MICROBATCH_WINDOW_MS, MICROBATCH_MAX_BATCH
+
+class BatcherUnavailable(RuntimeError):
+    """Raised when the worker thread cannot score a request (it stopped or timed out)."""
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into a single model call.
+
+    Request threads call predict() and block until their scores are ready. A single
+    background thread takes the first pending request, keeps collecting requests for
+    up to window_ms (or until max_batch tweets are queued), scores all of them with
+    one predict_fn call and hands each request its own slice of the results.
+
+    A longer window or a larger max_batch gives bigger batches and higher throughput
+    at the cost of up to window_ms of extra latency per request.
+
+    The distribution of the batch sizes is recorded by the model itself, in the
+    sentiment_batch_size{source="model"} histogram (see app/utils/metrics.py).
+    """
+
+    def __init__(self, predict_fn, window_ms=MICROBATCH_WINDOW_MS, max_batch=MICROBATCH_MAX_BATCH):
+        """Initialize the batcher and start its worker thread.
+
+        Args:
+            predict_fn (callable): Function scoring a list of texts, returning a sequence of scores.
+            window_ms (float): How long to wait for more requests after the first one arrives.
+            max_batch (int): Maximum number of tweets merged into one call.
+        """
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._tweets = 0
+        self._largest_batch = 0
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def predict(self, texts, timeout=None):
+        """Score texts as part of the next batch and return their scores in order.
+
+        Args:
+            texts (list): The texts to score.
+            timeout (float): Seconds to wait for the scores (None waits forever).
+
+        Raises:
+            BatcherUnavailable: If the worker thread has stopped, or the scores are
+                not ready within timeout seconds.
+        """
+        if not self._worker.is_alive():
+            raise BatcherUnavailable("The micro-batching worker thread has stopped")
+        future = Future()
+        self._queue.put((list(texts), future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise BatcherUnavailable(f"No scores from the micro-batching worker within {timeout}s")
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes or the batch is full."""
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.window
+
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+
+        return pending, size
+
+    def _run(self):
+        """Worker loop: collect, score and scatter batches forever."""
+        while True:
+            pending, size = self._collect()
+            texts = [text for request_texts, _ in pending for text in request_texts]
+
+            try:
+                scores = self.predict_fn(texts)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for request_texts, future in pending:
+                future.set_result(scores[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+            self._record(len(pending), size)
+
+    def _record(self, n_requests, n_tweets):
+        """Update the batch-size counters."""
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += n_requests
+            self._tweets += n_tweets
+            self._largest_batch = max(self._largest_batch, n_tweets)
+
+    def stats(self):
+        """Return the achieved batch-size counters."""
+        with self._stats_lock:
+            batches = self._batches
+            return {
+                'window_ms': self.window * 1000.0,
+                'max_batch': self.max_batch,
+                'batches': batches,
+                'requests': self._requests,
+                'tweets': self._tweets,
+                'mean_requests_per_batch': self._requests / batches if batches else 0.0,
+                'mean_tweets_per_batch': self._tweets / batches if batches else 0.0,
+                'largest_batch': self._largest_batch,
+            }
+
+# Singleton instance of the batcher
+batcher_instance = None
+_batcher_lock = threading.Lock()
+
+def get_batcher():
+    """Get the singleton MicroBatcher in front of the sentiment model."""
+    global batcher_instance
+    if batcher_instance is None:
+        with _batcher_lock:
+            if batcher_instance is None:
+                # Resolve the model on every batch so it always scores with the installed model
+                batcher_instance = MicroBatcher(lambda texts: get_model_instance().predict_sentiment(texts))
+    return batcher_instance
@@ -0,0 +1,196 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+class ConnectionPool:
+    """Thread-safe pool of reusable database connections.
+
+    Connections are opened on demand up to max_size and returned to the pool after
+    use instead of being closed. On checkout, a connection older than max_lifetime
+    is replaced, and any other connection is pinged so a connection dropped by the
+    server is never handed out. On return, the open transaction is rolled back so
+    the next borrower starts from a clean session.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, max_lifetime=3600, timeout=30):
+        """Initialize the pool and open min_size connections.
+
+        Args:
+            connect (callable): Function returning a new DB-API connection.
+            min_size (int): Connections opened up front and kept open.
+            max_size (int): Maximum number of open connections.
+            max_lifetime (float): Seconds after which a connection is closed and
+                replaced (0 means no limit).
+            timeout (float): Seconds to wait for a free connection before raising
+                PoolTimeout.
+        """
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+
+        # Idle connections as (connection, created_at); checked out LIFO so the
+        # most recently used connections stay warm and extra ones can age out
+        self._idle = deque()
+        self._in_use = {}
+        # Open connections, including ones being opened by a borrower
+        self._size = 0
+        self._condition = threading.Condition()
+
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connections_created = 0
+        self.connections_recycled = 0
+        self.failed_health_checks = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+        for _ in range(min_size):
+            connection, created_at = self._open()
+            self._idle.append((connection, created_at))
+            self._size += 1
+
+    def _open(self):
+        """Open a new connection."""
+        connection = self._connect()
+        with self._condition:
+            self.connections_created += 1
+        return connection, time.monotonic()
+
+    def _expired(self, created_at):
+        """Return whether a connection has outlived max_lifetime."""
+        return bool(self.max_lifetime) and time.monotonic() - created_at > self.max_lifetime
+
+    def _healthy(self, connection, created_at):
+        """Check a connection before handing it out, closing it if it is unusable."""
+        if self._expired(created_at):
+            with self._condition:
+                self.connections_recycled += 1
+        else:
+            try:
+                connection.ping(reconnect=False)
+                return True
+            except Exception:
+                with self._condition:
+                    self.failed_health_checks += 1
+        self._close(connection)
+        return False
+
+    @staticmethod
+    def _close(connection):
+        """Close a connection, ignoring errors from an already broken one."""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Check out a healthy connection, waiting up to timeout for a free one.
+
+        Raises:
+            PoolTimeout: If max_size connections stay in use for the whole timeout.
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve a slot and open the connection outside the lock
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s "
+                                      f"(max_size={self.max_size})")
+                self._condition.wait(remaining)
+
+        # An unhealthy connection keeps its slot, which is reused for the replacement
+        if connection is None or not self._healthy(connection, created_at):
+            try:
+                connection, created_at = self._open()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+
+        wait_time = time.monotonic() - start
+        with self._condition:
+            self._in_use[id(connection)] = created_at
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, or close it if discard is set or it expired."""
+        with self._condition:
+            created_at = self._in_use.pop(id(connection))
+            close = discard or self._expired(created_at)
+            if close:
+                self._size -= 1
+                if not discard:
+                    self.connections_recycled += 1
+            else:
+                self._idle.append((connection, created_at))
+            self._condition.notify()
+        if close:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block.
+
+        Whatever the block did not commit is rolled back before the connection goes
+        back to the pool. A connection that cannot even be rolled back is discarded.
+        """
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        finally:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+            self.release(connection, discard=discard)
+
+    def close(self):
+        """Close all idle connections (connections in use are closed when released)."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self):
+        """Return the pool size, utilization and checkout wait times."""
+        with self._condition:
+            in_use = len(self._in_use)
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': in_use,
+                'utilization': in_use / self.max_size,
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connections_created': self.connections_created,
+                'connections_recycled': self.connections_recycled,
+                'failed_health_checks': self.failed_health_checks,
+                'wait_time_avg_ms': self.wait_time_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                'wait_time_max_ms': self.wait_time_max * 1000,
+            }
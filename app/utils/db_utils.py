@@ -1,7 +1,18 @@
+import threading
+import numpy as np
 import pymysql
-from app.config.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+from app.config.config import (DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE,
+                               DB_POOL_MAX_LIFETIME, DB_POOL_TIMEOUT, DB_INSERT_CHUNK_SIZE,
+                               TRAINING_FETCH_SIZE)
+from app.utils.db_pool import ConnectionPool
+from app.utils.ndjson import iter_chunks
+from app.utils.metrics import DB_CALL_SECONDS, timed
 import pandas as pd
 
+# Pool shared by all db_utils helpers, created on first use
+pool_instance = None
+_pool_lock = threading.Lock()
+
 def get_db_connection():
     """Create a connection to the MySQL database."""
     try:
@@ -19,71 +30,169 @@ def get_db_connection():
         print(f"Error connecting to MySQL database: {e}")
         raise
 
+def get_pool():
+    """Get the singleton connection pool."""
+    global pool_instance
+    if pool_instance is None:
+        with _pool_lock:
+            if pool_instance is None:
+                try:
+                    pool_instance = ConnectionPool(get_db_connection, min_size=DB_POOL_MIN_SIZE,
+                                                   max_size=DB_POOL_MAX_SIZE, max_lifetime=DB_POOL_MAX_LIFETIME,
+                                                   timeout=DB_POOL_TIMEOUT)
+                except Exception as e:
+                    print(f"Error creating database connection pool: {e}")
+                    raise
+    return pool_instance
+
+def get_pool_stats():
+    """Return the connection pool statistics, or None if the pool has not been created yet."""
+    return pool_instance.stats() if pool_instance is not None else None
+
 def create_tables():
-    """Create the necessary tables if they don't exist."""
-    connection = get_db_connection()
+    """Create the necessary tables if they don't exist and bring the schema up to date."""
+    from app.utils.migrations import migrate
+    
+    migrate()
+
+def iter_training_data(after_id=0, chunk_size=TRAINING_FETCH_SIZE):
+    """Stream annotated tweets from the database in column-oriented chunks.
+
+    Rows are read with an unbuffered server-side cursor, so the client holds at most
+    one chunk of rows at a time, and each chunk is returned as columns instead of
+    per-row dicts.
+
+    Args:
+        after_id (int): Only return tweets with an id greater than this watermark.
+        chunk_size (int): Rows per chunk.
+
+    Yields:
+        dict: 'id' (int64 array), 'text' (list of str), 'positive' and 'negative'
+            (int8 arrays) for up to chunk_size tweets, in id order.
+    """
     try:
-        with connection.cursor() as cursor:
-            # Create tweets table for storing annotated tweets
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tweets (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    text TEXT NOT NULL,
-                    positive TINYINT NOT NULL DEFAULT 0,
-                    negative TINYINT NOT NULL DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            """)
-        connection.commit()
+        with get_pool().connection() as connection:
+            with connection.cursor(pymysql.cursors.SSCursor) as cursor:
+                with DB_CALL_SECONDS.labels(operation='training_data_query').time():
+                    cursor.execute("SELECT id, text, positive, negative FROM tweets WHERE id > %s ORDER BY id",
+                                   (after_id,))
+                fetch_seconds = DB_CALL_SECONDS.labels(operation='training_data_fetch')
+                while True:
+                    with fetch_seconds.time():
+                        rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    ids, texts, positive, negative = zip(*rows)
+                    yield {
+                        'id': np.array(ids, dtype=np.int64),
+                        'text': list(texts),
+                        'positive': np.array(positive, dtype=np.int8),
+                        'negative': np.array(negative, dtype=np.int8),
+                    }
     except Exception as e:
-        print(f"Error creating tables: {e}")
+        print(f"Error streaming training data: {e}")
         raise
-    finally:
-        connection.close()
 
-def get_training_data():
-    """Get all annotated tweets from the database for model training."""
-    connection = get_db_connection()
+@timed(DB_CALL_SECONDS.labels(operation='get_dataset_fingerprint'))
+def get_dataset_fingerprint():
+    """Compute a cheap fingerprint of the training data.
+
+    The fingerprint combines the row count, the highest id and an order-independent
+    checksum (BIT_XOR of CRC32) of every row's id and labels, so added, deleted and
+    relabeled tweets all change it. It is computed by the database in a single scan
+    without transferring any rows.
+
+    Returns:
+        dict: 'rows', 'max_id' and 'checksum' integers.
+    """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT text, positive, negative FROM tweets")
-            tweets = cursor.fetchall()
-        return pd.DataFrame(tweets)
+        with get_pool().connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT COUNT(*) AS `rows`,
+                           COALESCE(MAX(id), 0) AS max_id,
+                           COALESCE(BIT_XOR(CRC32(CONCAT_WS(':', id, positive, negative))), 0) AS checksum
+                    FROM tweets
+                """)
+                fingerprint = cursor.fetchone()
+        return {key: int(value) for key, value in fingerprint.items()}
     except Exception as e:
-        print(f"Error getting training data: {e}")
+        print(f"Error computing dataset fingerprint: {e}")
         raise
-    finally:
-        connection.close()
 
+def get_training_data():
+    """Get all annotated tweets from the database for model training."""
+    texts, positive, negative = [], [], []
+    for chunk in iter_training_data():
+        texts.extend(chunk['text'])
+        positive.append(chunk['positive'])
+        negative.append(chunk['negative'])
+    
+    return pd.DataFrame({
+        'text': texts,
+        'positive': np.concatenate(positive) if positive else np.array([], dtype=np.int8),
+        'negative': np.concatenate(negative) if negative else np.array([], dtype=np.int8),
+    })
+
+@timed(DB_CALL_SECONDS.labels(operation='save_tweet'))
 def save_tweet(text, positive=0, negative=0):
     """Save a new annotated tweet to the database."""
-    connection = get_db_connection()
     try:
-        with connection.cursor() as cursor:
-            sql = "INSERT INTO tweets (text, positive, negative) VALUES (%s, %s, %s)"
-            cursor.execute(sql, (text, positive, negative))
-        connection.commit()
+        with get_pool().connection() as connection:
+            with connection.cursor() as cursor:
+                sql = "INSERT INTO tweets (text, positive, negative) VALUES (%s, %s, %s)"
+                cursor.execute(sql, (text, positive, negative))
+            connection.commit()
     except Exception as e:
         print(f"Error saving tweet: {e}")
         raise
-    finally:
-        connection.close()
 
+def save_tweets(rows, chunk_size=DB_INSERT_CHUNK_SIZE):
+    """Save many annotated tweets to the database in a single transaction.
+
+    Rows are inserted in chunks of chunk_size with executemany, which sends each
+    chunk as one multi-row INSERT. Either every row is committed or, if any chunk
+    fails (or the rows iterable raises), none is.
+
+    Args:
+        rows (iterable): (text, positive, negative) tuples. May be a generator, so
+            large files are never held in memory.
+        chunk_size (int): Rows per INSERT statement.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    inserted = 0
+    try:
+        with get_pool().connection() as connection:
+            with connection.cursor() as cursor:
+                sql = "INSERT INTO tweets (text, positive, negative) VALUES (%s, %s, %s)"
+                insert_seconds = DB_CALL_SECONDS.labels(operation='save_tweets_chunk')
+                for chunk in iter_chunks(rows, chunk_size):
+                    with insert_seconds.time():
+                        cursor.executemany(sql, chunk)
+                    inserted += len(chunk)
+            with DB_CALL_SECONDS.labels(operation='commit').time():
+                connection.commit()
+        return inserted
+    except Exception as e:
+        print(f"Error saving tweets: {e}")
+        raise
+
+@timed(DB_CALL_SECONDS.labels(operation='get_recent_tweets'))
 def get_recent_tweets(limit=1000):
     """Get the most recent annotated tweets from the database."""
-    connection = get_db_connection()
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT text, positive, negative 
-                FROM tweets 
-                ORDER BY created_at DESC 
-                LIMIT %s
-            """, (limit,))
-            tweets = cursor.fetchall()
+        with get_pool().connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT text, positive, negative 
+                    FROM tweets 
+                    ORDER BY created_at DESC 
+                    LIMIT %s
+                """, (limit,))
+                tweets = cursor.fetchall()
         return pd.DataFrame(tweets)
     except Exception as e:
         print(f"Error getting recent tweets: {e}")
         raise
-    finally:
-        connection.close()
@@ -0,0 +1,259 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.models.sentiment_model import SentimentModel
+from app.models.model_bundle import ModelBundle, load_bundle
+from app.config.config import MODEL_PATH, JOBS_DIR, JOB_WORKERS, JOB_SHARD_SIZE, STREAM_CHUNK_SIZE
+from app.utils.ndjson import iter_tweets, iter_chunks, dumps_line
+
+# Model loaded once in each worker process, with the mtime of the model file it came from
+_worker_model = None
+_worker_model_mtime = None
+
+def _get_worker_model():
+    """Return the worker's model, reloading it if a retrain replaced the model files.
+
+    Workers only load the model saved by the server; they never train one, so
+    several workers cannot train at once and write the same model files.
+
+    Raises:
+        FileNotFoundError: If no model has been saved yet.
+    """
+    global _worker_model, _worker_model_mtime
+    if not ModelBundle.exists(MODEL_PATH):
+        raise FileNotFoundError(f"No saved model at {MODEL_PATH}; jobs can only run once the server has trained one")
+    # The metadata file is written last when a model is saved
+    model_file = f"{MODEL_PATH}_meta.json"
+    if not os.path.exists(model_file):
+        model_file = f"{MODEL_PATH}_positive.pkl"
+    mtime = os.path.getmtime(model_file)
+    if _worker_model is None or mtime != _worker_model_mtime:
+        model = SentimentModel(load=False)
+        model.install_bundle(load_bundle(MODEL_PATH))
+        _worker_model = model
+        _worker_model_mtime = mtime
+    return _worker_model
+
+def _init_worker():
+    """Load the model once when a worker process starts."""
+    # A failure here would break the whole pool; let the shards report it instead
+    if not ModelBundle.exists(MODEL_PATH):
+        return
+    try:
+        _get_worker_model()
+    except Exception as e:
+        print(f"Error loading model in job worker: {e}")
+
+def _score_shard(input_path, output_path):
+    """Score one shard of a job inside a worker process.
+
+    Reads tweets from input_path (NDJSON), scores them in chunks and writes one
+    {"tweet": ..., "score": ...} line per tweet to output_path.
+
+    Returns:
+        int: Number of tweets scored.
+    """
+    model = _get_worker_model()
+    count = 0
+    tmp_path = f"{output_path}.tmp"
+
+    with open(input_path, 'r', encoding='utf-8') as f_in, open(tmp_path, 'w', encoding='utf-8') as f_out:
+        for chunk in iter_chunks(iter_tweets(f_in), STREAM_CHUNK_SIZE):
+            sentiment_scores = model.predict_sentiment(chunk)
+            f_out.write(''.join(dumps_line({'tweet': tweet, 'score': float(score)})
+                                for tweet, score in zip(chunk, sentiment_scores)))
+            count += len(chunk)
+
+    os.replace(tmp_path, output_path)
+    return count
+
+class JobManager:
+    """Run bulk scoring jobs on a process pool, away from the request threads.
+
+    Submitted tweets are written to disk in shards of JOB_SHARD_SIZE tweets. Each
+    shard is scored by a worker process that loads the model once, so a job spreads
+    across all workers and Flask threads only pay for writing the upload to disk.
+    Job state is kept in memory; results stay in JOBS_DIR until they are deleted.
+    """
+
+    def __init__(self, jobs_dir=JOBS_DIR, max_workers=JOB_WORKERS, shard_size=JOB_SHARD_SIZE):
+        """Initialize the job manager.
+
+        Args:
+            jobs_dir (str): Directory holding the input and result shards of each job.
+            max_workers (int): Number of worker processes.
+            shard_size (int): Number of tweets per shard.
+        """
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers
+        self.shard_size = shard_size
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        """Start the worker pool on first use."""
+        with self._lock:
+            if self._executor is None:
+                # Spawn fresh workers rather than forking the threaded server process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _job_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def submit(self, tweets):
+        """Create a job scoring an iterable of tweets.
+
+        The tweets are consumed lazily and written to disk shard by shard, so the
+        iterable may be a stream of any size.
+
+        Returns:
+            str: The job id.
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+
+        shards = []
+        total = 0
+        try:
+            for i, chunk in enumerate(iter_chunks(tweets, self.shard_size)):
+                input_path = os.path.join(job_dir, f"input_{i:05d}.ndjson")
+                with open(input_path, 'w', encoding='utf-8') as f:
+                    f.write(''.join(dumps_line(tweet) for tweet in chunk))
+                shards.append((input_path, os.path.join(job_dir, f"results_{i:05d}.ndjson")))
+                total += len(chunk)
+        except Exception:
+            self.delete(job_id)
+            raise
+
+        job = {
+            'id': job_id,
+            'status': 'queued' if shards else 'completed',
+            'total_tweets': total,
+            'scored_tweets': 0,
+            'total_shards': len(shards),
+            'completed_shards': 0,
+            'created_at': time.time(),
+            'finished_at': None if shards else time.time(),
+            'error': None,
+            'results': [output_path for _, output_path in shards],
+            'futures': [],
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+
+        try:
+            executor = self._get_executor()
+            for input_path, output_path in shards:
+                future = executor.submit(_score_shard, input_path, output_path)
+                with self._lock:
+                    job['futures'].append(future)
+                future.add_done_callback(lambda f, job_id=job_id: self._on_shard_done(job_id, f))
+        except BrokenProcessPool as e:
+            self._discard_executor()
+            self._fail(job_id, e)
+
+        return job_id
+
+    def _discard_executor(self):
+        """Drop a broken worker pool so the next job starts a fresh one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _fail(self, job_id, error):
+        """Mark a job as failed."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] != 'failed':
+                job['status'] = 'failed'
+                job['error'] = str(error)
+                job['finished_at'] = time.time()
+
+    def _on_shard_done(self, job_id, future):
+        """Update the job progress when a shard completes or fails."""
+        error = future.exception()
+        if error is not None:
+            if isinstance(error, BrokenProcessPool):
+                self._discard_executor()
+            self._fail(job_id, error)
+            return
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] == 'failed':
+                return
+
+            job['status'] = 'running'
+            job['completed_shards'] += 1
+            job['scored_tweets'] += future.result()
+            if job['completed_shards'] == job['total_shards']:
+                job['status'] = 'completed'
+                job['finished_at'] = time.time()
+
+    def get(self, job_id):
+        """Return the public status of a job, or None if it does not exist."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = {key: value for key, value in job.items() if key not in ('results', 'futures')}
+
+        status['progress'] = status['scored_tweets'] / status['total_tweets'] if status['total_tweets'] else 1.0
+        return status
+
+    def iter_results(self, job_id):
+        """Yield the NDJSON result lines of a completed job, in input order."""
+        with self._lock:
+            result_paths = list(self._jobs[job_id]['results'])
+
+        for path in result_paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield from f
+
+    def delete(self, job_id):
+        """Forget a job and remove its files.
+
+        Jobs whose shards are still being scored (including failed jobs with shards
+        in flight) are not deleted, since the workers are still writing their files.
+
+        Returns:
+            bool: True if the job was deleted, False if it is still running.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and (job['status'] in ('queued', 'running')
+                                    or not all(future.done() for future in job['futures'])):
+                return False
+            self._jobs.pop(job_id, None)
+
+        job_dir = self._job_dir(job_id)
+        if os.path.isdir(job_dir):
+            for name in os.listdir(job_dir):
+                os.remove(os.path.join(job_dir, name))
+            os.rmdir(job_dir)
+        return True
+
+# Singleton instance of the job manager
+job_manager_instance = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager():
+    """Get the singleton JobManager."""
+    global job_manager_instance
+    if job_manager_instance is None:
+        with _job_manager_lock:
+            if job_manager_instance is None:
+                job_manager_instance = JobManager()
+    return job_manager_instance
@@ -0,0 +1,214 @@
+"""
+Process-local metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are kept in memory and rendered by the
+/metrics endpoint. Recording a value takes one lock and, for histograms, one
+bisect, so the timing hooks on the request and scoring paths cost about a
+microsecond each. Hot paths look up their labelled child once, at import time,
+and call observe() on it directly.
+
+Every process keeps its own values: with several server processes, each one
+must be scraped (or the values aggregated by the server's own means).
+"""
+
+import time
+import threading
+import functools
+from bisect import bisect_left
+
+# Seconds, from 100 us (one small compiled-scorer batch) to 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+RETRAIN_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+def _escape(value):
+    """Escape a label value for the exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    """Format label pairs as {name="value",...} (empty when there are no labels)."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    """Format a sample value, writing whole numbers without a decimal point."""
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class _Metric:
+    """Base class of a metric family with optional labels."""
+
+    type_name = None
+    # Counters are exposed as <name>_total
+    family_suffix = ''
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        """Return the child recording values for one combination of label values."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self):
+        """Remove every child (for example the previous model version of an info gauge)."""
+        with self._lock:
+            self._children.clear()
+
+    def samples(self):
+        """Yield (suffix, label string, value) for every sample of the family."""
+        for key, child in sorted(self._children.items()):
+            yield from child.samples(self.labelnames, key)
+
+    def render(self):
+        """Return the family in the exposition format."""
+        family = self.name + self.family_suffix
+        lines = [f"# HELP {family} {self.documentation}", f"# TYPE {family} {self.type_name}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self.samples())
+        return '\n'.join(lines)
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Increase the counter."""
+        with self._lock:
+            self.value += amount
+
+    def samples(self, labelnames, key):
+        yield '_total', _format_labels(labelnames, key), self.value
+
+class Counter(_Metric):
+    """A monotonically increasing count. The name is rendered with a _total suffix."""
+
+    type_name = 'counter'
+    family_suffix = '_total'
+
+    def _new_child(self):
+        return _CounterChild()
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        """Set the gauge to a value."""
+        self.value = value
+
+    def samples(self, labelnames, key):
+        yield '', _format_labels(labelnames, key), self.value
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+
+    type_name = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+class _Timer:
+    """Context manager observing its duration in a histogram child."""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # counts[i] holds observations in (buckets[i - 1], buckets[i]]; the last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one observation."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        """Return a context manager that observes the duration of its block in seconds."""
+        return _Timer(self)
+
+    def samples(self, labelnames, key):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            yield '_bucket', _format_labels(labelnames, key, [('le', _format_value(bound))]), cumulative
+        yield '_sum', _format_labels(labelnames, key), total
+        yield '_count', _format_labels(labelnames, key), cumulative
+
+class Histogram(_Metric):
+    """Observations counted in cumulative buckets, with their sum and count."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+def timed(histogram):
+    """Decorator observing the duration of each call of a function in a histogram child."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with histogram.time():
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def render(registry=None):
+    """Render every metric of a registry in the Prometheus text exposition format (version 0.0.4)."""
+    metrics = registry if registry is not None else REGISTRY
+    return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+# Metrics registered by the application
+REGISTRY = []
+
+REQUESTS = Counter('sentiment_http_requests', 'HTTP requests by method, route and status code.',
+                   ['method', 'endpoint', 'status'])
+REQUEST_SECONDS = Histogram('sentiment_http_request_duration_seconds', 'HTTP request handling time by route.',
+                            ['endpoint'])
+STAGE_SECONDS = Histogram('sentiment_stage_duration_seconds',
+                          'Time spent in each stage of sentiment analysis requests and model scoring.', ['stage'])
+BATCH_SIZE = Histogram('sentiment_batch_size',
+                       'Tweets per analyze request (source="request") and per model scoring call (source="model").',
+                       ['source'], buckets=BATCH_SIZE_BUCKETS)
+MODEL_INFO = Gauge('sentiment_model_info', 'Version of the installed model (always 1).', ['version'])
+RETRAIN_SECONDS = Histogram('sentiment_retrain_duration_seconds', 'Duration of model retraining runs by mode.',
+                            ['mode'], buckets=RETRAIN_BUCKETS)
+DB_CALL_SECONDS = Histogram('sentiment_db_call_duration_seconds', 'Latency of database calls by operation.',
+                            ['operation'])
+IN_FLIGHT_TWEETS = Gauge('sentiment_in_flight_tweets', 'Tweets being scored by admitted analyze requests.')
+SHED_REQUESTS = Counter('sentiment_shed_requests', 'Analyze requests rejected with 429 by admission control.')
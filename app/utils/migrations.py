@@ -0,0 +1,101 @@
+"""
+Versioned schema migrations for the sentiment analysis database.
+
+Each migration has a version number, a description and the SQL statements that
+apply it. Applied versions are recorded in the schema_migrations table, so every
+migration runs exactly once per database, in order. This is the single definition
+of the database schema: create_tables() and db/setup_db.py both run migrate().
+
+To change the schema, append a new migration; never edit one that has been released.
+"""
+
+from app.utils.db_utils import get_pool
+
+# Name of the MySQL advisory lock that keeps concurrent app instances from
+# applying the same migration twice
+MIGRATION_LOCK = 'sentiment_analysis_schema_migrations'
+MIGRATION_LOCK_TIMEOUT = 60
+
+MIGRATIONS = [
+    (1, "Create tweets table", [
+        """
+        CREATE TABLE IF NOT EXISTS tweets (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            text TEXT NOT NULL,
+            positive TINYINT NOT NULL DEFAULT 0,
+            negative TINYINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """,
+    ]),
+    (2, "Index tweets by created_at for recent-tweet queries", [
+        "CREATE INDEX idx_tweets_created_at ON tweets (created_at)",
+    ]),
+    (3, "Add an indexed hash of the tweet text for deduplication and lookup", [
+        "ALTER TABLE tweets ADD COLUMN text_hash BINARY(16) AS (UNHEX(MD5(text))) STORED",
+        "CREATE INDEX idx_tweets_text_hash ON tweets (text_hash)",
+    ]),
+    (4, "Add label_version to track relabeled tweets", [
+        "ALTER TABLE tweets ADD COLUMN label_version INT NOT NULL DEFAULT 1",
+    ]),
+]
+
+def _ensure_migrations_table(cursor):
+    """Create the table that records applied migrations."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+def _applied_versions(cursor):
+    """Return the set of migration versions already applied."""
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row['version'] for row in cursor.fetchall()}
+
+def get_schema_version():
+    """Return the highest applied migration version (0 for an empty database)."""
+    with get_pool().connection() as connection:
+        with connection.cursor() as cursor:
+            _ensure_migrations_table(cursor)
+            applied = _applied_versions(cursor)
+    return max(applied, default=0)
+
+def migrate(target=None):
+    """Apply all pending migrations up to target (default: the latest).
+
+    MySQL commits DDL statements implicitly, so each migration is recorded as soon as
+    its statements succeed. A migration that fails halfway must be fixed by hand
+    before running migrate() again.
+
+    Returns:
+        list: Versions of the migrations applied by this call.
+    """
+    applied_now = []
+    try:
+        with get_pool().connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (MIGRATION_LOCK, MIGRATION_LOCK_TIMEOUT))
+                if not cursor.fetchone()['locked']:
+                    raise RuntimeError("Timed out waiting for another instance to finish migrating")
+                try:
+                    _ensure_migrations_table(cursor)
+                    applied = _applied_versions(cursor)
+                    for version, description, statements in MIGRATIONS:
+                        if version in applied or (target is not None and version > target):
+                            continue
+                        for statement in statements:
+                            cursor.execute(statement)
+                        cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                                       (version, description))
+                        connection.commit()
+                        applied_now.append(version)
+                        print(f"Applied migration {version}: {description}")
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+        return applied_now
+    except Exception as e:
+        print(f"Error applying migrations: {e}")
+        raise
@@ -0,0 +1,52 @@
+import json
+from itertools import islice
+
+class NDJSONError(ValueError):
+    """Raised when a line of a newline-delimited JSON body is not a valid tweet."""
+
+    def __init__(self, line_number, message):
+        super().__init__(f"Line {line_number}: {message}")
+        self.line_number = line_number
+
+def iter_tweets(lines):
+    """Parse tweets from newline-delimited JSON lines.
+
+    Each non-empty line must be a JSON string or an object with a 'tweet' (or 'text')
+    string field. Lines may be bytes or str.
+
+    Yields:
+        str: The tweet text of each line, in order.
+
+    Raises:
+        NDJSONError: If a line is not valid JSON or does not contain a tweet string.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            raise NDJSONError(line_number, f"invalid JSON ({e})")
+
+        if isinstance(value, dict):
+            value = value.get('tweet', value.get('text'))
+        if not isinstance(value, str):
+            raise NDJSONError(line_number, "expected a string or an object with a 'tweet' string")
+        yield value
+
+def iter_chunks(iterable, size):
+    """Split an iterable into lists of at most size items without materializing it."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def dumps_line(value):
+    """Serialize a value as a single NDJSON line."""
+    return json.dumps(value, ensure_ascii=False) + '\n'
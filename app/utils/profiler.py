@@ -0,0 +1,140 @@
+"""
+Opt-in cProfile sampling of live requests.
+
+When enabled (PROFILING_ENABLED, see create_app), a fraction of the
+/api/sentiment/analyze requests, and every request carrying the profiling
+header, run under cProfile. Each profile is written to the profile directory
+as a pstats file with a JSON sidecar holding the route, status, duration,
+batch size (recorded by the controller in flask.g.batch_size) and model
+version. Only the newest files are kept. scripts/profile_report.py merges
+them into a hot-function report.
+
+Nothing is registered on the app when profiling is disabled, so disabled
+profiling costs nothing per request. When enabled, at most one request is
+profiled at a time; requests arriving meanwhile run unprofiled.
+
+cProfile only sees the request thread. With MICROBATCH_ENABLED, the model is
+scored on the batcher thread, so profiles of /analyze show the request waiting
+for its batch rather than the scoring itself; disable micro-batching while
+profiling to see where the scoring time goes.
+"""
+
+import os
+import glob
+import json
+import time
+import random
+import cProfile
+import threading
+from datetime import datetime
+from flask import request, g
+from app.config.config import PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_HEADER, PROFILE_MAX_FILES
+
+# Endpoint sampled at PROFILE_SAMPLE_RATE; other endpoints are only profiled on request
+SAMPLED_ENDPOINT = 'sentiment.analyze_sentiment'
+
+class RequestProfiler:
+    """Profiles sampled requests of a Flask app and writes rotating profile files."""
+
+    def __init__(self, directory=PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE, header=PROFILE_HEADER,
+                 max_files=PROFILE_MAX_FILES):
+        """Initialize the profiler.
+
+        Args:
+            directory (str): Directory the profiles are written to.
+            sample_rate (float): Fraction of analyze requests to profile.
+            header (str): Request header that forces profiling of any request.
+            max_files (int): Number of most recent profiles to keep.
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.header = header
+        self.max_files = max_files
+        # cProfile can only profile one request at a time
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register the profiling hooks on a Flask app."""
+        app.before_request(self._start)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish)
+
+    def _should_profile(self):
+        """Return True if the current request is requested or sampled for profiling."""
+        if request.headers.get(self.header):
+            return True
+        return request.endpoint == SAMPLED_ENDPOINT and random.random() < self.sample_rate
+
+    def _start(self):
+        """Start profiling the request if it is selected and no other request is being profiled."""
+        if not self._should_profile() or not self._lock.acquire(blocking=False):
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, for example) is already active
+            self._lock.release()
+            return
+        g.profile = profile
+        g.profile_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+        g.profile_start = time.perf_counter()
+
+    def _record_status(self, response):
+        """Remember the status code and tell the client where its profile is written."""
+        if 'profile' in g:
+            g.profile_status = response.status_code
+            response.headers['X-Profile-Id'] = g.profile_id
+        return response
+
+    def _finish(self, exception=None):
+        """Stop profiling and write the profile with its metadata."""
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        profile.disable()
+        duration = time.perf_counter() - g.pop('profile_start')
+        try:
+            self._write(profile, g.pop('profile_id'), {
+                'endpoint': request.url_rule.rule if request.url_rule is not None else request.path,
+                'method': request.method,
+                'status': g.pop('profile_status', 500),
+                'duration_ms': duration * 1000,
+                'batch_size': g.get('batch_size'),
+                'model_version': _model_version(),
+                'sampled': not request.headers.get(self.header),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            })
+        except Exception as e:
+            print(f"Error writing request profile: {e}")
+        finally:
+            self._lock.release()
+
+    def _write(self, profile, profile_id, metadata):
+        """Write a profile and its metadata, then remove the oldest profiles beyond max_files."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{profile_id}.prof")
+        profile.dump_stats(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+
+        # Profile ids start with their timestamp, so sorting by name sorts by age
+        profiles = sorted(glob.glob(os.path.join(self.directory, '*.prof')))
+        for old_path in profiles[:max(0, len(profiles) - self.max_files)]:
+            for stale in (old_path, f"{old_path}.json"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+def _model_version():
+    """Return the version of the loaded model, without loading it if it is not."""
+    from app.models import sentiment_model
+
+    model = sentiment_model.model_instance
+    return model.model_version if model is not None else None
+
+def init_profiler(app, **settings):
+    """Enable request profiling on a Flask app (settings override the PROFILE_* configuration)."""
+    profiler = RequestProfiler(**settings)
+    profiler.init_app(app)
+    return profiler
@@ -27,6 +27,11 @@ def init_scheduler():
     return scheduler
 
 def retrain_model():
-    """Function to retrain the sentiment analysis model."""
+    """Function to retrain the sentiment analysis model.
+    
+    Scheduled runs are incremental (with RETRAIN_INCREMENTAL, the default): only the
+    tweets added since the previous run are trained on, with the promoted ngram_range
+    and C. A newly promoted configuration makes the run rebuild from all tweets.
+    """
     model = get_model_instance()
-    model.retrain_model()
+    model.retrain_model(full=False)
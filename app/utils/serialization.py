@@ -0,0 +1,100 @@
+"""
+Request parsing and response encoding for the analyze endpoint.
+
+JSON is encoded and decoded with orjson when it is installed, falling back to
+the standard library json module. Besides the default {tweet: score} object,
+clients can ask (with the Accept header) for compact responses holding only
+the scores, in the order of the request's tweets:
+
+- application/vnd.sentiment.scores+json: a JSON array of floats
+- application/vnd.sentiment.scores.float32: little-endian float32 values, 4 bytes per tweet
+- application/msgpack: a MessagePack array of floats (only if msgpack is installed)
+"""
+
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'application/json'
+SCORES_JSON = 'application/vnd.sentiment.scores+json'
+SCORES_FLOAT32 = 'application/vnd.sentiment.scores.float32'
+MSGPACK = 'application/msgpack'
+MSGPACK_LEGACY = 'application/x-msgpack'
+
+# Response formats in order of preference: the dict format stays the default for
+# clients that accept anything
+RESPONSE_MEDIA_TYPES = [JSON, SCORES_JSON, SCORES_FLOAT32] + ([MSGPACK, MSGPACK_LEGACY] if msgpack else [])
+
+def loads(data):
+    """Decode a JSON document from bytes or str.
+
+    Raises:
+        ValueError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(value):
+    """Encode a value as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def negotiate(accept):
+    """Pick the response format for a request.
+
+    Args:
+        accept (MIMEAccept): The parsed Accept header of the request.
+
+    Clients whose Accept header matches none of the formats (such as text/html or
+    text/plain) get the default JSON object, as before content negotiation existed.
+
+    Returns:
+        str: The media type to respond with, or None if the client accepts none of
+            them and explicitly excludes JSON (e.g. application/json;q=0).
+    """
+    if not accept:
+        return JSON
+    media_type = accept.best_match(RESPONSE_MEDIA_TYPES)
+    if media_type is None and not _excludes_json(accept):
+        return JSON
+    return media_type
+
+def _excludes_json(accept):
+    """Return True if the Accept header gives JSON (or a range covering it) a quality of 0."""
+    return any(quality == 0 and value.lower() in (JSON, 'application/*', '*/*') for value, quality in accept)
+
+def build_body(tweets, scores, media_type):
+    """Build the response value: {tweet: score} for JSON, otherwise the scores array.
+
+    In the dict format, repeated tweets share one entry; the compact formats keep
+    one score per input tweet, in order.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if media_type == JSON:
+        return dict(zip(tweets, scores.tolist()))
+    return scores
+
+def encode_body(body, media_type):
+    """Encode a value returned by build_body() in the given media type."""
+    if media_type == JSON:
+        return dumps(body)
+    if media_type == SCORES_JSON:
+        if orjson is not None:
+            return orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY)
+        return dumps(body.tolist())
+    if media_type == SCORES_FLOAT32:
+        return body.astype('<f4').tobytes()
+    if media_type in (MSGPACK, MSGPACK_LEGACY):
+        return msgpack.packb(body.tolist())
+    raise ValueError(f"Unsupported media type: {media_type}")
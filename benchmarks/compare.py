@@ -0,0 +1,62 @@
+"""
+Comparison of benchmark results against a stored baseline.
+
+Metrics ending in _per_s are throughputs (higher is better); every other
+metric is a duration (lower is better). Only metrics present in both runs are
+compared, so a baseline recorded with other batch or corpus sizes still
+checks what the two runs have in common. Durations that changed by less than
+an absolute noise floor are never flagged, since sub-millisecond timings
+routinely vary by more than any sensible relative tolerance.
+"""
+
+import json
+
+def load_results(path):
+    """Read a results file written by run_benchmarks.py."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def higher_is_better(metric):
+    """Return True for throughput metrics, False for durations."""
+    return metric.endswith('_per_s')
+
+def duration_ms(metric, value):
+    """Return a duration metric in milliseconds."""
+    return value * 1000 if metric.endswith('_s') else value
+
+def compare(metrics, baseline_metrics, tolerance=0.2, min_delta_ms=1.0):
+    """Compare metrics with a baseline.
+
+    Args:
+        metrics (dict): {metric name: value} of the current run.
+        baseline_metrics (dict): {metric name: value} of the baseline run.
+        tolerance (float): Relative slowdown allowed before a metric counts as a regression.
+        min_delta_ms (float): Smallest absolute slowdown of a duration that counts as a regression.
+
+    Returns:
+        list: (metric, baseline value, current value, change, regressed) for each shared
+            metric, where change is the relative change and positive means slower.
+    """
+    rows = []
+    for metric in sorted(set(metrics) & set(baseline_metrics)):
+        current, baseline = metrics[metric], baseline_metrics[metric]
+        if baseline <= 0:
+            continue
+        change = current / baseline - 1
+        if higher_is_better(metric):
+            change = -change
+            regressed = change > tolerance
+        else:
+            regressed = (change > tolerance
+                         and duration_ms(metric, current) - duration_ms(metric, baseline) >= min_delta_ms)
+        rows.append((metric, baseline, current, change, regressed))
+    return rows
+
+def format_comparison(rows):
+    """Format the rows returned by compare() as a text table."""
+    width = max([len(metric) for metric, _, _, _, _ in rows] + [6])
+    lines = [f"{'metric':<{width}} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for metric, baseline, current, change, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        lines.append(f"{metric:<{width}} {baseline:>12.3f} {current:>12.3f} {change:>+7.1%}{flag}")
+    return '\n'.join(lines)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the inference and training hot paths.
+
+Measures text normalization and predict_sentiment latency percentiles and
+throughput per batch size, end-to-end /api/sentiment/analyze latency through the
+Flask test client, model load time and train_model time on synthetic corpora.
+Results are written to a JSON file and compared against a stored baseline; the
+script exits with status 1 when a metric is slower than the baseline by more
+than the tolerance.
+
+All models are trained and saved in a scratch directory, so the model in data/
+is never touched, and the prediction cache is disabled so every call is scored.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+
+# Add the project root directory to the Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+BENCHMARKS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+SUITES = ['load', 'normalize', 'inference', 'api', 'training']
+
+def configure_environment(scratch_dir):
+    """Point the app configuration at a scratch directory (before any app module is imported)."""
+    os.environ['MODEL_PATH'] = os.path.join(scratch_dir, 'sentiment_model.pkl')
+    # Benchmark the default hyperparameters, not the ones promoted on this machine
+    os.environ['HYPERPARAMS_PATH'] = os.path.join(scratch_dir, 'hyperparams.json')
+    os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    os.environ['MICROBATCH_ENABLED'] = 'False'
+
+def git_commit():
+    """Return the current git commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """Run the benchmarks, save the results and compare them with the baseline."""
+    parser = argparse.ArgumentParser(description='Benchmark the inference and training hot paths.')
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=SUITES, help='Suites to run')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 10000],
+                        help='Batch sizes for text normalization and predict_sentiment')
+    parser.add_argument('--api-batch-sizes', type=int, nargs='+', default=[1, 10, 100],
+                        help='Batch sizes for /api/sentiment/analyze')
+    parser.add_argument('--train-sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='Synthetic corpus sizes for train_model')
+    parser.add_argument('--model-size', type=int, default=20000,
+                        help='Synthetic corpus size of the model used by the load, inference and API suites')
+    parser.add_argument('--output', default=None,
+                        help='Results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative slowdown allowed before a metric is flagged as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Smallest absolute slowdown of a duration flagged as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='Also store the results as the new baseline')
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory()
+    configure_environment(scratch.name)
+
+    from benchmarks import suites
+    from benchmarks.compare import load_results, compare, format_comparison
+
+    metrics = {}
+    start = time.perf_counter()
+    try:
+        if set(args.suites) & {'load', 'inference', 'api'}:
+            print(f"Training the benchmark model on {args.model_size} synthetic tweets...")
+            suites.train_reference_model(args.model_size)
+        if 'load' in args.suites:
+            print("Benchmarking model load time...")
+            metrics.update(suites.bench_model_load())
+        if 'normalize' in args.suites:
+            print(f"Benchmarking text normalization (batch sizes {args.batch_sizes})...")
+            metrics.update(suites.bench_normalization(args.batch_sizes))
+        if 'inference' in args.suites:
+            print(f"Benchmarking predict_sentiment (batch sizes {args.batch_sizes})...")
+            metrics.update(suites.bench_inference(args.batch_sizes))
+        if 'api' in args.suites:
+            print(f"Benchmarking /api/sentiment/analyze (batch sizes {args.api_batch_sizes})...")
+            metrics.update(suites.bench_api(args.api_batch_sizes))
+        if 'training' in args.suites:
+            print(f"Benchmarking train_model (corpus sizes {args.train_sizes})...")
+            metrics.update(suites.bench_training(args.train_sizes))
+    finally:
+        scratch.cleanup()
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'duration_s': time.perf_counter() - start,
+        'metrics': metrics,
+    }
+
+    output = args.output or os.path.join(BENCHMARKS_DIR, 'results', time.strftime('%Y%m%d_%H%M%S') + '.json')
+    paths = [output] + ([args.baseline] if args.save_baseline else [])
+    for path in paths:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+    if args.save_baseline:
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one.")
+        return
+
+    baseline = load_results(args.baseline)
+    rows = compare(metrics, baseline['metrics'], args.tolerance, args.min_delta_ms)
+    print(f"\nComparison with baseline {args.baseline} (commit {baseline.get('commit')}, "
+          f"tolerance {args.tolerance:.0%}):")
+    print(format_comparison(rows))
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+if __name__ == "__main__":
+    main()
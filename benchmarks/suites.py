@@ -0,0 +1,143 @@
+"""
+Benchmark suites for the inference and training hot paths.
+
+Every suite returns a flat {metric name: value} dict. Durations are in
+milliseconds (suffix _ms) or seconds (suffix _s), throughputs in tweets per
+second (suffix _per_s). The app modules are imported inside the suites, so
+run_benchmarks.py can point MODEL_PATH and the other settings at a scratch
+directory before anything reads the configuration.
+"""
+
+import io
+import time
+import contextlib
+import numpy as np
+
+from scripts.benchmark_inference import generate_corpus
+
+PERCENTILES = (50, 95, 99)
+
+def repeats_for(batch_size, budget=20000, minimum=5, maximum=200):
+    """Return the number of timed runs for a batch size: more runs for small, noisy batches."""
+    return max(minimum, min(maximum, budget // batch_size))
+
+def time_calls(call, repeats, warmup=2):
+    """Return the wall-clock duration in seconds of each of repeats calls, after a warm-up."""
+    for _ in range(warmup):
+        call()
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def latency_metrics(prefix, durations, batch_size):
+    """Return the latency percentiles and throughput of timed calls scoring batch_size tweets each."""
+    durations = np.asarray(durations)
+    metrics = {f"{prefix}.p{percentile}_ms": float(np.percentile(durations, percentile) * 1000)
+               for percentile in PERCENTILES}
+    metrics[f"{prefix}.throughput_per_s"] = float(batch_size * len(durations) / durations.sum())
+    return metrics
+
+def noisy_tweets(n_tweets, seed=13):
+    """Return synthetic tweets with URLs, mentions, hashtags, numbers and elongated words to normalize."""
+    tweets, _, _ = generate_corpus(n_tweets, seed=seed)
+    # Spell the filler words' digits as letters: real tweets do not have digits in every word
+    letters = str.maketrans('0123456789', 'abcdefghij')
+    return [f"@User{i % 997} {tweet.translate(letters)} Sooooo #Tag{i % 101} {i * 7} https://t.co/x{i}"
+            for i, tweet in enumerate(tweets)]
+
+def train_reference_model(train_size):
+    """Train and save the model that the load, inference and API suites use."""
+    from app.models.sentiment_model import SentimentModel
+
+    texts, y_positive, y_negative = generate_corpus(train_size)
+    model = SentimentModel(load=False)
+    model.fit_models(model.preprocess_text(texts), y_positive, y_negative)
+    model.bundle.save()
+
+def bench_model_load(repeats=20):
+    """Time loading the saved model from the pickled pipelines and from the memory-mapped artifact."""
+    from app.models.model_bundle import ModelBundle
+
+    metrics = {}
+    for name, load in (('pickle', ModelBundle.load), ('mmap', ModelBundle.load_mmap)):
+        durations = np.asarray(time_calls(load, repeats, warmup=1))
+        metrics[f"model_load.{name}.p50_ms"] = float(np.percentile(durations, 50) * 1000)
+    return metrics
+
+def bench_inference(batch_sizes):
+    """Time SentimentModel.predict_sentiment on batches of each size."""
+    from app.models.sentiment_model import SentimentModel
+
+    model = SentimentModel()
+    tweets, _, _ = generate_corpus(max(batch_sizes), seed=7)
+
+    metrics = {}
+    for batch_size in batch_sizes:
+        batch = tweets[:batch_size]
+        durations = time_calls(lambda: model.predict_sentiment(batch), repeats_for(batch_size))
+        metrics.update(latency_metrics(f"inference.batch_{batch_size}", durations, batch_size))
+    return metrics
+
+def bench_normalization(batch_sizes):
+    """Time the configured text normalization on batches of noisy tweets of each size."""
+    from app.models.text_normalizer import TextNormalizer
+
+    normalizer = TextNormalizer()
+    tweets = noisy_tweets(max(batch_sizes))
+
+    metrics = {}
+    for batch_size in batch_sizes:
+        batch = tweets[:batch_size]
+        durations = time_calls(lambda: normalizer.normalize(batch), repeats_for(batch_size))
+        metrics.update(latency_metrics(f"normalize.batch_{batch_size}", durations, batch_size))
+    return metrics
+
+def bench_api(batch_sizes):
+    """Time POST /api/sentiment/analyze end to end through the Flask test client."""
+    from app import create_app
+
+    client = create_app(init_db=False, enable_scheduler=False).test_client()
+    tweets, _, _ = generate_corpus(max(batch_sizes), seed=11)
+
+    metrics = {}
+    for batch_size in batch_sizes:
+        payload = {'tweets': tweets[:batch_size]}
+
+        def post():
+            response = client.post('/api/sentiment/analyze', json=payload)
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/sentiment/analyze returned {response.status_code}: "
+                                   f"{response.get_data(as_text=True)}")
+
+        durations = time_calls(post, repeats_for(batch_size))
+        metrics.update(latency_metrics(f"api.batch_{batch_size}", durations, batch_size))
+    return metrics
+
+def bench_training(train_sizes):
+    """Time each phase of SentimentModel.train_model on synthetic corpora of each size."""
+    from app.models.sentiment_model import SentimentModel
+    from app.models.evaluation import wait_for_evaluations
+
+    metrics = {}
+    for train_size in train_sizes:
+        texts, y_positive, y_negative = generate_corpus(train_size, seed=train_size)
+        model = SentimentModel(load=False)
+        data = (model.preprocess_text(texts), np.asarray(y_positive, dtype=np.int8),
+                np.asarray(y_negative, dtype=np.int8), train_size)
+        del texts
+
+        # Keep the classification reports out of the benchmark output
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings = model.train_model(data=data)
+            # Keep the background evaluation from overlapping the next run
+            wait_for_evaluations()
+
+        # The data is already in memory, so there is no loading phase to compare
+        timings.pop('load_data', None)
+        for phase, seconds in timings.items():
+            metrics[f"training.rows_{train_size}.{phase}_s"] = seconds
+        print(f"  {train_size} rows: total {timings['total']:.2f}s")
+    return metrics
@@ -7,6 +7,7 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+from app.utils.migrations import migrate, get_schema_version
 
 def setup_database():
     """Set up the MySQL database and tables."""
@@ -25,21 +26,6 @@ def setup_database():
             # Create the database if it doesn't exist
             cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME} DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
             print(f"Database '{DB_NAME}' created or already exists.")
-            
-            # Switch to the newly created database
-            cursor.execute(f"USE {DB_NAME}")
-            
-            # Create the tweets table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tweets (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    text TEXT NOT NULL,
-                    positive TINYINT NOT NULL DEFAULT 0,
-                    negative TINYINT NOT NULL DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            """)
-            print("Table 'tweets' created or already exists.")
         
         connection.commit()
     except Exception as e:
@@ -48,6 +34,14 @@ def setup_database():
     finally:
         connection.close()
     
+    # Create the tables and apply any pending schema migrations
+    try:
+        applied = migrate()
+        print(f"Schema is at version {get_schema_version()} ({len(applied)} migrations applied).")
+    except Exception as e:
+        print(f"Error migrating database: {e}")
+        sys.exit(1)
+    
     print("Database setup completed.")
 
 def load_sample_data():
@@ -95,12 +89,11 @@ def load_sample_data():
                 print(f"Table 'tweets' already contains {count} records. Skipping sample data loading.")
                 return
             
-            # Insert sample data
-            for _, row in df.iterrows():
-                cursor.execute(
-                    "INSERT INTO tweets (text, positive, negative) VALUES (%s, %s, %s)",
-                    (row['text'], row['positive'], row['negative'])
-                )
+            # Insert sample data as one multi-row INSERT
+            cursor.executemany(
+                "INSERT INTO tweets (text, positive, negative) VALUES (%s, %s, %s)",
+                [(row['text'], int(row['positive']), int(row['negative'])) for _, row in df.iterrows()]
+            )
             
             print(f"Inserted {len(df)} sample tweets into the database.")
         
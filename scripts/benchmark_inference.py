@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the sentiment model inference paths.
+Trains a model on a synthetic corpus and compares the per-tweet cost of the
+two-pipeline reference path against the fused single-vectorization path and
+the pure NumPy compiled scorer.
+"""
+
+import os
+import sys
+import time
+import argparse
+import random
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.sentiment_model import SentimentModel
+
+POSITIVE_WORDS = ['love', 'great', 'amazing', 'excellent', 'happy', 'awesome', 'fantastic', 'enjoy']
+NEGATIVE_WORDS = ['hate', 'terrible', 'awful', 'worst', 'disappointed', 'broken', 'slow', 'angry']
+
+def generate_corpus(n_tweets, vocabulary_size=20000, seed=42):
+    """Generate a synthetic annotated tweet corpus.
+
+    Args:
+        n_tweets (int): Number of tweets to generate.
+        vocabulary_size (int): Number of distinct filler words.
+        seed (int): Random seed for reproducibility.
+
+    Returns:
+        tuple: (texts, positive labels, negative labels)
+    """
+    rng = random.Random(seed)
+    filler = [f"word{i}" for i in range(vocabulary_size)]
+    texts, y_positive, y_negative = [], [], []
+
+    for _ in range(n_tweets):
+        positive = rng.random() < 0.4
+        negative = rng.random() < 0.4
+        words = rng.choices(filler, k=rng.randint(8, 25))
+        if positive:
+            words += rng.choices(POSITIVE_WORDS, k=2)
+        if negative:
+            words += rng.choices(NEGATIVE_WORDS, k=2)
+        rng.shuffle(words)
+        texts.append(' '.join(words).capitalize() + '!')
+        y_positive.append(int(positive))
+        y_negative.append(int(negative))
+
+    return texts, y_positive, y_negative
+
+def time_scoring(score, texts, repeats):
+    """Return the best wall-clock time in seconds of score(texts) over several runs."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        score(texts)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    """Run the inference benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the sentiment model inference paths.')
+    parser.add_argument('--train-size', type=int, default=20000, help='Number of synthetic training tweets')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000],
+                        help='Batch sizes to benchmark')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of timed runs per batch size')
+    args = parser.parse_args()
+
+    print(f"Training on {args.train_size} synthetic tweets...")
+    texts, y_positive, y_negative = generate_corpus(args.train_size)
+    model = SentimentModel(load=False)
+    model.fit_models(model.preprocess_text(texts), y_positive, y_negative)
+
+    query_texts, _, _ = generate_corpus(max(args.batch_sizes), seed=7)
+    processed = model.preprocess_text(query_texts)
+
+    # All paths must agree before their timings are worth comparing
+    reference = model.bundle.predict_pipelines(processed)
+    fused_diff = np.max(np.abs(reference - model.bundle.predict_fused(processed)))
+    compiled_diff = np.max(np.abs(reference - model.compiled_scorer.predict_sentiment(processed)))
+    print(f"Max absolute score difference vs pipeline: fused {fused_diff:.2e}, compiled {compiled_diff:.2e}\n")
+
+    print(f"{'batch':>8} {'pipeline us/tweet':>18} {'fused us/tweet':>15} {'compiled us/tweet':>18} "
+          f"{'fused speedup':>14} {'compiled speedup':>17}")
+    for batch_size in args.batch_sizes:
+        batch = processed[:batch_size]
+        pipeline_time = time_scoring(model.bundle.predict_pipelines, batch, args.repeats)
+        fused_time = time_scoring(model.bundle.predict_fused, batch, args.repeats)
+        compiled_time = time_scoring(model.compiled_scorer.predict_sentiment, batch, args.repeats)
+        print(f"{batch_size:>8} {pipeline_time / batch_size * 1e6:>18.1f} "
+              f"{fused_time / batch_size * 1e6:>15.1f} {compiled_time / batch_size * 1e6:>18.1f} "
+              f"{pipeline_time / fused_time:>13.2f}x {pipeline_time / compiled_time:>16.2f}x")
+
+if __name__ == "__main__":
+    main()
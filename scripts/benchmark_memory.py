@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Script to measure the per-worker memory cost of the sentiment model.
+Starts several worker processes that load the model either from the pickled
+pipelines or from the memory-mapped scoring artifact, and reports the resident
+(RSS) and proportional (PSS) memory each worker needs for the model.
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import multiprocessing
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def read_memory_kb():
+    """Return the RSS, PSS and private memory of the current process in kB (Linux only)."""
+    memory = {'rss': 0, 'pss': 0, 'private': 0}
+    with open('/proc/self/smaps_rollup', 'r') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key == 'Rss':
+                memory['rss'] = int(value.split()[0])
+            elif key == 'Pss':
+                memory['pss'] = int(value.split()[0])
+            elif key in ('Private_Clean', 'Private_Dirty'):
+                memory['private'] += int(value.split()[0])
+    return memory
+
+def import_scoring_stack():
+    """Import the libraries the pickled pipelines need.
+
+    The serving path imports scikit-learn and SciPy lazily, on the first pickle
+    load. They are imported up front in every worker so the baseline reading
+    includes them and the deltas only measure the model itself.
+    """
+    import scipy.sparse
+    import sklearn.pipeline
+    import sklearn.feature_extraction.text
+    import sklearn.linear_model
+
+def worker(model_path, model_format, ready, done, results):
+    """Load the model in one worker process and report its memory use."""
+    from app.models.model_bundle import ModelBundle
+
+    import_scoring_stack()
+    before = read_memory_kb()
+    if model_format == 'mmap':
+        bundle = ModelBundle.load_mmap(model_path)
+    else:
+        bundle = ModelBundle.load(model_path)
+    # Score once so the pages actually used for inference are resident
+    bundle.score(["warming up the model with a first tweet"] * 100)
+
+    # Measure while every worker holds the model, so shared pages are split between them
+    ready.wait()
+    after = read_memory_kb()
+    results.put({key: after[key] - before[key] for key in after})
+    done.wait()
+
+def measure(model_path, model_format, n_workers):
+    """Run n_workers workers for one model format and return their memory deltas."""
+    context = multiprocessing.get_context('spawn')
+    ready = context.Barrier(n_workers + 1)
+    done = context.Barrier(n_workers + 1)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(model_path, model_format, ready, done, results))
+                 for _ in range(n_workers)]
+
+    for process in processes:
+        process.start()
+    ready.wait()
+    deltas = [results.get() for _ in processes]
+    done.wait()
+    for process in processes:
+        process.join()
+    return deltas
+
+def train_synthetic_model(model_path, n_tweets):
+    """Train and save a model on a synthetic corpus."""
+    from app.models.sentiment_model import SentimentModel
+    from scripts.benchmark_inference import generate_corpus
+
+    texts, y_positive, y_negative = generate_corpus(n_tweets)
+    model = SentimentModel(load=False)
+    model.fit_models(model.preprocess_text(texts), y_positive, y_negative)
+    model.bundle.save(model_path)
+
+def main():
+    """Run the memory benchmark."""
+    from app.config.config import MODEL_PATH
+
+    parser = argparse.ArgumentParser(description='Measure per-worker memory of the sentiment model.')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+    parser.add_argument('--model-path', default=None,
+                        help=f'Saved model to measure (default: train a synthetic model; MODEL_PATH is {MODEL_PATH})')
+    parser.add_argument('--train-size', type=int, default=20000, help='Synthetic corpus size')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model_path
+        if model_path is None:
+            model_path = os.path.join(tmp_dir, 'sentiment_model.pkl')
+            print(f"Training a synthetic model on {args.train_size} tweets...")
+            train_synthetic_model(model_path, args.train_size)
+
+        print(f"\n| Format | Workers | Model RSS per worker (MB) | Model PSS per worker (MB) | Private per worker (MB) |")
+        print(f"| ------ | ------- | ------------------------- | ------------------------- | ----------------------- |")
+        for model_format in ('pickle', 'mmap'):
+            deltas = measure(model_path, model_format, args.workers)
+            mean = {key: sum(delta[key] for delta in deltas) / len(deltas) / 1024 for key in deltas[0]}
+            print(f"| {model_format} | {args.workers} | {mean['rss']:.1f} | {mean['pss']:.1f} | {mean['private']:.1f} |")
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,63 @@
 """
 Demo client script to test the sentiment analysis API.
 This script sends sample tweets to the API and displays the results.
+
+With --load-test it instead generates load against a running server: several
+concurrent workers, each reusing a pooled keep-alive connection, send batches
+of tweets for a fixed duration (optionally paced to a target request rate) and
+the throughput, error rate and latency percentiles are reported.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import sys
 import argparse
 import time
+import math
+import random
+import threading
+import itertools
+from collections import Counter
+
+SAMPLE_TWEETS = [
+    "I love this new product! It's amazing!",
+    "This is terrible, I'm very disappointed.",
+    "The service was okay, nothing special.",
+    "Great customer service and fast delivery.",
+    "The product arrived damaged and customer service was unhelpful.",
+    "I'm really enjoying using this app, it's so intuitive!",
+    "This update has made everything worse, I can't find anything now.",
+    "Just a normal day, nothing exciting happened."
+]
+
+LATENCY_PERCENTILES = [50, 95, 99, 99.9]
 
-def analyze_tweets(tweets, api_url='http://localhost:5000/api/sentiment/analyze'):
+def create_session(pool_size=1):
+    """Create an HTTP session that keeps up to pool_size connections open for reuse."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def analyze_tweets(tweets, api_url='http://localhost:5000/api/sentiment/analyze', session=None):
     """Send tweets to the API for sentiment analysis.
     
     Args:
         tweets (list): A list of tweet strings to analyze.
         api_url (str): The URL of the sentiment analysis API endpoint.
+        session (requests.Session): Session whose pooled connection is reused, if any.
         
     Returns:
         dict: A dictionary mapping tweets to their sentiment scores.
     """
     headers = {'Content-Type': 'application/json'}
     payload = {'tweets': tweets}
+    http = session or requests
     
     try:
-        response = requests.post(api_url, headers=headers, data=json.dumps(payload))
+        response = http.post(api_url, headers=headers, data=json.dumps(payload))
         
         if response.status_code == 200:
             return response.json()
@@ -75,29 +109,182 @@ def display_results(results):
     
     print("\n")
 
+def parse_batch_sizes(spec):
+    """Parse a batch-size distribution such as '1:70,10:25,100:5' (size:weight pairs).
+    
+    Returns:
+        tuple: (batch sizes, weights)
+    """
+    sizes, weights = [], []
+    for item in spec.split(','):
+        size, _, weight = item.partition(':')
+        sizes.append(int(size))
+        weights.append(float(weight or 1))
+    if any(size < 1 for size in sizes) or any(weight < 0 for weight in weights) or sum(weights) <= 0:
+        raise ValueError(f"Invalid batch-size distribution: {spec}")
+    return sizes, weights
+
+def percentile(sorted_values, p):
+    """Return the p-th percentile (nearest rank) of an ascending list."""
+    if not sorted_values:
+        return None
+    # Round before taking the ceiling so that float error in p (99.9) does not skip a rank
+    rank = max(1, math.ceil(round(p * len(sorted_values) / 100, 6)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def run_load_test(api_url, tweets, workers=8, rps=0, batch_sizes=([1], [1]), duration=30, unique=False,
+                  timeout=10):
+    """Send concurrent batches of tweets to the API for a fixed duration.
+    
+    Each worker thread owns a session, so every request reuses an open keep-alive
+    connection. With a target rate, request i is scheduled at start + i / rps and its
+    latency is measured from that scheduled time: when the server (or the client)
+    falls behind, the queueing delay is counted instead of silently lowering the
+    offered load.
+    
+    Args:
+        api_url (str): The URL of the sentiment analysis API endpoint.
+        tweets (list): Tweets the batches are drawn from.
+        workers (int): Number of concurrent workers.
+        rps (float): Target requests per second over all workers (0: as fast as possible).
+        batch_sizes (tuple): (sizes, weights) distribution of the number of tweets per request.
+        duration (float): Duration of the test in seconds.
+        unique (bool): Make every tweet unique, so the server's prediction cache never hits.
+        timeout (float): Timeout of each request in seconds.
+        
+    Returns:
+        dict: Summary of the run (see summarize_load_test).
+    """
+    sizes, weights = batch_sizes
+    counter = itertools.count()
+    lock = threading.Lock()
+    records = [[] for _ in range(workers)]
+    start = time.perf_counter()
+    deadline = start + duration
+    
+    def worker(index):
+        session = create_session()
+        rng = random.Random(index)
+        while True:
+            with lock:
+                request_number = next(counter)
+            if rps > 0:
+                scheduled = start + request_number / rps
+                if scheduled >= deadline:
+                    break
+                time.sleep(max(0.0, scheduled - time.perf_counter()))
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= deadline:
+                    break
+            
+            batch = rng.choices(tweets, k=rng.choices(sizes, weights)[0])
+            if unique:
+                batch = [f"{tweet} #{request_number}.{i}" for i, tweet in enumerate(batch)]
+            
+            try:
+                response = session.post(api_url, json={'tweets': batch}, timeout=timeout)
+                error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+            except requests.exceptions.RequestException as e:
+                error = type(e).__name__
+            records[index].append((time.perf_counter() - scheduled, len(batch), error))
+        session.close()
+    
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    elapsed = time.perf_counter() - start
+    return summarize_load_test([record for worker_records in records for record in worker_records], elapsed,
+                               workers=workers, target_rps=rps)
+
+def summarize_load_test(records, elapsed, workers, target_rps):
+    """Summarize (latency seconds, batch size, error) records of a load test."""
+    latencies = sorted(latency for latency, _, error in records if error is None)
+    errors = Counter(error for _, _, error in records if error is not None)
+    tweets = sum(batch_size for _, batch_size, error in records if error is None)
+    
+    latency_ms = {f"p{p:g}": percentile(latencies, p) * 1000 if latencies else None for p in LATENCY_PERCENTILES}
+    latency_ms['mean'] = sum(latencies) / len(latencies) * 1000 if latencies else None
+    latency_ms['max'] = latencies[-1] * 1000 if latencies else None
+    
+    return {
+        'duration_s': elapsed,
+        'workers': workers,
+        'target_rps': target_rps,
+        'requests': len(records),
+        'successful': len(latencies),
+        'errors': sum(errors.values()),
+        'error_rate': sum(errors.values()) / len(records) if records else 0.0,
+        'errors_by_type': dict(errors),
+        'throughput_rps': len(latencies) / elapsed,
+        'tweets_per_s': tweets / elapsed,
+        'latency_ms': latency_ms,
+    }
+
+def display_load_test(summary):
+    """Display the summary of a load test in a readable format."""
+    print("\n" + "="*80)
+    print(" LOAD TEST RESULTS ".center(80, "="))
+    print("="*80 + "\n")
+    
+    target = f"{summary['target_rps']:g} req/s" if summary['target_rps'] else "unlimited"
+    print(f"Duration:    {summary['duration_s']:.1f} s with {summary['workers']} workers (target rate: {target})")
+    print(f"Requests:    {summary['requests']} ({summary['successful']} successful)")
+    print(f"Throughput:  {summary['throughput_rps']:.1f} req/s, {summary['tweets_per_s']:.1f} tweets/s")
+    print(f"Error rate:  {summary['error_rate']:.2%}")
+    for error, count in sorted(summary['errors_by_type'].items()):
+        print(f"  {error}: {count}")
+    
+    if summary['successful']:
+        print("Latency (ms):")
+        for name, value in summary['latency_ms'].items():
+            print(f"  {name:>6}: {value:.2f}")
+    print()
+
 def main():
     """Main function to run the demo client."""
     parser = argparse.ArgumentParser(description='Demo client for the sentiment analysis API.')
     parser.add_argument('--api-url', default='http://localhost:5000/api/sentiment/analyze',
                         help='URL of the sentiment analysis API endpoint')
     parser.add_argument('--tweets', nargs='+', help='Tweets to analyze (space-separated)')
+    parser.add_argument('--load-test', action='store_true', help='Generate load instead of analyzing the tweets once')
+    parser.add_argument('--workers', type=int, default=8, help='Load test: number of concurrent workers')
+    parser.add_argument('--rps', type=float, default=0,
+                        help='Load test: target requests per second over all workers (0: as fast as possible)')
+    parser.add_argument('--batch-sizes', default='1:70,10:25,100:5',
+                        help='Load test: distribution of tweets per request as size:weight pairs')
+    parser.add_argument('--duration', type=float, default=30, help='Load test: duration in seconds')
+    parser.add_argument('--unique-tweets', action='store_true',
+                        help="Load test: make every tweet unique to bypass the server's prediction cache")
+    parser.add_argument('--timeout', type=float, default=10, help='Load test: timeout of each request in seconds')
+    parser.add_argument('--json-output', default=None, help='Load test: also write the results to this JSON file')
     args = parser.parse_args()
     
-    # Use provided tweets or sample tweets
-    if args.tweets:
-        tweets = args.tweets
-    else:
-        # Sample tweets with different sentiments
-        tweets = [
-            "I love this new product! It's amazing!",
-            "This is terrible, I'm very disappointed.",
-            "The service was okay, nothing special.",
-            "Great customer service and fast delivery.",
-            "The product arrived damaged and customer service was unhelpful.",
-            "I'm really enjoying using this app, it's so intuitive!",
-            "This update has made everything worse, I can't find anything now.",
-            "Just a normal day, nothing exciting happened."
-        ]
+    # Use provided tweets or sample tweets with different sentiments
+    tweets = args.tweets or SAMPLE_TWEETS
+    
+    if args.load_test:
+        try:
+            batch_sizes = parse_batch_sizes(args.batch_sizes)
+        except ValueError as e:
+            parser.error(str(e))
+        
+        print(f"Load testing {args.api_url} for {args.duration:g} seconds with {args.workers} workers...")
+        summary = run_load_test(args.api_url, tweets, workers=args.workers, rps=args.rps, batch_sizes=batch_sizes,
+                                duration=args.duration, unique=args.unique_tweets, timeout=args.timeout)
+        display_load_test(summary)
+        
+        if args.json_output:
+            with open(args.json_output, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            print(f"Results saved to {args.json_output}")
+        
+        if not summary['successful']:
+            sys.exit(1)
+        return
     
     print(f"Analyzing {len(tweets)} tweets...")
     
@@ -1,24 +1,20 @@
 #!/usr/bin/env python3
 """
 Script to generate a PDF evaluation report for the sentiment analysis model.
-This script reads the model evaluation metrics and confusion matrices,
-and generates a comprehensive report in PDF format.
+This script reads the evaluation metrics and confusion matrices saved for a
+model version after training (see app/models/evaluation.py), and generates a
+comprehensive report in PDF format. Nothing is re-evaluated.
 """
 
 import os
 import sys
-import pickle
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
 import argparse
 from fpdf import FPDF
 
 # Add the project root directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.config.config import MODEL_PATH
-from app.models.sentiment_model import get_model_instance
+from app.models.evaluation import load_evaluation, evaluation_dir
 
 class PDF(FPDF):
     """Custom PDF class for creating the evaluation report."""
@@ -35,42 +31,30 @@ class PDF(FPDF):
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
 
-def load_metrics():
-    """Load the evaluation metrics from the pickle file."""
-    metrics_path = os.path.join(os.path.dirname(MODEL_PATH), 'evaluation_metrics.pkl')
+def load_metrics(version=None):
+    """Load the evaluation metrics saved for a model version (default: the saved model)."""
+    metrics = load_evaluation(version)
     
-    if not os.path.exists(metrics_path):
-        print(f"Metrics file not found at {metrics_path}")
-        return None
-    
-    with open(metrics_path, 'rb') as f:
-        metrics = pickle.load(f)
+    if metrics is None:
+        print(f"No evaluation metrics found for model version {version or '(saved model)'}")
     
     return metrics
 
-def count_tweets():
-    """Count the total number of tweets in the training dataset."""
-    try:
-        from app.utils.db_utils import get_training_data
-        df = get_training_data()
-        return len(df)
-    except Exception as e:
-        print(f"Error counting tweets: {e}")
-        return "Unknown"
-
-def generate_pdf_report(output_path=None):
+def generate_pdf_report(output_path=None, version=None):
     """Generate a PDF report with the evaluation metrics and confusion matrices."""
     # Load the metrics
-    metrics = load_metrics()
+    metrics = load_metrics(version)
     
     if metrics is None:
-        print("No metrics found. Please train the model first.")
+        print("No metrics found. Please train the model first (evaluation finishes shortly after training).")
         return
     
-    # Count the tweets
-    total_tweets = count_tweets()
-    training_size = int(total_tweets * 0.8) if isinstance(total_tweets, int) else "Unknown"
-    test_size = int(total_tweets * 0.2) if isinstance(total_tweets, int) else "Unknown"
+    # Dataset sizes recorded at training time
+    test_size = metrics['test_rows']
+    total_tweets = metrics.get('trained_rows') or "Unknown"
+    training_size = total_tweets - test_size if isinstance(total_tweets, int) else "Unknown"
+    test_share = f"{test_size / total_tweets:.0%}" if isinstance(total_tweets, int) else "Unknown"
+    output_dir = evaluation_dir(metrics['version'])
     
     # Create a new PDF object
     pdf = PDF()
@@ -97,8 +81,8 @@ def generate_pdf_report(output_path=None):
     
     pdf.set_font('Arial', '', 12)
     pdf.cell(0, 10, f'- Training set size: {training_size} tweets', 0, 1, 'L')
-    pdf.cell(0, 10, f'- Test set size: {test_size} tweets (20% of the total dataset)', 0, 1, 'L')
-    pdf.cell(0, 10, f'- Data collection period: Up to {datetime.now().strftime("%Y-%m-%d")}', 0, 1, 'L')
+    pdf.cell(0, 10, f'- Test set size: {test_size} tweets ({test_share} of the total dataset)', 0, 1, 'L')
+    pdf.cell(0, 10, f'- Data collection period: Up to {metrics["evaluated_at"][:10]}', 0, 1, 'L')
     pdf.ln(5)
     
     # Add confusion matrices
@@ -110,7 +94,7 @@ def generate_pdf_report(output_path=None):
     pdf.cell(0, 10, 'Positive Sentiment Model', 0, 1, 'L')
     
     # Add the positive confusion matrix image
-    cm_pos_path = os.path.join(os.path.dirname(MODEL_PATH), 'confusion_matrix_positive.png')
+    cm_pos_path = os.path.join(output_dir, 'confusion_matrix_positive.png')
     if os.path.exists(cm_pos_path):
         pdf.image(cm_pos_path, x=10, y=None, w=180)
     else:
@@ -124,7 +108,7 @@ def generate_pdf_report(output_path=None):
     pdf.cell(0, 10, 'Negative Sentiment Model', 0, 1, 'L')
     
     # Add the negative confusion matrix image
-    cm_neg_path = os.path.join(os.path.dirname(MODEL_PATH), 'confusion_matrix_negative.png')
+    cm_neg_path = os.path.join(output_dir, 'confusion_matrix_negative.png')
     if os.path.exists(cm_neg_path):
         pdf.image(cm_neg_path, x=10, y=None, w=180)
     else:
@@ -262,8 +246,8 @@ def generate_pdf_report(output_path=None):
     
     # Add footer info
     pdf.set_font('Arial', 'I', 10)
-    pdf.cell(0, 10, f'Date of Evaluation: {datetime.now().strftime("%Y-%m-%d")}', 0, 1, 'L')
-    pdf.cell(0, 10, 'Model Version: 1.0', 0, 1, 'L')
+    pdf.cell(0, 10, f'Date of Evaluation: {metrics["evaluated_at"][:10]}', 0, 1, 'L')
+    pdf.cell(0, 10, f'Model Version: {metrics["version"]}', 0, 1, 'L')
     pdf.cell(0, 10, 'Evaluated by: SocialMetrics AI Team', 0, 1, 'L')
     
     # Save the PDF
@@ -278,10 +262,11 @@ def main():
     """Main function to generate the PDF report."""
     parser = argparse.ArgumentParser(description='Generate a PDF evaluation report for the sentiment analysis model.')
     parser.add_argument('--output', help='Output path for the PDF report', default=None)
+    parser.add_argument('--version', help='Model version to report on (default: the saved model)', default=None)
     args = parser.parse_args()
     
     try:
-        output_path = generate_pdf_report(args.output)
+        output_path = generate_pdf_report(args.output, args.version)
         print(f"Report saved to: {output_path}")
     except Exception as e:
         print(f"Error generating report: {e}")
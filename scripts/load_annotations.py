@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Script to load annotated tweets from CSV or JSONL files into the database.
+CSV files need a header row with 'text', 'positive' and 'negative' columns; JSONL
+files hold one {"text": ..., "positive": 0/1, "negative": 0/1} object per line.
+Each file is inserted in a single transaction with multi-row INSERT statements.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.config import DB_INSERT_CHUNK_SIZE
+from app.utils.annotations import AnnotationError, iter_annotation_file
+from app.utils.db_utils import save_tweet, save_tweets
+
+def load_file(path, chunk_size, per_row=False):
+    """Load one annotation file and return the number of inserted rows."""
+    rows = iter_annotation_file(path)
+    if not per_row:
+        return save_tweets(rows, chunk_size=chunk_size)
+
+    # One INSERT and commit per row, for comparison with the bulk path
+    inserted = 0
+    for text, positive, negative in rows:
+        save_tweet(text, positive, negative)
+        inserted += 1
+    return inserted
+
+def main():
+    """Load annotated tweets into the database."""
+    parser = argparse.ArgumentParser(description='Load annotated tweets from CSV or JSONL files.')
+    parser.add_argument('files', nargs='+', help='CSV (.csv) or JSONL (.jsonl, .ndjson) files')
+    parser.add_argument('--chunk-size', type=int, default=DB_INSERT_CHUNK_SIZE, help='Rows per INSERT statement')
+    parser.add_argument('--per-row', action='store_true',
+                        help='Insert and commit one row at a time (slow; to measure the bulk speedup)')
+    args = parser.parse_args()
+
+    total = 0
+    for path in args.files:
+        start = time.perf_counter()
+        try:
+            inserted = load_file(path, args.chunk_size, args.per_row)
+        except (AnnotationError, ValueError, OSError) as e:
+            print(f"Error loading {path}: {e}")
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        rate = inserted / elapsed if elapsed > 0 else 0.0
+        print(f"{path}: inserted {inserted} tweets in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        total += inserted
+
+    print(f"Loaded {total} annotated tweets.")
+
+if __name__ == "__main__":
+    main()
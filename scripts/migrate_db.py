@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Script to apply pending schema migrations to the sentiment analysis database.
+Safe to run repeatedly: migrations that were already applied are skipped.
+"""
+
+import os
+import sys
+import argparse
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.migrations import MIGRATIONS, migrate, get_schema_version
+
+def main():
+    """Apply the schema migrations."""
+    parser = argparse.ArgumentParser(description='Apply pending database schema migrations.')
+    parser.add_argument('--target', type=int, default=None, help='Migrate up to this version (default: latest)')
+    parser.add_argument('--status', action='store_true', help='Only show the current and latest schema versions')
+    args = parser.parse_args()
+    
+    latest = MIGRATIONS[-1][0]
+    if args.status:
+        print(f"Schema version {get_schema_version()} (latest: {latest}).")
+        return
+    
+    applied = migrate(target=args.target)
+    print(f"Applied {len(applied)} migrations. Schema version {get_schema_version()} (latest: {latest}).")
+
+if __name__ == "__main__":
+    main()
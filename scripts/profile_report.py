@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script to merge the request profiles written by the profiling hook
+(PROFILING_ENABLED) into a report of the hottest functions.
+Profiles can be filtered by duration, route and model version, e.g. to see
+where the time goes in tail-latency requests only.
+"""
+
+import os
+import sys
+import glob
+import json
+import pstats
+import argparse
+from collections import Counter
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.config import PROFILE_DIR
+
+def load_profiles(directory, min_duration_ms=0, endpoint=None, model_version=None):
+    """Return (profile path, metadata) pairs of the profiles matching the filters, oldest first."""
+    profiles = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.prof'))):
+        try:
+            with open(f"{path}.json", 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            metadata = {}
+        if metadata.get('duration_ms', 0) < min_duration_ms:
+            continue
+        if endpoint is not None and metadata.get('endpoint') != endpoint:
+            continue
+        if model_version is not None and metadata.get('model_version') != model_version:
+            continue
+        profiles.append((path, metadata))
+    return profiles
+
+def summarize(profiles):
+    """Print the number, durations, batch sizes and model versions of the profiles."""
+    durations = sorted(metadata['duration_ms'] for _, metadata in profiles if 'duration_ms' in metadata)
+    batch_sizes = sorted(metadata['batch_size'] for _, metadata in profiles if metadata.get('batch_size') is not None)
+    print(f"Profiles: {len(profiles)}")
+    if durations:
+        print(f"Duration (ms): min {durations[0]:.2f}, median {durations[len(durations) // 2]:.2f}, "
+              f"max {durations[-1]:.2f}")
+    if batch_sizes:
+        print(f"Batch size: min {batch_sizes[0]}, median {batch_sizes[len(batch_sizes) // 2]}, "
+              f"max {batch_sizes[-1]}")
+    for name in ('endpoint', 'model_version'):
+        counts = Counter(str(metadata.get(name)) for _, metadata in profiles)
+        print(f"{name}: " + ', '.join(f"{value} ({count})" for value, count in counts.most_common()))
+
+def main():
+    """Merge the request profiles and print the top functions."""
+    parser = argparse.ArgumentParser(description='Report the hottest functions of the sampled request profiles.')
+    parser.add_argument('--dir', default=PROFILE_DIR, help='Directory holding the profiles')
+    parser.add_argument('--top', type=int, default=25, help='Number of functions to report')
+    parser.add_argument('--sort', default='cumulative', choices=['cumulative', 'tottime', 'ncalls'],
+                        help='Sort order of the functions')
+    parser.add_argument('--min-duration-ms', type=float, default=0,
+                        help='Only merge profiles of requests that took at least this long')
+    parser.add_argument('--endpoint', default=None, help='Only merge profiles of this route (e.g. /api/sentiment/analyze)')
+    parser.add_argument('--model-version', default=None, help='Only merge profiles of this model version')
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.dir, args.min_duration_ms, args.endpoint, args.model_version)
+    if not profiles:
+        print(f"No matching profiles in {args.dir}.")
+        sys.exit(1)
+
+    summarize(profiles)
+    print()
+
+    stats = pstats.Stats(*[path for path, _ in profiles])
+    # print_stats() lists every merged file; the summary above already describes them
+    stats.files = []
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+if __name__ == "__main__":
+    main()
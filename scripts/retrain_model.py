@@ -13,21 +13,45 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.models.sentiment_model import get_model_instance
 import argparse
 
+def run_sweep(config_path, promote=True):
+    """Run a hyperparameter sweep on the training data in the database."""
+    from app.models.sentiment_model import SentimentModel
+    from app.models.sweep import run_sweep as sweep
+    
+    print(f"Loading training data for sweep {config_path}...")
+    texts, y_positive, y_negative, _ = SentimentModel(load=False).load_training_data()
+    leaderboard, winner = sweep(config_path, texts, y_positive, y_negative, promote=promote)
+    
+    if winner is not None and promote:
+        print("The next retrain uses the promoted configuration (incremental runs rebuild the model from all "
+              "tweets with its ngram_range and C).")
+
 def main():
     """Retrain the sentiment analysis model."""
     parser = argparse.ArgumentParser(description='Retrain the sentiment analysis model.')
-    parser.add_argument('--force', action='store_true', help='Force retraining even if the model already exists.')
+    parser.add_argument('--force', action='store_true', help='Force retraining even if the training data has not changed since the last run.')
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild the model from all tweets instead of only the tweets added since the last run.')
+    parser.add_argument('--sweep', metavar='CONFIG', default=None,
+                        help='Run a hyperparameter sweep described by a YAML file and promote the winner.')
+    parser.add_argument('--no-promote', action='store_true',
+                        help='With --sweep, only write the leaderboard without promoting the winner.')
     args = parser.parse_args()
     
+    if args.sweep:
+        run_sweep(args.sweep, promote=not args.no_promote)
+        return
+    
     print("Starting model retraining...")
     
     # Get the model instance
     model = get_model_instance()
     
-    # Retrain the model
-    model.retrain_model()
-    
-    print("Model retraining completed.")
+    # Retrain the model, unless the training data is unchanged
+    if model.retrain_model(full=args.full, force=args.force):
+        print("Model retraining completed.")
+    else:
+        print("Model is up to date. Use --force to retrain anyway.")
 
 if __name__ == "__main__":
     main()